@@ -5,7 +5,7 @@ import sys
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
-from sqlalchemy import pool
+from sqlalchemy import Column, pool
 
 from alembic import context
 
@@ -31,6 +31,28 @@ from app.db import base as base_module
 # SQLModel keeps track of all table models defined inheriting from it.
 target_metadata = SQLModel.metadata
 
+from app.db.partitions import is_partition_name
+
+
+def include_name(name, type_, parent_names):
+    """
+    Keeps autogenerate from proposing to drop the partitions of partitioned tables
+    (e.g. trainingrun_p2026_10): they are managed by app/db/partitions.py, not the models.
+    """
+    if type_ == "table":
+        return not is_partition_name(name)
+    return True
+
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Leaves expression indexes (e.g. ix_trainingrun_project_id_metrics_loss) out of the
+    comparison: PostgreSQL reflects their expressions in its own formatting, which
+    autogenerate can't match against the models, so it would propose to recreate them.
+    """
+    if type_ == "index":
+        return all(isinstance(expression, Column) for expression in object.expressions)
+    return True
+
 # --- END: Custom Configuration Section ---
 
 
@@ -71,6 +93,8 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
+        include_object=include_object,
         # literal_binds=True, # Keep commented out - causes issues with autogenerate
         dialect_opts={"paramstyle": "named"},
     )
@@ -97,7 +121,9 @@ def run_migrations_online() -> None:
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
-            target_metadata=target_metadata  # Pass the metadata here for comparison
+            target_metadata=target_metadata,  # Pass the metadata here for comparison
+            include_name=include_name,
+            include_object=include_object,
         )
 
         # Enclose the migration execution within a transaction
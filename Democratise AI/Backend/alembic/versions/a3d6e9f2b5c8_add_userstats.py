@@ -0,0 +1,54 @@
+"""Add per-user dashboard stats
+
+Revision ID: a3d6e9f2b5c8
+Revises: f2a7c9d1e4b6
+Create Date: 2026-10-18 17:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d6e9f2b5c8'
+down_revision: Union[str, None] = 'f2a7c9d1e4b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+RUN_STATUSES = ('queued', 'starting', 'running', 'completed', 'failed', 'cancelled')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('userstats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('projects', sa.Integer(), nullable=False),
+    sa.Column('datasets', sa.Integer(), nullable=False),
+    *(sa.Column(f'runs_{status}', sa.Integer(), nullable=False) for status in RUN_STATUSES),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Backfill from the current rows; from now on the CRUD writes keep the counts up to date
+    run_counts = ", ".join(
+        f"(SELECT count(*) FROM trainingrun r WHERE r.user_id = u.id AND r.status = '{status}')"
+        for status in RUN_STATUSES
+    )
+    op.execute(f"""
+        INSERT INTO userstats (user_id, projects, datasets, {", ".join(f"runs_{s}" for s in RUN_STATUSES)}, updated_at)
+        SELECT u.id,
+               (SELECT count(*) FROM project p WHERE p.user_id = u.id AND p.status != 'deleting'),
+               (SELECT count(*) FROM dataset d WHERE d.user_id = u.id),
+               {run_counts},
+               CURRENT_TIMESTAMP
+        FROM "user" u
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('userstats')
@@ -0,0 +1,46 @@
+"""Add per-step training metrics: trainingmetricchunk
+
+Revision ID: a6e2c8f4b1d7
+Revises: d4a8b6c2e9f1
+Create Date: 2026-10-21 09:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6e2c8f4b1d7'
+down_revision: Union[str, None] = 'd4a8b6c2e9f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # No foreign key to trainingrun (partitioned, keyed on (id, created_at)); rows are purged with the project
+    op.create_table('trainingmetricchunk',
+    sa.Column('run_id', sa.Integer(), nullable=False),
+    sa.Column('metric', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+    sa.Column('first_step', sa.BigInteger(), nullable=False),
+    sa.Column('last_step', sa.BigInteger(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('min_step', sa.BigInteger(), nullable=False),
+    sa.Column('min_value', sa.Float(), nullable=False),
+    sa.Column('max_step', sa.BigInteger(), nullable=False),
+    sa.Column('max_value', sa.Float(), nullable=False),
+    sa.Column('steps', sa.LargeBinary(), nullable=False),
+    sa.Column('values', sa.LargeBinary(), nullable=False),
+    sa.PrimaryKeyConstraint('run_id', 'metric', 'first_step')
+    )
+    op.create_index(op.f('ix_trainingmetricchunk_project_id'), 'trainingmetricchunk', ['project_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_trainingmetricchunk_project_id'), table_name='trainingmetricchunk')
+    op.drop_table('trainingmetricchunk')
@@ -0,0 +1,57 @@
+"""Add precomputed facet counts of the model and dataset listings
+
+Revision ID: b3f7d1a9c5e2
+Revises: a6e2c8f4b1d7
+Create Date: 2026-10-22 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f7d1a9c5e2'
+down_revision: Union[str, None] = 'a6e2c8f4b1d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('modelfacetcount',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_type', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('framework', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('source_type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('datasetfacetcount',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('storage_type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('is_public', sa.Boolean(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_datasetfacetcount_user_id'), 'datasetfacetcount', ['user_id'], unique=False)
+    # The counts of the rows already there (kept up to date by the CRUD functions from now on)
+    op.execute(
+        "INSERT INTO modelfacetcount (task_type, framework, source_type, count) "
+        "SELECT task_type, framework, source_type, count(*) FROM model GROUP BY task_type, framework, source_type"
+    )
+    op.execute(
+        "INSERT INTO datasetfacetcount (user_id, storage_type, is_public, count) "
+        "SELECT CASE WHEN is_public THEN NULL ELSE user_id END, storage_type, is_public, count(*) FROM dataset "
+        "GROUP BY CASE WHEN is_public THEN NULL ELSE user_id END, storage_type, is_public"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_datasetfacetcount_user_id'), table_name='datasetfacetcount')
+    op.drop_table('datasetfacetcount')
+    op.drop_table('modelfacetcount')
@@ -0,0 +1,43 @@
+"""Add composite and partial indexes for list queries
+
+Revision ID: b7e2f4a9c1d3
+Revises: 6c3d89989852
+Create Date: 2026-10-17 19:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2f4a9c1d3'
+down_revision: Union[str, None] = '6c3d89989852'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Owner's project list: WHERE user_id = ? ORDER BY updated_at DESC, id DESC
+    op.create_index('ix_project_user_id_updated_at_id', 'project', ['user_id', 'updated_at', 'id'], unique=False)
+    # Dataset list: public datasets + the user's private ones, ORDER BY updated_at DESC, id DESC
+    op.create_index(
+        'ix_dataset_public_updated_at_id', 'dataset', ['updated_at', 'id'], unique=False,
+        postgresql_where=sa.text('is_public'),
+    )
+    op.create_index(
+        'ix_dataset_private_user_id_updated_at_id', 'dataset', ['user_id', 'updated_at', 'id'], unique=False,
+        postgresql_where=sa.text('NOT is_public'),
+    )
+    # A project's training runs in creation order
+    op.create_index('ix_trainingrun_project_id_created_at', 'trainingrun', ['project_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_trainingrun_project_id_created_at', table_name='trainingrun')
+    op.drop_index('ix_dataset_private_user_id_updated_at_id', table_name='dataset')
+    op.drop_index('ix_dataset_public_updated_at_id', table_name='dataset')
+    op.drop_index('ix_project_user_id_updated_at_id', table_name='project')
@@ -0,0 +1,36 @@
+"""Add name prefix indexes for catalog search
+
+Revision ID: c4a8d2e6f0b1
+Revises: b7e2f4a9c1d3
+Create Date: 2026-10-17 21:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8d2e6f0b1'
+down_revision: Union[str, None] = 'b7e2f4a9c1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # name LIKE 'prefix%' for the ?name_prefix= filter of the model/dataset listings
+    op.create_index(
+        'ix_model_name_prefix', 'model', ['name'], unique=False,
+        postgresql_ops={'name': 'text_pattern_ops'},
+    )
+    op.create_index(
+        'ix_dataset_name_prefix', 'dataset', ['name'], unique=False,
+        postgresql_ops={'name': 'text_pattern_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_dataset_name_prefix', table_name='dataset')
+    op.drop_index('ix_model_name_prefix', table_name='model')
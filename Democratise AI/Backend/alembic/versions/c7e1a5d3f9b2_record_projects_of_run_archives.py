@@ -0,0 +1,38 @@
+"""Record the projects of the runs in each training run archive
+
+Revision ID: c7e1a5d3f9b2
+Revises: b3f7d1a9c5e2
+Create Date: 2026-10-24 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e1a5d3f9b2'
+down_revision: Union[str, None] = 'b3f7d1a9c5e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('trainingrunarchiveproject',
+    sa.Column('archive_id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['archive_id'], ['trainingrunarchive.id'], ),
+    sa.PrimaryKeyConstraint('archive_id', 'project_id')
+    )
+    op.create_index(op.f('ix_trainingrunarchiveproject_project_id'), 'trainingrunarchiveproject', ['project_id'], unique=False)
+    # Existing archives keep False: their projects are unknown without reading the files
+    op.add_column('trainingrunarchive', sa.Column('projects_recorded', sa.Boolean(), server_default='false', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('trainingrunarchive', 'projects_recorded')
+    op.drop_index(op.f('ix_trainingrunarchiveproject_project_id'), table_name='trainingrunarchiveproject')
+    op.drop_table('trainingrunarchiveproject')
@@ -0,0 +1,46 @@
+"""Add job queue leases and errors to training runs
+
+Revision ID: c9f3a5e7b2d4
+Revises: b7e2d4f8a1c3
+Create Date: 2026-10-19 15:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9f3a5e7b2d4'
+down_revision: Union[str, None] = 'b7e2d4f8a1c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+QUEUED = sa.text("status = 'queued'")
+CLAIMED = sa.text("status IN ('starting', 'running')")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # On PostgreSQL, columns and indexes added to the partitioned table reach every partition
+    op.add_column('trainingrun', sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('trainingrun', sa.Column('worker_id', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('trainingrun', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+    op.add_column('trainingrun', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.create_index('ix_trainingrun_queued', 'trainingrun', ['created_at', 'id'], unique=False,
+                    postgresql_where=QUEUED, sqlite_where=QUEUED)
+    op.create_index('ix_trainingrun_lease_expires_at', 'trainingrun', ['lease_expires_at'], unique=False,
+                    postgresql_where=CLAIMED, sqlite_where=CLAIMED)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_trainingrun_lease_expires_at', table_name='trainingrun')
+    op.drop_index('ix_trainingrun_queued', table_name='trainingrun')
+    op.drop_column('trainingrun', 'attempts')
+    op.drop_column('trainingrun', 'lease_expires_at')
+    op.drop_column('trainingrun', 'worker_id')
+    op.drop_column('trainingrun', 'error')
@@ -0,0 +1,55 @@
+"""Add fair-share training scheduling: user shares and run priorities
+
+Revision ID: d4a8b6c2e9f1
+Revises: c9f3a5e7b2d4
+Create Date: 2026-10-20 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8b6c2e9f1'
+down_revision: Union[str, None] = 'c9f3a5e7b2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+QUEUED = sa.text("status = 'queued'")
+WAITING = sa.text("runs_queued > 0")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('trainingshare',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('weight', sa.Float(), nullable=False),
+    sa.Column('max_active_runs', sa.Integer(), nullable=True),
+    sa.Column('virtual_time', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Every user starts level; users created later get their row when they first queue a run
+    op.execute('INSERT INTO trainingshare (user_id, weight, virtual_time) SELECT id, 1.0, 0.0 FROM "user"')
+
+    op.add_column('trainingrun', sa.Column('priority', sa.Integer(), nullable=False, server_default='0'))
+    # The queue is now read per user (fair share) instead of oldest first
+    op.drop_index('ix_trainingrun_queued', table_name='trainingrun')
+    op.create_index('ix_trainingrun_user_id_queued', 'trainingrun',
+                    ['user_id', sa.text('priority DESC'), 'created_at', 'id'], unique=False,
+                    postgresql_where=QUEUED, sqlite_where=QUEUED)
+    op.create_index('ix_userstats_runs_queued', 'userstats', ['user_id'], unique=False,
+                    postgresql_where=WAITING, sqlite_where=WAITING)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_userstats_runs_queued', table_name='userstats')
+    op.drop_index('ix_trainingrun_user_id_queued', table_name='trainingrun')
+    op.create_index('ix_trainingrun_queued', 'trainingrun', ['created_at', 'id'], unique=False,
+                    postgresql_where=QUEUED, sqlite_where=QUEUED)
+    op.drop_column('trainingrun', 'priority')
+    op.drop_table('trainingshare')
@@ -0,0 +1,64 @@
+"""Add unique (source_type, source_identifier) key to model
+
+Revision ID: d5b9e3f7a2c4
+Revises: c4a8d2e6f0b1
+Create Date: 2026-10-17 23:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b9e3f7a2c4'
+down_revision: Union[str, None] = 'c4a8d2e6f0b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Duplicate catalog entries (same source) -> the lowest model id of their source
+DUPLICATES = """
+    SELECT m.id AS duplicate_id, k.keep_id
+    FROM model m
+    JOIN (
+        SELECT source_type, source_identifier, min(id) AS keep_id
+        FROM model GROUP BY source_type, source_identifier HAVING count(*) > 1
+    ) k ON k.source_type = m.source_type AND k.source_identifier = m.source_identifier
+    WHERE m.id <> k.keep_id
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Merge duplicates (the old seed script only deduplicated on source_identifier)
+    # into the oldest row, so the key can be created on an existing catalog
+    op.execute(f"CREATE TEMPORARY TABLE model_duplicate AS {DUPLICATES}")
+    op.execute("""
+        UPDATE trainingrun SET model_id = (
+            SELECT keep_id FROM model_duplicate WHERE duplicate_id = trainingrun.model_id
+        )
+        WHERE model_id IN (SELECT duplicate_id FROM model_duplicate)
+    """)
+    op.execute("""
+        INSERT INTO projectmodellink (project_id, model_id)
+        SELECT DISTINCT l.project_id, d.keep_id
+        FROM projectmodellink l JOIN model_duplicate d ON d.duplicate_id = l.model_id
+        WHERE NOT EXISTS (
+            SELECT 1 FROM projectmodellink e WHERE e.project_id = l.project_id AND e.model_id = d.keep_id
+        )
+    """)
+    op.execute("DELETE FROM projectmodellink WHERE model_id IN (SELECT duplicate_id FROM model_duplicate)")
+    op.execute("DELETE FROM model WHERE id IN (SELECT duplicate_id FROM model_duplicate)")
+    op.execute("DROP TABLE model_duplicate")
+
+    # Conflict target of the catalog upsert (INSERT ... ON CONFLICT, app/scripts/seed_models.py);
+    # its leading column also serves the source_type filter
+    op.create_index('uq_model_source', 'model', ['source_type', 'source_identifier'], unique=True)
+    op.drop_index('ix_model_source_type', table_name='model')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_model_source_type', 'model', ['source_type'], unique=False)
+    op.drop_index('uq_model_source', table_name='model')
@@ -0,0 +1,128 @@
+"""Partition trainingrun by month and add the training run archive table
+
+Revision ID: e8c1f4a6b2d9
+Revises: d5b9e3f7a2c4
+Create Date: 2026-10-18 09:15:00.000000
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c1f4a6b2d9'
+down_revision: Union[str, None] = 'd5b9e3f7a2c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Monthly partitions created ahead of the current month (the app keeps extending them)
+MONTHS_AHEAD = 3
+
+COLUMNS = """
+    id integer NOT NULL DEFAULT nextval('trainingrun_id_seq'),
+    project_id integer NOT NULL REFERENCES project (id),
+    user_id integer NOT NULL REFERENCES "user" (id),
+    model_id integer NOT NULL REFERENCES model (id),
+    dataset_id integer NOT NULL REFERENCES dataset (id),
+    status varchar NOT NULL,
+    config_params json,
+    metrics json,
+    logs_location varchar,
+    started_at timestamp without time zone,
+    completed_at timestamp without time zone,
+    created_at timestamp without time zone NOT NULL,
+    updated_at timestamp without time zone NOT NULL
+"""
+
+INDEXES = (
+    ('ix_trainingrun_dataset_id', ['dataset_id']),
+    ('ix_trainingrun_model_id', ['model_id']),
+    ('ix_trainingrun_project_id', ['project_id']),
+    ('ix_trainingrun_status', ['status']),
+    ('ix_trainingrun_user_id', ['user_id']),
+    ('ix_trainingrun_project_id_created_at', ['project_id', 'created_at']),
+)
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _partition_trainingrun() -> None:
+    bind = op.get_bind()
+    # Keep the id sequence (and its position) across the table swap
+    op.execute("ALTER SEQUENCE trainingrun_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE trainingrun RENAME TO trainingrun_unpartitioned")
+    op.execute(f"CREATE TABLE trainingrun ({COLUMNS}) PARTITION BY RANGE (created_at)")
+
+    # One partition per month from the oldest run to a few months ahead, plus a default
+    # partition for anything outside them (normally empty: partitions are created in advance,
+    # and create_monthly_partitions moves a new month's rows out of it)
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM trainingrun_unpartitioned")).scalar()
+    now = datetime.utcnow()
+    month = datetime((oldest or now).year, (oldest or now).month, 1)
+    last = _add_months(datetime(now.year, now.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE trainingrun_p{month:%Y_%m} PARTITION OF trainingrun "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_add_months(month, 1):%Y-%m-%d}')"
+        )
+        month = _add_months(month, 1)
+    op.execute("CREATE TABLE trainingrun_default PARTITION OF trainingrun DEFAULT")
+
+    op.execute("INSERT INTO trainingrun SELECT * FROM trainingrun_unpartitioned")
+    op.execute("DROP TABLE trainingrun_unpartitioned")
+    op.execute("ALTER SEQUENCE trainingrun_id_seq OWNED BY trainingrun.id")
+
+    # The partition key must be part of the primary key; ids stay unique through the sequence
+    op.execute("ALTER TABLE trainingrun ADD CONSTRAINT trainingrun_pkey PRIMARY KEY (id, created_at)")
+    for name, columns in INDEXES:
+        op.create_index(name, 'trainingrun', columns, unique=False)
+
+
+def _unpartition_trainingrun() -> None:
+    op.execute("ALTER SEQUENCE trainingrun_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE trainingrun RENAME TO trainingrun_partitioned")
+    for name, _ in INDEXES:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name}_partitioned")
+    op.execute("ALTER TABLE trainingrun_partitioned RENAME CONSTRAINT trainingrun_pkey TO trainingrun_partitioned_pkey")
+    op.execute(f"CREATE TABLE trainingrun ({COLUMNS}, PRIMARY KEY (id))")
+    op.execute("INSERT INTO trainingrun SELECT * FROM trainingrun_partitioned")
+    op.execute("DROP TABLE trainingrun_partitioned") # Drops the partitions too
+    op.execute("ALTER SEQUENCE trainingrun_id_seq OWNED BY trainingrun.id")
+    for name, columns in INDEXES:
+        op.create_index(name, 'trainingrun', columns, unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        _partition_trainingrun()
+
+    op.create_table('trainingrunarchive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.DateTime(), nullable=False),
+    sa.Column('path', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('min_id', sa.Integer(), nullable=False),
+    sa.Column('max_id', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_trainingrunarchive_min_id'), 'trainingrunarchive', ['min_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Archived runs stay in their files; they are not restored into the table
+    op.drop_index(op.f('ix_trainingrunarchive_min_id'), table_name='trainingrunarchive')
+    op.drop_table('trainingrunarchive')
+
+    if op.get_bind().dialect.name == 'postgresql':
+        _unpartition_trainingrun()
@@ -0,0 +1,51 @@
+"""Store training run config/metrics as JSONB and index them
+
+Revision ID: f2a7c9d1e4b6
+Revises: e8c1f4a6b2d9
+Create Date: 2026-10-18 14:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a7c9d1e4b6'
+down_revision: Union[str, None] = 'e8c1f4a6b2d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same as app/models/training_run.py at the time of this revision
+INDEXED_METRICS = ('accuracy', 'loss')
+
+
+def _metric_index(key: str) -> str:
+    # NULL unless the value is a number (crud_training_run.json_number builds the same expression)
+    value = f"CASE WHEN jsonb_typeof(metrics -> '{key}') = 'number' THEN CAST(metrics ->> '{key}' AS FLOAT) END"
+    return f"CREATE INDEX ix_trainingrun_project_id_metrics_{key} ON trainingrun (project_id, ({value}), id)"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        for column in ('config_params', 'metrics'):
+            op.execute(f"ALTER TABLE trainingrun ALTER COLUMN {column} TYPE jsonb USING {column}::jsonb")
+        for key in INDEXED_METRICS:
+            op.execute(_metric_index(key))
+    # config_params @> '{...}' filters (GIN on PostgreSQL; a plain index elsewhere)
+    op.create_index(
+        'ix_trainingrun_config_params', 'trainingrun', ['config_params'], unique=False,
+        postgresql_using='gin', postgresql_ops={'config_params': 'jsonb_path_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_trainingrun_config_params', table_name='trainingrun')
+    if op.get_bind().dialect.name == 'postgresql':
+        for key in INDEXED_METRICS:
+            op.execute(f"DROP INDEX ix_trainingrun_project_id_metrics_{key}")
+        for column in ('config_params', 'metrics'):
+            op.execute(f"ALTER TABLE trainingrun ALTER COLUMN {column} TYPE json USING {column}::json")
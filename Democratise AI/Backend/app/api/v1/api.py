@@ -8,6 +8,7 @@ from app.api.v1.endpoints import users # <<< IMPORT users router
 from app.api.v1.endpoints import models # <<< IMPORT models router
 from app.api.v1.endpoints import datasets # <<< IMPORT datasets router
 from app.api.v1.endpoints import training # <<< IMPORT training router
+from app.api.v1.endpoints import internal # Operational endpoints (pool metrics, ...)
 
 # Import other endpoint routers as you create them
 # from app.api.v1.endpoints import projects
@@ -26,6 +27,7 @@ api_router.include_router(users.router, prefix="/user", tags=["User Settings"])
 api_router.include_router(models.router, prefix="/models", tags=["Models"]) # <<< INCLUDE models router
 api_router.include_router(datasets.router, prefix="/datasets", tags=["Datasets"]) # <<< INCLUDE datasets router
 api_router.include_router(training.router, tags=["Training"]) # <<< INCLUDE training router (no prefix needed here)
+api_router.include_router(internal.router, prefix="/internal", tags=["Internal"])
 
 # Include other routers here later with appropriate prefixes and tags
 # api_router.include_router(projects.router, prefix="/projects", tags=["Projects"])
@@ -6,23 +6,51 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import crud # Assuming crud/__init__.py setup
 from app import models # Assuming models/__init__.py setup (optional, can import directly)
 from app import schemas # Assuming schemas/__init__.py setup
 from app.core import security
 from app.core.config import settings
-from app.db.session import SessionLocal, get_db # get_db is likely sufficient
+from app.core.principal_cache import principal_cache
+from app.db.session import DBSession, get_db, read_session
 
 # OAuth2PasswordBearer scheme pointing to the login endpoint
 # This tells FastAPI where clients should go to get the token.
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
+# Same scheme without the automatic 401, for dependencies that only peek at the token
+optional_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False
+)
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
+def _token_subject(token: Optional[str]) -> Optional[str]:
+    """
+    Returns the 'sub' claim of a valid token, or None (no error raised).
+    """
+    if not token:
+        return None
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+async def get_read_db(token: Optional[str] = Depends(optional_oauth2)):
+    """
+    Dependency for read-only (GET) endpoints: yields a session on a read replica
+    when DB_REPLICA_URIS is configured, otherwise on the primary.
+
+    Users who wrote within DB_READ_YOUR_WRITES_SECONDS stay on the primary so they
+    see their own changes. Authentication itself is still done by get_current_user.
+    """
+    async with read_session(subject=_token_subject(token)) as session:
+        yield session
+
+async def get_current_user(
+    db: DBSession = Depends(get_db), token: str = Depends(reusable_oauth2)
 ) -> models.user:
     """
     Dependency to get the current user based on the JWT token.
@@ -53,10 +81,23 @@ def get_current_user(
         # If using TokenData schema validation above and it fails
         raise credentials_exception from None
 
-    # Fetch user from database
-    user = crud.user.get_user_by_email(db, email=email)
-    if user is None:
-        raise credentials_exception # User associated with token not found
+    # Serve from the principal cache when possible (no DB round trip)
+    snapshot = principal_cache.get(email)
+    if snapshot is not None:
+        # Rebuild a clean, session-bound User without emitting SQL,
+        # so endpoints can keep modifying/adding current_user as before.
+        # (No I/O happens here, so the sync session is safe to use directly.)
+        sync_db = db.sync_session if isinstance(db, AsyncSession) else db
+        user = crud.user.attach_user_snapshot(sync_db, snapshot=snapshot)
+    else:
+        # Fetch user from database
+        user = await crud.aio.user.get_user_by_email(db=db, email=email)
+        if user is None:
+            raise credentials_exception # User associated with token not found
+        principal_cache.set(email, user.model_dump())
+
+    # Lets get_db record this user's writes for read-your-writes routing
+    db.info["principal"] = email
 
     # Optional: Check if user is active
     # if not user.is_active:
@@ -64,12 +105,12 @@ def get_current_user(
 
     return user
 
-# Optional: Dependency for superuser check (if needed later)
-# def get_current_active_superuser(
-#     current_user: models.User = Depends(get_current_user),
-# ) -> models.User:
-#     if not crud.user.is_superuser(current_user): # Assumes is_superuser function in crud
-#         raise HTTPException(
-#             status_code=status.HTTP_403_FORBIDDEN, detail="The user doesn't have enough privileges"
-#         )
-#     return current_user
\ No newline at end of file
+# Dependency for superuser-only endpoints (e.g. internal metrics)
+async def get_current_active_superuser(
+    current_user: models.user = Depends(get_current_user),
+) -> models.user:
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="The user doesn't have enough privileges"
+        )
+    return current_user
@@ -5,44 +5,49 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session
 
 from app import crud, models, schemas # Add models import
 from app.api.v1 import deps # <<< Import the new deps module
 from app.core import security
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import DBSession, get_db
+from app.services.hashing import hashing_service
 
 router = APIRouter()
 
 # ... /signup endpoint (keep as is) ...
 @router.post("/signup", response_model=schemas.UserPublic, status_code=status.HTTP_201_CREATED)
-def signup(
+async def signup(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     user_in: schemas.UserCreate,
 ) -> Any:
     # ... signup logic ...
-    user = crud.user.get_user_by_email(db, email=user_in.email)
+    user = await crud.aio.user.get_user_by_email(db=db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="An account with this email already exists.",
         )
-    user = crud.user.create_user(db=db, user_in=user_in)
+    # Hash outside the DB call so the session isn't held while bcrypt runs
+    password_hash = await hashing_service.get_password_hash_async(user_in.password)
+    user = await crud.aio.user.create_user(db=db, user_in=user_in, password_hash=password_hash)
     return user
 
 
 # ... /login endpoint (keep as is) ...
 @router.post("/login", response_model=schemas.Token)
-def login_for_access_token(
-    db: Session = Depends(get_db),
+async def login_for_access_token(
+    db: DBSession = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     # ... login logic ...
-    user = crud.user.authenticate_user(
-        db, email=form_data.username, password=form_data.password
-    )
+    # Same checks as crud.user.authenticate_user, with the bcrypt verify awaited
+    user = await crud.aio.user.get_user_by_email(db=db, email=form_data.username)
+    if user and not await hashing_service.verify_password_async(
+        form_data.password, user.password_hash
+    ):
+        user = None # Incorrect password
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -60,7 +65,7 @@ def login_for_access_token(
 
 # --- ADD THE /me ENDPOINT ---
 @router.get("/me", response_model=schemas.UserPublic)
-def read_users_me(
+async def read_users_me(
     current_user: models.user = Depends(deps.get_current_user),
 ) -> Any:
     """
@@ -1,42 +1,79 @@
 # File: app/api/v1/endpoints/datasets.py
 
-from typing import List, Any, Optional
+from typing import Any, Literal, Optional
 
 # Import Form, File, UploadFile for the upload endpoint
 from fastapi import (
     APIRouter, Depends, HTTPException, Query, status,
     Form, File, UploadFile
 )
-from sqlmodel import Session
 
 # Use specific imports
-from app.crud import crud_dataset
-from app.schemas.dataset import DatasetPublic, DatasetCreate
+from app.crud import aio
+from app.schemas.bulk import BulkResult
+from app.schemas.dataset import DatasetPublic, DatasetPublicList, DatasetCreate, DatasetBulkRequest
+from app.core.config import settings
 from app.models.user import User # Needed for current_user type hint
 from app.api.v1 import deps # Import dependencies module
-from app.db.session import get_db
+from app.db.session import DBSession, get_db
 
 router = APIRouter()
 
-@router.get("/", response_model=List[DatasetPublic])
-def list_datasets(
-    db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0, description="Number of datasets to skip"),
+@router.get("/", response_model=DatasetPublicList)
+async def list_datasets(
+    db: DBSession = Depends(deps.get_read_db),
+    storage_type: Optional[str] = Query(None, description="Only datasets with this storage type"),
+    is_public: Optional[bool] = Query(None, description="Only public (true) or only your private (false) datasets"),
+    name_prefix: Optional[str] = Query(None, max_length=100, description="Only datasets whose name starts with this"),
+    sort: Literal["-updated_at", "name"] = Query("-updated_at", description="Sort order ('-' = descending)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     limit: int = Query(100, ge=1, le=200, description="Maximum number of datasets to return"),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     """
-    Retrieve datasets accessible to the current user (owned or public).
+    Retrieve datasets accessible to the current user (owned or public), with
+    database-side filtering/sorting and cursor pagination.
+    The first page also carries the total (estimated when very large, see
+    total_is_estimate) and facet counts (per storage type and visibility).
     """
-    datasets = crud_dataset.get_multi_by_owner_or_public(
-        db=db, user_id=current_user.id, skip=skip, limit=limit
+    filters = dict(storage_type=storage_type, is_public=is_public, name_prefix=name_prefix)
+    page = await aio.dataset.get_multi_by_owner_or_public(
+        db=db, user_id=current_user.id, **filters, sort=sort, cursor=cursor, limit=limit
     )
-    return datasets
+    # Later pages reuse the facets of the first one
+    facets, facets_are_estimates = (
+        await aio.dataset.get_facets(db=db, user_id=current_user.id, **filters) if cursor is None else (None, False)
+    )
+    return DatasetPublicList(
+        items=page.items, next_cursor=page.next_cursor,
+        total=page.total, total_is_estimate=page.total_is_estimate,
+        facets=facets, facets_are_estimates=facets_are_estimates,
+    )
+
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_write_datasets(
+    *,
+    db: DBSession = Depends(get_db),
+    request: DatasetBulkRequest,
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Create, update and delete the metadata of many datasets in one request and one
+    transaction (no file content, like /upload). Items that don't exist or aren't
+    owned by the current user are skipped and reported per item.
+    """
+    operations = len(request.create) + len(request.update) + len(request.delete)
+    if operations > settings.BULK_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_MAX_OPERATIONS} operations per request",
+        )
+    return await aio.dataset.bulk_write_datasets(db=db, request=request, user_id=current_user.id)
 
 @router.get("/{dataset_id}", response_model=DatasetPublic)
-def get_dataset_details(
+async def get_dataset_details(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(deps.get_read_db),
     dataset_id: int,
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
@@ -44,7 +81,7 @@ def get_dataset_details(
     Get details for a specific dataset by ID.
     Users can access public datasets or their own private datasets.
     """
-    dataset = crud_dataset.get_dataset(db=db, id=dataset_id)
+    dataset = await aio.dataset.get_dataset(db=db, id=dataset_id)
     if not dataset:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dataset not found")
 
@@ -59,7 +96,7 @@ def get_dataset_details(
 @router.post("/upload", response_model=DatasetPublic, status_code=status.HTTP_201_CREATED)
 async def upload_dataset( # Mark as async because UploadFile operations might be async
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     # Metadata received as form fields
     name: str = Form(...),
     description: Optional[str] = Form(None),
@@ -86,7 +123,7 @@ async def upload_dataset( # Mark as async because UploadFile operations might be
     dataset_in = DatasetCreate(name=name, description=description, is_public=is_public)
 
     # Create the database record using the placeholder CRUD function
-    db_dataset = crud_dataset.create_dataset(db=db, dataset_in=dataset_in, user_id=current_user.id)
+    db_dataset = await aio.dataset.create_dataset(db=db, dataset_in=dataset_in, user_id=current_user.id)
 
     # You might add a field to the model/schema like 'upload_status'="pending" here
 
@@ -0,0 +1,19 @@
+# File: app/api/v1/endpoints/internal.py
+
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends
+
+from app.api.v1 import deps
+from app.db import pool_metrics
+
+# Internal/operational endpoints, restricted to superusers
+router = APIRouter(dependencies=[Depends(deps.get_current_active_superuser)])
+
+@router.get("/metrics/db-pool", response_model=List[Dict[str, Any]])
+async def read_db_pool_metrics() -> Any:
+    """
+    Live connection pool metrics for this worker process: connections checked out,
+    overflow in use, checkout wait time histogram and connection ages.
+    """
+    return [metrics.snapshot() for metrics in pool_metrics.registry.values()]
@@ -1,28 +1,41 @@
 # File: app/api/v1/endpoints/models.py
 
-from typing import List, Any
+from typing import Any, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlmodel import Session
 
 # Use specific imports to avoid potential __init__ issues
-from app.crud import crud_model
-from app.schemas.model import ModelPublic # Use the public schema for responses
-from app.db.session import get_db
+from app.crud import aio
+from app.schemas.model import ModelPublic, ModelPublicList # Use the public schema for responses
+from app.api.v1 import deps # get_read_db routes these reads to replicas when configured
+from app.db.session import DBSession
 
 router = APIRouter()
 
-@router.get("/", response_model=List[ModelPublic])
-def list_models(
-    db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0, description="Number of models to skip"),
+@router.get("/", response_model=ModelPublicList)
+async def list_models(
+    db: DBSession = Depends(deps.get_read_db),
+    task_type: Optional[str] = Query(None, description="Only models for this task type"),
+    framework: Optional[str] = Query(None, description="Only models for this framework"),
+    source_type: Optional[str] = Query(None, description="Only models from this source"),
+    name_prefix: Optional[str] = Query(None, max_length=100, description="Only models whose name starts with this"),
+    sort: Literal["id", "name", "-updated_at"] = Query("id", description="Sort order ('-' = descending)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     limit: int = Query(100, ge=1, le=200, description="Maximum number of models to return"),
 ) -> Any:
     """
     Retrieve a list of available models (e.g., from Hugging Face Hub cache or user uploads).
     (Currently fetches from the 'model' table).
+
+    Filtering and sorting happen in the database; the first page also carries the
+    total (estimated when very large, see total_is_estimate) and facet counts
+    (per task type, framework and source type) for the filter controls, read from
+    precomputed counts (with a name prefix: counted, estimated when very large).
     """
-    models = crud_model.get_multi(db=db, skip=skip, limit=limit)
+    filters = dict(task_type=task_type, framework=framework, source_type=source_type, name_prefix=name_prefix)
+    page = await aio.model.get_multi(db=db, **filters, sort=sort, cursor=cursor, limit=limit)
+    # Later pages reuse the facets of the first one
+    facets, facets_are_estimates = await aio.model.get_facets(db=db, **filters) if cursor is None else (None, False)
     # Note: This will return an empty list [] if no models are in the DB.
     # For a placeholder, you could return a hardcoded list here instead:
     # if not models:
@@ -30,18 +43,22 @@ def list_models(
     #         {"id": 1, "name": "BERT (bert-base-uncased)", ...},
     #         {"id": 2, "name": "ResNet-50", ...}
     #     ]
-    return models
+    return ModelPublicList(
+        items=page.items, next_cursor=page.next_cursor,
+        total=page.total, total_is_estimate=page.total_is_estimate,
+        facets=facets, facets_are_estimates=facets_are_estimates,
+    )
 
 @router.get("/{model_id}", response_model=ModelPublic)
-def get_model_details(
+async def get_model_details(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(deps.get_read_db),
     model_id: int,
 ) -> Any:
     """
     Get details for a specific model by ID.
     """
-    model = crud_model.get_model(db=db, id=model_id)
+    model = await aio.model.get_model(db=db, id=model_id)
     if not model:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Model not found")
     return model
\ No newline at end of file
@@ -1,55 +1,76 @@
 # File: app/api/v1/endpoints/projects.py
 
-from typing import List, Any
+from typing import Any, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlmodel import Session
 
 from app import crud, models, schemas # Assuming __init__.py setup for these
 from app.api.v1 import deps # Import dependencies module
-from app.db.session import get_db # Could also get from deps if preferred
+from app.core.config import settings
+from app.db.session import DBSession, get_db # Could also get from deps if preferred
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.ProjectPublic, status_code=status.HTTP_201_CREATED)
-def create_new_project(
+async def create_new_project(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     project_in: schemas.ProjectCreate,
     current_user: models.user = Depends(deps.get_current_user),
 ) -> Any:
     """
     Create a new project owned by the current user.
     """
-    project = crud.project.create_project(db=db, project_in=project_in, user_id=current_user.id)
+    project = await crud.aio.project.create_project(db=db, project_in=project_in, user_id=current_user.id)
     return project
 
-@router.get("/", response_model=List[schemas.ProjectPublic])
-def read_projects(
-    db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0, description="Number of projects to skip"),
+@router.post("/bulk", response_model=schemas.BulkResult)
+async def bulk_write_projects(
+    *,
+    db: DBSession = Depends(get_db),
+    request: schemas.ProjectBulkRequest,
+    current_user: models.user = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Create, update and delete many projects in one request and one transaction
+    (e.g. for imports/migrations). Items that don't exist or aren't owned by the
+    current user are skipped and reported per item; everything else is applied.
+    """
+    operations = len(request.create) + len(request.update) + len(request.delete)
+    if operations > settings.BULK_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_MAX_OPERATIONS} operations per request",
+        )
+    return await crud.aio.project.bulk_write_projects(db=db, request=request, user_id=current_user.id)
+
+@router.get("/", response_model=schemas.ProjectPublicList)
+async def read_projects(
+    db: DBSession = Depends(deps.get_read_db),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     limit: int = Query(100, ge=1, le=200, description="Maximum number of projects to return"),
     current_user: models.user = Depends(deps.get_current_user),
 ) -> Any:
     """
-    Retrieve projects owned by the current user, with pagination.
+    Retrieve projects owned by the current user, most recently updated first,
+    with cursor pagination. The first page also carries the total number of projects.
     """
-    projects = crud.project.get_multi_by_owner(
-        db=db, user_id=current_user.id, skip=skip, limit=limit
+    page = await crud.aio.project.get_multi_by_owner(
+        db=db, user_id=current_user.id, cursor=cursor, limit=limit
     )
-    return projects
+    return schemas.ProjectPublicList(items=page.items, next_cursor=page.next_cursor, total=page.total)
 
 @router.get("/{project_id}", response_model=schemas.ProjectPublic)
-def read_project(
+async def read_project(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(deps.get_read_db),
     project_id: int,
     current_user: models.user = Depends(deps.get_current_user),
 ) -> Any:
     """
     Get a specific project by ID. User must be the owner.
     """
-    project = crud.project.get_project(db=db, id=project_id)
+    project = await crud.aio.project.get_project(db=db, id=project_id, with_children=True)
     if not project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     # --- Authorization Check ---
@@ -59,9 +80,9 @@ def read_project(
     return project
 
 @router.put("/{project_id}", response_model=schemas.ProjectPublic)
-def update_existing_project(
+async def update_existing_project(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     project_id: int,
     project_in: schemas.ProjectUpdate,
     current_user: models.user = Depends(deps.get_current_user),
@@ -70,7 +91,7 @@ def update_existing_project(
     Update a project. User must be the owner.
     Only updates fields provided in the request body.
     """
-    db_project = crud.project.get_project(db=db, id=project_id)
+    db_project = await crud.aio.project.get_project(db=db, id=project_id)
     if not db_project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     # --- Authorization Check ---
@@ -78,21 +99,24 @@ def update_existing_project(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update this project")
     # --- End Authorization Check ---
 
-    updated_project = crud.project.update_project(db=db, db_obj=db_project, obj_in=project_in)
+    updated_project = await crud.aio.project.update_project(db=db, db_obj=db_project, obj_in=project_in)
     return updated_project
 
-@router.delete("/{project_id}", response_model=schemas.ProjectPublic)
-def delete_project(
+@router.delete("/{project_id}", response_model=schemas.ProjectPublic, status_code=status.HTTP_202_ACCEPTED)
+async def delete_project(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     project_id: int,
     current_user: models.user = Depends(deps.get_current_user),
 ) -> Any:
     """
     Delete a project. User must be the owner.
-    Returns the deleted project data.
+
+    The project is marked 'deleting' and disappears from the API immediately; its
+    training runs and links are purged in the background (202 Accepted).
+    Returns the project data, without children.
     """
-    db_project = crud.project.get_project(db=db, id=project_id) # Check existence and ownership first
+    db_project = await crud.aio.project.get_project(db=db, id=project_id) # Check existence and ownership first
     if not db_project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     # --- Authorization Check ---
@@ -100,12 +124,11 @@ def delete_project(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this project")
     # --- End Authorization Check ---
 
-    # Call the remove function which handles the actual deletion
-    deleted_project = crud.project.remove_project(db=db, id=project_id)
-    # The remove_project function already fetched the object, so we can return it
-    # If remove_project returned None unexpectedly (e.g., race condition), handle it
+    # Tombstones the project (see crud_project.remove_project)
+    deleted_project = await crud.aio.project.remove_project(db=db, id=project_id)
+    # If remove_project returned None unexpectedly (e.g., deleted concurrently), handle it
     if not deleted_project:
-         # This shouldn't happen if the initial check passed, but good practice
          raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found during deletion")
 
-    return deleted_project # Return the data of the deleted object
\ No newline at end of file
+    # Column values only: loading the children of a large project is what deletion avoids
+    return schemas.ProjectPublic.model_validate(deleted_project.model_dump())
@@ -1,16 +1,27 @@
 # File: app/api/v1/endpoints/training.py
 
-from typing import Any
+import json
+import os
+import re
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
 # Use specific imports
-from app.crud import crud_training_run, crud_project, crud_model, crud_dataset # Need project CRUD to check ownership
-from app.schemas.training_run import TrainingRunCreate, TrainingRunPublic
+from app.crud import aio # Awaitable CRUD: aio.training_run, aio.project (ownership checks), ...
+from app.crud import crud_training_run # Archive reads (file I/O, run in the threadpool), errors
+from app.schemas.training_metric import MetricAppendResult, MetricPointsIn, TrainingRunMetrics
+from app.schemas.training_run import TrainingRunCreate, TrainingRunPublic, TrainingRunPublicList
 from app.models.user import User # Needed for current_user type hint
 from app.api.v1 import deps # Import dependencies module
-from app.db.session import get_db
+from app.core.config import settings
+from app.db.session import DBSession, get_db, read_session
+from app.services.downsample import METHODS
+from app.services.log_store import log_store
+from app.services.run_events import RESYNC, Subscription, run_event, run_event_hub
 
 
 router = APIRouter()
@@ -23,11 +34,15 @@ router = APIRouter()
     response_model=TrainingRunPublic,
     status_code=status.HTTP_202_ACCEPTED # 202 Accepted is suitable for queuing tasks
 )
-def submit_training_job(
+async def submit_training_job(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     project_id: int,
     run_in: TrainingRunCreate, # Contains model_id, dataset_id, config_params
+    response: Response,
+    idempotency_key: Optional[str] = Header(
+        None, max_length=255, description="Client-chosen key: retries with the same key return the same run"
+    ),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     """
@@ -35,22 +50,25 @@ def submit_training_job(
 
     - Checks if the project exists and belongs to the user.
     - Creates a TrainingRun record in the database with 'queued' status.
-    - **Placeholder:** Does NOT actually queue or execute a training task.
+    - Repeated submissions (same Idempotency-Key, or an identical job still queued)
+      return the existing run with an `Idempotent-Replayed: true` header.
+    - The run is picked up by a training worker (`python -m app.worker`), which moves it
+      through 'starting' and 'running' to 'completed' or 'failed'.
     """
     # 1. Verify project existence and ownership
-    project = crud_project.get_project(db=db, id=project_id)
+    project = await aio.project.get_project(db=db, id=project_id)
     if not project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     if project.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to train models for this project")
-    model = crud_model.get_model(db=db, id=run_in.model_id)
+    model = await aio.model.get_model(db=db, id=run_in.model_id)
     if not model:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Model with id {run_in.model_id} not found.",
         )
 
-    dataset = crud_dataset.get_dataset(db=db, id=run_in.dataset_id)
+    dataset = await aio.dataset.get_dataset(db=db, id=run_in.dataset_id)
     if not dataset:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -63,33 +81,55 @@ def submit_training_job(
 
 
     # 2. Create the TrainingRun record in the DB (Now we know IDs are likely valid)
-    training_run = crud_training_run.create_training_run(
-        db=db, run_in=run_in, project_id=project_id, user_id=current_user.id
-    )
-    # Optional TODO: Verify that model_id and dataset_id exist and are associated with the project
-
-    # 2. Create the TrainingRun record in the DB
-    training_run = crud_training_run.create_training_run(
-        db=db, run_in=run_in, project_id=project_id, user_id=current_user.id
-    )
-
-    print(f"--- Placeholder: Training job {training_run.id} created with status 'queued'. ---")
-    print(f"--- Actual queuing/execution to be implemented later. ---")
-
+    try:
+        training_run, created = await aio.training_run.submit_training_run(
+            db=db, run_in=run_in, project_id=project_id, user_id=current_user.id, idempotency_key=idempotency_key
+        )
+    except crud_training_run.IdempotencyKeyReused as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    if not created:
+        response.headers["Idempotent-Replayed"] = "true"
     return training_run
 
 
-@router.get("/training/jobs/{job_id}", response_model=TrainingRunPublic)
-def get_training_job_status(
+@router.get("/projects/{project_id}/runs", response_model=TrainingRunPublicList)
+async def query_project_runs(
     *,
-    db: Session = Depends(get_db),
-    job_id: int,
+    db: DBSession = Depends(deps.get_read_db),
+    project_id: int,
+    status_: Optional[str] = Query(None, alias="status", description="Only runs with this status"),
+    config: List[str] = Query([], description="config_params filters, key=value (repeatable), e.g. optimizer=adam"),
+    metric: List[str] = Query([], description="metrics filters, key<op>number (repeatable), e.g. accuracy>0.9"),
+    sort: str = Query("-created_at", description="created_at, metrics.<key> or config.<key>; '-' = descending"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=200, description="Maximum number of runs to return"),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     """
-    Get the status and details of a specific training job (TrainingRun record).
+    Query a project's training runs by config and metric values, e.g. the most accurate
+    runs: ?metric=accuracy>0.9&sort=-metrics.accuracy. Filtering and sorting happen in
+    the database (indexed for common metrics), with cursor pagination.
     """
-    training_run = crud_training_run.get_training_run(db=db, id=job_id)
+    project = await aio.project.get_project(db=db, id=project_id)
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    if project.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view this project's runs")
+
+    page = await aio.training_run.query_project_runs(
+        db=db, project_id=project_id, status=status_, config=config, metrics=metric,
+        sort=sort, cursor=cursor, limit=limit,
+    )
+    return TrainingRunPublicList(items=page.items, next_cursor=page.next_cursor)
+
+async def _read_training_job(db: DBSession, job_id: int, current_user: User) -> Any:
+    # The job (live or archived), if it's the current user's; raises 404/403 otherwise
+    training_run = await aio.training_run.get_training_run(db=db, id=job_id)
+    if not training_run:
+        # Finished runs of old months are moved to archive files (app/services/training_run_maintenance.py)
+        archives = await aio.training_run.get_archives_for_run(db=db, id=job_id)
+        if archives:
+            training_run = await run_in_threadpool(crud_training_run.read_archived_training_run, archives, job_id)
 
     if not training_run:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Training job not found")
@@ -101,4 +141,295 @@ def get_training_job_status(
          raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view this training job")
     # --- End Authorization Check ---
 
-    return training_run
\ No newline at end of file
+    return training_run
+
+@router.get("/training/jobs/{job_id}", response_model=TrainingRunPublic)
+async def get_training_job_status(
+    *,
+    db: DBSession = Depends(deps.get_read_db),
+    job_id: int,
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Get the status and details of a specific training job (TrainingRun record).
+    """
+    return await _read_training_job(db, job_id, current_user)
+
+# Statuses after which a run no longer changes (its event stream ends)
+FINAL_STATUSES = ("completed", "failed", "cancelled")
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def _stream_run_events(subscription: Subscription, run: Any) -> AsyncIterator[str]:
+    # The run as it is, then its changes until it finishes or the client leaves
+    try:
+        yield f"retry: {int(settings.TRAINING_EVENTS_RETRY_SECONDS * 1000)}\n\n" # Client reconnect delay
+        yield _sse("run", TrainingRunPublic.model_validate(run).model_dump(mode="json"))
+        last = run_event(run)
+        while last["status"] not in FINAL_STATUSES:
+            event = await subscription.get(timeout=settings.TRAINING_EVENTS_KEEPALIVE_SECONDS)
+            if event is None and run_event_hub.listening:
+                yield ": keepalive\n\n" # Keeps proxies from closing an idle stream
+                continue
+            if isinstance(event, dict) and event.get("type") == "metrics":
+                yield _sse("metrics", event["latest"])
+                continue
+            if event is None or event is RESYNC or event.get("metrics_truncated"):
+                # Missed events, no NOTIFY (polling), or an event without its metrics: read the run
+                async with read_session() as db:
+                    current = await aio.training_run.get_training_run(db=db, id=subscription.run_id)
+                if current is None:
+                    return # Deleted with its project
+                event = run_event(current)
+            if event["status"] == last["status"] and event["updated_at"] == last["updated_at"]:
+                continue
+            yield _sse("status", event)
+            last = event
+    finally:
+        subscription.close()
+
+@router.get("/training/jobs/{job_id}/events")
+async def stream_training_job_events(
+    *,
+    db: DBSession = Depends(deps.get_read_db),
+    job_id: int,
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Follow a training job as Server-Sent Events, instead of polling GET /training/jobs/{job_id}.
+
+    - `run`: the job when the stream opens (as returned by GET /training/jobs/{job_id}).
+    - `status`: each change of the job (status, attempts, error, metrics, updated_at).
+    - `metrics`: new per-step metrics, the last point of each ({metric: {step, value}};
+      see GET /training/jobs/{job_id}/metrics for the curves). Not sent without NOTIFY.
+
+    The stream ends once the job is completed, failed or cancelled. Changes are pushed
+    by the workers through PostgreSQL NOTIFY: an open stream costs no database queries.
+    """
+    # Subscribe before reading the run, so no change between the two is missed
+    subscription = run_event_hub.subscribe(job_id)
+    try:
+        training_run = await _read_training_job(db, job_id, current_user)
+    except BaseException:
+        subscription.close()
+        raise
+
+    return StreamingResponse(
+        _stream_run_events(subscription, training_run),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}, # No proxy buffering
+    )
+
+
+@router.post("/training/jobs/{job_id}/metrics", response_model=MetricAppendResult)
+async def append_training_job_metrics(
+    *,
+    db: DBSession = Depends(get_db),
+    job_id: int,
+    metrics_in: MetricPointsIn,
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Append per-step metrics (e.g. the loss of every step) to a job while it runs, in
+    batches of up to 10000 points. Steps at or before a metric's last stored step are
+    skipped, so a retried batch is harmless. Jobs run by the platform's executor report
+    their metrics themselves.
+    """
+    training_run = await _read_training_job(db, job_id, current_user)
+    if training_run.status not in crud_training_run.CLAIMED_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Metrics can only be appended while the job runs (it is {training_run.status})",
+        )
+    appended = await aio.training_metric.append_metrics(
+        db=db, run_id=job_id, project_id=training_run.project_id,
+        points=[(point.metric, point.step, point.value) for point in metrics_in.points],
+    )
+    return MetricAppendResult(appended=appended)
+
+@router.get("/training/jobs/{job_id}/metrics", response_model=TrainingRunMetrics)
+async def get_training_job_metrics(
+    *,
+    db: DBSession = Depends(deps.get_read_db),
+    job_id: int,
+    metric: List[str] = Query([], description="Metrics to return (repeatable; default: all of the job's)"),
+    from_: Optional[int] = Query(None, alias="from", ge=0, description="First step of the range"),
+    to: Optional[int] = Query(None, ge=0, description="Last step of the range"),
+    points: int = Query(500, ge=2, le=10000, description="Maximum number of points per metric"),
+    method: str = Query("lttb", pattern=f"^({'|'.join(METHODS)})$", description="lttb (shape) or minmax (spikes)"),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Per-step metric curves of a job, e.g. ?metric=loss&points=500 for a loss chart.
+    Series are downsampled on the server to at most `points` points (LTTB by default,
+    or min-max), so a chart of a million-step run is a few kilobytes; zoom in with
+    `from`/`to` for detail.
+    """
+    await _read_training_job(db, job_id, current_user)
+    names = metric or await aio.training_metric.list_metrics(db=db, run_id=job_id)
+    series = [
+        await aio.training_metric.query_metric(
+            db=db, run_id=job_id, metric=name, start=from_, end=to, points=points, method=method
+        )
+        for name in names
+    ]
+    return TrainingRunMetrics(run_id=job_id, series=series)
+
+
+_BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_FOLLOW_READ_BYTES = 1 << 16 # Most log bytes sent per `log` event
+
+def _byte_range(range_header: Optional[str], offset: int, limit: Optional[int], size: int) -> Tuple[int, int, bool]:
+    # The [start, end) bytes requested, and whether by a Range header (answered with 206)
+    match = _BYTE_RANGE.match(range_header.strip()) if range_header else None
+    first, last = match.groups() if match else (None, None)
+    # Other forms (e.g. several ranges) and invalid ones (bytes=5-3) are ignored (RFC 9110): the whole log
+    if (first or last) and not (first and last and int(last) < int(first)):
+        if not first:
+            start, end = max(size - int(last), 0), size # bytes=-N: the last N bytes
+            if int(last) == 0:
+                start = size
+        else:
+            start, end = int(first), size if not last else min(int(last) + 1, size)
+        if start >= size:
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail="Range outside the log", headers={"Content-Range": f"bytes */{size}"},
+            )
+        return start, end, True
+    start = max(size + offset, 0) if offset < 0 else min(offset, size) # Negative: from the end (tail)
+    return start, size if limit is None else min(start + limit, size), False
+
+def _accepts(accept_encoding: Optional[str], codec: str) -> bool:
+    # Whether Accept-Encoding lists `codec` (and not with q=0)
+    for item in (accept_encoding or "").split(","):
+        token, _, params = item.partition(";")
+        if token.strip().lower() == codec:
+            return not re.fullmatch(r"q=0(\.0*)?", params.replace(" ", ""))
+    return False
+
+def _read_log(job_id: int, start: int, end: int) -> bytes:
+    return b"".join(log_store.read(job_id, start, end))
+
+async def _follow_log(subscription: Subscription, run: Any, offset: int) -> AsyncIterator[str]:
+    # The log from `offset`, then its new output as it is written, until the run is over
+    try:
+        yield f"retry: {int(settings.TRAINING_EVENTS_RETRY_SECONDS * 1000)}\n\n"
+        run_status, checked = run.status, time.monotonic()
+        sent = time.monotonic()
+        while True:
+            finished = run_status in FINAL_STATUSES # Checked before reading: the log is complete then
+            stat = await run_in_threadpool(log_store.stat, run.id)
+            size = stat["size"] if stat else 0
+            offset = min(offset, size)
+            while offset < size:
+                data = await run_in_threadpool(_read_log, run.id, offset, min(offset + _FOLLOW_READ_BYTES, size))
+                if not data:
+                    break
+                if not finished:
+                    # Whole lines only (no split characters), unless a line fills a whole event
+                    cut = data.rfind(b"\n") + 1
+                    if cut:
+                        data = data[:cut]
+                    elif len(data) < _FOLLOW_READ_BYTES:
+                        break
+                # The event id is the offset to resume from (sent back as Last-Event-ID on reconnect)
+                yield f"id: {offset + len(data)}\n" + _sse("log", {"offset": offset, "text": data.decode("utf-8", "replace")})
+                offset += len(data)
+                sent = time.monotonic()
+            if finished:
+                yield _sse("end", {"status": run_status, "size": offset})
+                return
+
+            event = await subscription.get(timeout=settings.TRAINING_LOG_FOLLOW_POLL_SECONDS)
+            if isinstance(event, dict) and "status" in event:
+                run_status = event["status"]
+            elif event is RESYNC or (
+                not run_event_hub.listening and time.monotonic() - checked >= settings.TRAINING_EVENTS_KEEPALIVE_SECONDS
+            ):
+                # Missed events, or no NOTIFY (polling): read the run's status
+                async with read_session() as db:
+                    current = await aio.training_run.get_training_run(db=db, id=run.id)
+                if current is None:
+                    return # Deleted with its project
+                run_status, checked = current.status, time.monotonic()
+            if time.monotonic() - sent >= settings.TRAINING_EVENTS_KEEPALIVE_SECONDS:
+                yield ": keepalive\n\n"
+                sent = time.monotonic()
+    finally:
+        subscription.close()
+
+@router.get("/training/jobs/{job_id}/logs")
+async def get_training_job_logs(
+    *,
+    db: DBSession = Depends(deps.get_read_db),
+    job_id: int,
+    offset: int = Query(0, description="First byte to return; negative: that many bytes from the end"),
+    limit: Optional[int] = Query(None, ge=0, description="Maximum number of bytes to return"),
+    follow: bool = Query(False, description="Stream the log, then its new output, as Server-Sent Events"),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    accept_encoding: Optional[str] = Header(None),
+    last_event_id: Optional[str] = Header(None),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    The log of a training job (the output of its process, across attempts).
+
+    - Byte ranges: `Range: bytes=0-1023` (206 Partial Content), `bytes=-4096` for the end,
+      or `offset`/`limit` (`offset=-4096` to tail). X-Log-Size is the log's size so far,
+      X-Log-Complete whether the job is over (the log won't grow).
+    - `follow=true`: Server-Sent Events `log` ({offset, text}, whole lines while the job
+      runs; the event id is the offset to resume from, so reconnects continue where they
+      left off) until `end` ({status, size}) once the job is over.
+    - Logs of finished jobs are stored compressed: the whole log is sent compressed
+      (Content-Encoding gzip or zstd) to clients that accept it, ranges are decompressed.
+
+    The log is read from disk in pieces, however large it is.
+    """
+    if follow:
+        subscription = run_event_hub.subscribe(job_id)
+        try:
+            training_run = await _read_training_job(db, job_id, current_user)
+        except BaseException:
+            subscription.close()
+            raise
+        start = int(last_event_id) if last_event_id and last_event_id.isdigit() else max(offset, 0)
+        return StreamingResponse(
+            _follow_log(subscription, training_run, start),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    training_run = await _read_training_job(db, job_id, current_user)
+    stat = await run_in_threadpool(log_store.stat, job_id) or {"size": 0, "codec": None}
+    size = stat["size"]
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Vary": "Accept-Encoding",
+        "X-Log-Size": str(size),
+        "X-Log-Complete": "true" if training_run.status in FINAL_STATUSES else "false",
+    }
+    if range_header is None and offset == 0 and limit is None and stat["codec"] and _accepts(accept_encoding, stat["codec"]):
+        # The whole compressed log, as stored
+        compressed = await run_in_threadpool(log_store.open_compressed, job_id, stat["codec"])
+        if compressed is not None:
+            def stream_file() -> Any:
+                with compressed:
+                    while piece := compressed.read(1 << 16):
+                        yield piece
+            headers.pop("Accept-Ranges") # Ranges are of the decompressed log
+            headers["Content-Encoding"] = stat["codec"]
+            headers["Content-Length"] = str(os.fstat(compressed.fileno()).st_size)
+            return StreamingResponse(stream_file(), media_type="text/plain; charset=utf-8", headers=headers)
+
+    start, end, partial = _byte_range(range_header, offset, limit, size)
+    headers["Content-Length"] = str(end - start)
+    if partial:
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    return StreamingResponse(
+        log_store.read(job_id, start, end), # A sync iterator: read in the threadpool
+        status_code=status.HTTP_206_PARTIAL_CONTENT if partial else status.HTTP_200_OK,
+        media_type="text/plain; charset=utf-8",
+        headers=headers,
+    )
@@ -3,33 +3,53 @@
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
 
 # --- MODIFIED IMPORTS ---
 # from app import crud, models, schemas # Remove this general import
 
 # Import specific CRUD module/functions
-from app.crud import crud_user
+from app.crud import aio
+from app.crud.crud_user_stats import RUN_STATUSES
 # Import specific Models needed
 from app.models.user import User
 # Import specific Schemas needed
 from app.schemas.user import UserPublic, UserUpdateProfile, UserUpdatePassword
 from app.schemas.msg import Msg
+from app.schemas.user_stats import UserStatsPublic
 
 from app.api.v1 import deps
-from app.core import security
+from app.services.hashing import hashing_service
 # Settings might not be needed directly here, but keep if used elsewhere
 # from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import DBSession, get_db
 # --- END MODIFIED IMPORTS ---
 
 router = APIRouter()
 
+@router.get("/stats", response_model=UserStatsPublic)
+async def read_user_stats(
+    *,
+    db: DBSession = Depends(deps.get_read_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Dashboard counts of the current user: projects, datasets and training runs by status.
+    Reads one pre-aggregated row (maintained on every write), however much the user owns.
+    """
+    stats = await aio.user_stats.get_user_stats(db=db, user_id=current_user.id)
+    if stats is None:
+        return UserStatsPublic(projects=0, datasets=0, runs={status: 0 for status in RUN_STATUSES}, runs_total=0)
+    runs = {status: getattr(stats, f"runs_{status}") for status in RUN_STATUSES}
+    return UserStatsPublic(
+        projects=stats.projects, datasets=stats.datasets, runs=runs, runs_total=sum(runs.values()),
+        updated_at=stats.updated_at,
+    )
+
 # --- Use directly imported Schema name ---
 @router.put("/profile", response_model=UserPublic)
-def update_user_profile(
+async def update_user_profile(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     user_in: UserUpdateProfile, # Use direct schema name
     current_user: User = Depends(deps.get_current_user), # Use direct model name
 ) -> Any:
@@ -38,7 +58,7 @@ def update_user_profile(
     """
     if user_in.email and user_in.email != current_user.email:
         # Use direct crud module name
-        existing_user = crud_user.get_user_by_email(db, email=user_in.email)
+        existing_user = await aio.user.get_user_by_email(db=db, email=user_in.email)
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -46,28 +66,26 @@ def update_user_profile(
             )
 
     # Use direct crud module name
-    updated_user = crud_user.update_user(db=db, db_obj=current_user, obj_in=user_in)
+    updated_user = await aio.user.update_user(db=db, db_obj=current_user, obj_in=user_in)
     return updated_user
 
 
 # --- Use directly imported Schema name ---
 @router.put("/password", response_model=Msg)
-def update_user_password(
+async def update_user_password(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     password_in: UserUpdatePassword, # Use direct schema name
     current_user: User = Depends(deps.get_current_user), # Use direct model name
 ) -> Any:
     """
     Update current user's password.
     """
-    if not security.verify_password(password_in.current_password, current_user.password_hash):
+    if not await hashing_service.verify_password_async(password_in.current_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect current password",
         )
-    hashed_password = security.get_password_hash(password_in.new_password)
-    current_user.password_hash = hashed_password
-    db.add(current_user)
-    db.commit()
+    hashed_password = await hashing_service.get_password_hash_async(password_in.new_password)
+    await aio.user.update_password(db=db, db_obj=current_user, password_hash=hashed_password)
     return {"message": "Password updated successfully"}
\ No newline at end of file
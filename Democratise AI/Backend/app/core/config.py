@@ -1,12 +1,21 @@
 # File: app/core/config.py
 
-from typing import Any, List, Optional
+from typing import Any, List, Literal, Optional
 
 # Core Pydantic imports for settings and validation
 from pydantic import AnyHttpUrl, PostgresDsn, field_validator, ValidationError
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+def to_async_database_uri(uri: str) -> str:
+    """
+    Swaps the driver part of a database URL for asyncpg,
+    e.g. postgresql+psycopg2://... -> postgresql+asyncpg://...
+    """
+    scheme, _, rest = uri.partition("://")
+    return f"{scheme.split('+')[0]}+asyncpg://{rest}"
+
+
 class Settings(BaseSettings):
     """
     Application Settings loaded from environment variables and .env file.
@@ -80,11 +89,121 @@ class Settings(BaseSettings):
         # Pydantic will take this string and validate it against the PostgresDsn type hint.
         return f"postgresql+psycopg2://{user}:{password}@{server}:{port}/{db}"
 
+    # Connection pool settings (per worker process; apply to every engine, sync or async)
+    DB_POOL_SIZE: int = 5  # Connections kept open in the pool
+    DB_MAX_OVERFLOW: int = 10  # Extra connections allowed beyond DB_POOL_SIZE under load
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection ("QueuePool limit" error)
+    DB_POOL_RECYCLE: int = -1  # Replace connections older than N seconds (-1 = never)
+    # Pre-ping strategy on checkout:
+    #   "always" - ping every checkout (one extra round trip per request)
+    #   "idle"   - ping only connections idle for more than DB_POOL_PRE_PING_IDLE_SECONDS
+    #   "never"  - no ping (rely on DB_POOL_RECYCLE)
+    DB_POOL_PRE_PING: Literal["always", "idle", "never"] = "always"
+    DB_POOL_PRE_PING_IDLE_SECONDS: float = 30.0
+
+    # Async database stack (asyncpg). When enabled, get_db yields an AsyncSession
+    # instead of a sync Session, so both stacks can be benchmarked side by side.
+    DB_ASYNC_ENABLED: bool = False
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[str] = None
+
+    @field_validator("SQLALCHEMY_ASYNC_DATABASE_URI", mode='before')
+    @classmethod
+    def assemble_async_db_connection(cls, v: Optional[str], info) -> Any:
+        """
+        Derives the asyncpg connection string from SQLALCHEMY_DATABASE_URI
+        if SQLALCHEMY_ASYNC_DATABASE_URI is not set directly in the environment.
+        """
+        if isinstance(v, str) and v:
+            return v
+        sync_uri = info.data.get("SQLALCHEMY_DATABASE_URI")
+        if not sync_uri:
+            return None
+        return to_async_database_uri(str(sync_uri))
+
+    # Read replicas (optional)
+    # Comma-separated SQLAlchemy URLs (sync driver); read-only GET endpoints are routed to them
+    DB_REPLICA_URIS: str = ""
+    DB_REPLICA_RETRY_SECONDS: float = 30.0  # How long a failed replica is skipped before being retried
+    # A user's reads go to the primary for this long after they write. Remembered per process:
+    # with several workers/servers, route a user's requests to the same one (sticky sessions),
+    # or a read on another one may still hit a replica that hasn't caught up
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    @property
+    def replica_uris(self) -> List[str]:
+        """Parsed DB_REPLICA_URIS (empty list if no replicas are configured)."""
+        return [uri.strip() for uri in self.DB_REPLICA_URIS.split(",") if uri.strip()]
+
+    # SQL instrumentation (app/db/query_stats.py)
+    DB_SLOW_QUERY_MS: float = 200.0  # Log statements slower than this (0 = no slow-query log)
+    DB_N_PLUS_ONE_THRESHOLD: int = 10  # Warn when a request runs the same statement this often (0 = off)
+    SERVER_TIMING_ENABLED: bool = True  # Add a Server-Timing header (query count, DB time) to responses
+
+    # List totals: counts above this are reported as a planner estimate (total_is_estimate=true)
+    # instead of being counted row by row (PostgreSQL only; other databases always count exactly)
+    LIST_TOTAL_EXACT_LIMIT: int = 10000
+
+    # Bulk endpoints (/projects/bulk, /datasets/bulk): max create+update+delete operations per request
+    BULK_MAX_OPERATIONS: int = 10000
+
+    # Project deletion: DELETE marks the project 'deleting'; a background purger (app/services/purger.py)
+    # removes its training runs and links in batches, each in its own short transaction
+    PROJECT_PURGE_ENABLED: bool = True  # Run the purger in this process (disable on all but a few workers if needed)
+    PROJECT_PURGE_BATCH_SIZE: int = 1000  # Max rows deleted per transaction
+    PROJECT_PURGE_INTERVAL_SECONDS: float = 5.0  # Pause between checks when there is nothing to purge
+    PROJECT_PURGE_LOCK_TIMEOUT_MS: int = 2000  # Give up a batch (retried later) rather than wait longer for a lock (PostgreSQL)
+
+    # Training run partitions and archive (app/services/training_run_maintenance.py)
+    TRAINING_RUN_MAINTENANCE_ENABLED: bool = True  # Run the maintenance task in this process
+    TRAINING_RUN_MAINTENANCE_INTERVAL_SECONDS: float = 3600.0
+    TRAINING_RUN_PARTITION_MONTHS_AHEAD: int = 3  # Monthly partitions created ahead of time (PostgreSQL)
+    TRAINING_RUN_ARCHIVE_AFTER_DAYS: int = 180  # Finished runs of months older than this are archived (0 = never)
+    TRAINING_RUN_ARCHIVE_DIR: str = "archive/training_runs"  # Where the gzipped JSON Lines archives are written
+
+    # Training job submission (POST /projects/{id}/train)
+    TRAINING_IDEMPOTENCY_KEY_TTL_HOURS: int = 24  # How long an Idempotency-Key returns the run it created
+    TRAINING_SUBMIT_DEDUPE_SECONDS: float = 60.0  # An identical submission within this window returns the queued run (0 = off)
+
+    # Training workers (python -m app.worker, app/services/training_worker.py)
+    TRAINING_WORKER_PROCESSES: int = 2  # Worker processes, each running one training run at a time
+    TRAINING_WORKER_POLL_SECONDS: float = 1.0  # Wait between claim attempts while the queue is empty
+    TRAINING_WORKER_LEASE_SECONDS: float = 60.0  # A claimed run not heartbeated for this long is requeued
+    TRAINING_WORKER_MAX_ATTEMPTS: int = 3  # Runs whose worker was lost this many times are failed instead
+    TRAINING_MAX_ACTIVE_RUNS_PER_USER: int = 0  # Starting + running runs per user (0 = no cap; TrainingShare overrides)
+
+    # Local training executor (app/services/executor.py): runs each training run in a subprocess
+    # confined to slots of the node, one CPU and an equal share of the memory per slot
+    TRAINING_EXECUTOR_CPUS: int = 0  # Slots of this node (0 = the CPUs this process may run on)
+    TRAINING_EXECUTOR_MEMORY_MB: int = 0  # Memory shared by the slots (0 = 80% of the physical memory)
+    TRAINING_EXECUTOR_SLOTS_DIR: str = "run/training_slots"  # Slot lock files, shared by the node's workers
+    TRAINING_EXECUTOR_WORK_DIR: str = "run/training_jobs"  # Per-run job spec and result files
+    TRAINING_JOB_TIMEOUT_SECONDS: float = 86400.0  # Runs training for longer are killed and failed
+    TRAINING_LOG_DIR: str = "logs/training_runs"  # One log file per run (the training process output); shared with the API servers
+    TRAINING_LOG_COMPRESSION: str = "gzip"  # Codec of the logs of finished runs: gzip, zstd (needs zstandard) or none
+    TRAINING_LOG_COMPRESSION_LEVEL: int = 6  # gzip 1-9, zstd 1-22
+    TRAINING_LOG_FOLLOW_POLL_SECONDS: float = 1.0  # How often a followed log is checked for new output
+    TRAINING_METRIC_CHUNK_POINTS: int = 256  # Per-step metric points stored together (app/models/training_metric.py)
+
+    # Training run event streams (GET /training/jobs/{id}/events, app/services/run_events.py)
+    TRAINING_EVENTS_KEEPALIVE_SECONDS: float = 15.0  # Comment sent on idle streams (also the poll interval without NOTIFY)
+    TRAINING_EVENTS_QUEUE_SIZE: int = 100  # Events buffered per stream; a client further behind reads its run again
+    TRAINING_EVENTS_RETRY_SECONDS: float = 5.0  # Wait before reopening a lost LISTEN connection
+
     # JWT Settings (Expected to be in .env file)
     SECRET_KEY: str  # Needs a strong, random secret key
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30  # Access token validity period (in minutes)
 
+    # Principal cache used by deps.get_current_user to avoid a user lookup per request
+    # Entries are keyed by the token subject and expire after the TTL (set TTL to 0 to disable)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 1024  # Max number of cached users (LRU eviction)
+
+    # Password hashing service (bcrypt runs in a dedicated process pool, see app/services/hashing.py)
+    PASSWORD_HASHING_WORKERS: int = 2  # Number of hashing processes (0 = hash inline in the calling thread)
+    PASSWORD_HASHING_MAX_PENDING: int = 32  # Queued hash/verify calls allowed beyond the busy workers
+    PASSWORD_HASHING_TIMEOUT_SECONDS: float = 10.0  # Max time a request waits for its hash result
+
     # CORS Origins (List of allowed origins for Cross-Origin Resource Sharing)
     # Adjust these based on your frontend's deployment URL(s)
     BACKEND_CORS_ORIGINS: str =  "http://localhost","http://localhost:5173",  "http://localhost:3000", "http://127.0.0.1:5173", "http://127.0.0.1:3000"
@@ -0,0 +1,77 @@
+# File: app/core/principal_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+
+class PrincipalCache:
+    """
+    Bounded, thread-safe TTL/LRU cache of user column values keyed by token subject.
+
+    Only plain column values are stored (never ORM instances), so cached entries
+    are safe to share between requests and sessions. Callers rebuild a session-bound
+    User from the snapshot (see deps.get_current_user).
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, subject: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached snapshot for a subject, or None if missing/expired.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if expires_at <= time.monotonic():
+                del self._entries[subject] # Expired, drop it
+                return None
+            self._entries.move_to_end(subject) # Mark as most recently used
+            return dict(snapshot)
+
+    def set(self, subject: str, snapshot: Dict[str, Any]) -> None:
+        """
+        Stores a snapshot for a subject, evicting the least recently used entries if full.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self.ttl_seconds, dict(snapshot))
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *subjects: Optional[str]) -> None:
+        """
+        Drops the given subjects (e.g. old and new email after a profile update).
+        """
+        with self._lock:
+            for subject in subjects:
+                if subject is not None:
+                    self._entries.pop(subject, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Process-wide instance (each worker process has its own cache)
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
@@ -4,4 +4,6 @@ from app.crud import crud_project as project # <<< ADD THIS LINE
 from app.crud import crud_model as model # <<< ADD THIS LINE
 from app.crud import crud_dataset as dataset # <<< ADD THIS LINE
 from app.crud import crud_training_run as training_run # <<< ADD THIS LINE
+from app.crud import crud_training_metric as training_metric
 
+from app.crud import aio # Awaitable versions of the modules above (used by async endpoints)
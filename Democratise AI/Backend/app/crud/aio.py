@@ -0,0 +1,62 @@
+# File: app/crud/aio.py
+
+import functools
+from typing import Any, Callable, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.crud import (
+    crud_user, crud_project, crud_model, crud_dataset, crud_training_run, crud_training_metric, crud_user_stats,
+)
+from app.db.session import DBSession
+
+T = TypeVar("T")
+
+
+async def run_db(db: DBSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Awaits a sync CRUD function against either session flavour.
+
+    - AsyncSession (asyncpg): runs the function via `run_sync`, so all I/O happens
+      on the event loop without holding a threadpool thread.
+    - Session (psycopg2): runs the function in the threadpool.
+
+    The session is always passed to `fn` as the `db` keyword argument.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(lambda session: fn(*args, db=session, **kwargs))
+    return await run_in_threadpool(functools.partial(fn, *args, db=db, **kwargs))
+
+
+class AsyncCRUD:
+    """
+    Awaitable view of a sync CRUD module.
+
+    Exposes the same functions as the wrapped module, e.g.
+    `await aio.project.get_project(db=db, id=1)`, so query logic lives in one place.
+    """
+
+    def __init__(self, module: Any):
+        self._module = module
+
+    def __getattr__(self, name: str) -> Any:
+        fn = getattr(self._module, name)
+        if not callable(fn):
+            return fn
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, db: DBSession, **kwargs: Any) -> Any:
+            return await run_db(db, fn, *args, **kwargs)
+
+        setattr(self, name, wrapper) # Cache so __getattr__ runs once per function
+        return wrapper
+
+
+user = AsyncCRUD(crud_user)
+project = AsyncCRUD(crud_project)
+model = AsyncCRUD(crud_model)
+dataset = AsyncCRUD(crud_dataset)
+training_run = AsyncCRUD(crud_training_run)
+training_metric = AsyncCRUD(crud_training_metric)
+user_stats = AsyncCRUD(crud_user_stats)
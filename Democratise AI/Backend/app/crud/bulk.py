@@ -0,0 +1,163 @@
+# File: app/crud/bulk.py
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from pydantic_core import PydanticUndefined
+from sqlalchemy import bindparam, delete, func, insert, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import Session, select
+
+from app.schemas.bulk import BulkItemResult, BulkResult
+from app.utils import aware_utcnow
+
+
+def _field_defaults(model: Any) -> Dict[str, Any]:
+    """
+    The model's field defaults (default_factory called once), for rows inserted without
+    building a model instance per row (instances cost far more than the INSERT itself).
+    """
+    defaults = {}
+    for name, field in model.model_fields.items():
+        if name == "id":
+            continue
+        if field.default_factory is not None:
+            defaults[name] = field.default_factory()
+        elif field.default is not PydanticUndefined:
+            defaults[name] = field.default
+    return defaults
+
+
+def _update_rows(db: Session, model: Any, rows: Sequence[Dict[str, Any]], constants: Dict[str, Any]) -> None:
+    """
+    Updates rows by primary key: {"id": ..., field: value} per row, plus `constants`
+    (the same values for every row, e.g. updated_at).
+
+    On PostgreSQL: one UPDATE ... FROM unnest(:ids, :values...) per set of updated fields,
+    i.e. one round trip and a handful of array parameters however many rows.
+    Elsewhere: ORM bulk UPDATE by primary key (executemany).
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        db.execute(update(model), [{**row, **constants} for row in rows])
+        return
+
+    table = model.__table__
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    for keys, group in groups.items():
+        arrays = [
+            bindparam(f"{key}_values", [row[key] for row in group], type_=ARRAY(table.c[key].type))
+            for key in keys
+        ]
+        # unnest(...) AS data(id, name, ...): one row per updated project/dataset
+        data = func.unnest(*arrays).table_valued(*keys).render_derived(name="data")
+        statement = (
+            update(table)
+            .where(table.c.id == data.c.id)
+            .values({**{key: data.c[key] for key in keys if key != "id"}, **constants})
+        )
+        db.execute(statement)
+
+
+def bulk_write(
+    db: Session,
+    *,
+    model: Any,
+    user_id: int,
+    creates: Sequence[Dict[str, Any]],
+    updates: Sequence[Dict[str, Any]],
+    deletes: Sequence[int],
+    links: Sequence[Any] = (),
+    blockers: Sequence[Any] = (),
+    scope: Sequence[Any] = (),
+    tombstone: Optional[Dict[str, Any]] = None,
+    before_commit: Optional[Callable[[BulkResult], None]] = None,
+) -> BulkResult:
+    """
+    Applies many creates, updates and deletes of one owned table in a single transaction,
+    with a fixed number of statements per operation type (not one round trip per row).
+
+    - Creates: one multi-row INSERT ... RETURNING id (batched by SQLAlchemy's insertmanyvalues).
+    - Updates/deletes: ownership of all IDs is checked with one SELECT; rows that don't
+      exist or belong to another user are skipped and reported, not raised. An ID repeated
+      in the same list is applied once: its later occurrences are reported 'duplicate'.
+    - Updates: one UPDATE ... FROM unnest(...) per set of fields updated (PostgreSQL).
+    - Deletes: link rows go first; rows still referenced by a blocker column are reported 'in_use'.
+      With `tombstone`, deletes are one UPDATE setting those values instead (purged later).
+
+    Args:
+        db: The database session.
+        model: The table model (e.g. Project); it must have `id` and `user_id` columns.
+        user_id: The ID of the user performing the operations (owner of the created rows).
+        creates: Column values per new row (fields left out get the model's defaults).
+        updates: {"id": ..., field: value, ...} per update (only the fields to change).
+        deletes: IDs to delete.
+        links: Link-table columns referencing model.id, deleted along with the row (M2M links).
+        blockers: Columns referencing model.id that prevent the deletion (e.g. TrainingRun.project_id).
+        scope: Extra conditions on the rows that can be updated/deleted; other rows are
+               reported 'not_found' (e.g. projects already being deleted).
+        tombstone: Column values marking a row as deleted (e.g. {"status": "deleting"}),
+                   for soft deletes; links and blockers are then left to the purge.
+        before_commit: Called with the results just before the commit, to make related
+                       writes in the same transaction (e.g. crud_user_stats.increment).
+
+    Returns:
+        The per-item BulkResult (nothing is written if a statement fails).
+    """
+    result = BulkResult()
+
+    if creates:
+        defaults = _field_defaults(model)
+        rows = [{**defaults, **values} for values in creates]
+        # sort_by_parameter_order: the returned IDs line up with `rows`
+        statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+        ids = db.execute(statement, rows).scalars().all()
+        result.created = [BulkItemResult(index=index, id=id, ok=True) for index, id in enumerate(ids)]
+
+    requested = {item["id"] for item in updates} | set(deletes)
+    owners: Dict[int, int] = {}
+    if requested:
+        statement = select(model.id, model.user_id).where(model.id.in_(requested), *scope)
+        owners = dict(db.exec(statement).all())
+
+    def check(index: int, id: int, seen: Set[int]) -> BulkItemResult:
+        if id in seen:
+            return BulkItemResult(index=index, id=id, ok=False, error="duplicate")
+        seen.add(id)
+        if id not in owners:
+            return BulkItemResult(index=index, id=id, ok=False, error="not_found")
+        if owners[id] != user_id:
+            return BulkItemResult(index=index, id=id, ok=False, error="forbidden")
+        return BulkItemResult(index=index, id=id, ok=True)
+
+    if updates:
+        seen: Set[int] = set()
+        result.updated = [check(index, item["id"], seen) for index, item in enumerate(updates)]
+        params = [item for item, item_result in zip(updates, result.updated) if item_result.ok]
+        if params:
+            _update_rows(db, model, params, {"updated_at": aware_utcnow()})
+
+    if deletes:
+        seen = set() # Its own: an ID may be both updated and deleted
+        result.deleted = [check(index, id, seen) for index, id in enumerate(deletes)]
+        ids: List[int] = [item.id for item in result.deleted if item.ok]
+        if tombstone is not None:
+            if ids:
+                db.execute(update(model).where(model.id.in_(ids)).values(**tombstone, updated_at=aware_utcnow()))
+        else:
+            in_use = set()
+            for column in blockers:
+                in_use.update(db.exec(select(column).where(column.in_(ids)).distinct()).all())
+            for item in result.deleted:
+                if item.ok and item.id in in_use:
+                    item.ok, item.error = False, "in_use"
+            ids = [id for id in ids if id not in in_use]
+            if ids:
+                for column in links:
+                    db.execute(delete(column.table).where(column.in_(ids)))
+                db.execute(delete(model).where(model.id.in_(ids)))
+
+    if before_commit is not None:
+        before_commit(result)
+    db.commit()
+    return result
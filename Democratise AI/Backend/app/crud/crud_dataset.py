@@ -1,12 +1,22 @@
 # File: app/crud/crud_dataset.py
 
-from typing import List, Optional
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
 
-# Import 'or_' for combining query conditions
+from sqlalchemy import case, func, union_all
 from sqlmodel import Session, select, or_
 
+from app.core.config import settings
+from app.crud import crud_user_stats
+from app.crud.bulk import bulk_write
+from app.crud.facets import facet_counts, increment_facet_counts, rebuild_facet_counts, summary_facet_counts
+from app.crud.pagination import Page, count_capped, paginate_union
 from app.models.dataset import Dataset # The DB model
-from app.schemas.dataset import DatasetCreate # The input schema for creation
+from app.models.facet_count import DatasetFacetCount
+from app.models.links import ProjectDatasetLink
+from app.models.training_run import TrainingRun
+from app.schemas.bulk import BulkResult
+from app.schemas.dataset import DatasetBulkRequest, DatasetCreate # The input schemas
 
 def get_dataset(*, db: Session, id: int) -> Optional[Dataset]:
     """
@@ -22,32 +32,137 @@ def get_dataset(*, db: Session, id: int) -> Optional[Dataset]:
     dataset = db.get(Dataset, id)
     return dataset
 
+# Sort options of the dataset listing: name -> (sort attributes, descending)
+SORTS: Dict[str, Tuple[Tuple[str, ...], bool]] = {
+    "-updated_at": (("updated_at", "id"), True),
+    "name": (("name", "id"), False),
+}
+
+# Columns the listing reports facet counts for
+FACETS = (Dataset.storage_type, Dataset.is_public)
+# A combination of DatasetFacetCount (user_id is None for public datasets)
+FACET_KEYS = ("user_id", "storage_type", "is_public")
+
+def _filters(
+    *, storage_type: Optional[str], is_public: Optional[bool], name_prefix: Optional[str], table: Any = Dataset
+) -> Dict[str, Any]:
+    """
+    Builds the WHERE conditions of the dataset listing, keyed by the attribute they filter on
+    (on `table`: Dataset, or DatasetFacetCount without name_prefix).
+    """
+    filters: Dict[str, Any] = {}
+    if storage_type is not None:
+        filters["storage_type"] = table.storage_type == storage_type
+    if is_public is not None:
+        filters["is_public"] = table.is_public if is_public else ~table.is_public
+    if name_prefix:
+        # LIKE 'prefix%' (wildcards in the prefix escaped); served by ix_dataset_name_prefix
+        filters["name"] = Dataset.name.startswith(name_prefix, autoescape=True)
+    return filters
+
 def get_multi_by_owner_or_public(
-    db: Session, *, user_id: Optional[int], skip: int = 0, limit: int = 100
-) -> List[Dataset]:
+    db: Session,
+    *,
+    user_id: Optional[int],
+    storage_type: Optional[str] = None,
+    is_public: Optional[bool] = None,
+    name_prefix: Optional[str] = None,
+    sort: str = "-updated_at",
+    cursor: Optional[str] = None,
+    limit: int = 100,
+) -> Page:
     """
-    Retrieve multiple datasets: public ones AND those owned by the specific user.
+    Retrieve multiple datasets: public ones AND those owned by the specific user,
+    matching the given filters, with keyset (cursor) pagination.
 
     Args:
         db: The database session.
         user_id: The ID of the user requesting the datasets. Can be None if checking only public?
                  Let's assume user_id is always provided from an authenticated route.
-        skip: Number of datasets to skip.
+        storage_type: Only datasets stored this way (e.g. 's3').
+        is_public: Only public (True) or only the user's private (False) datasets.
+        name_prefix: Only datasets whose name starts with this (case-sensitive).
+        sort: One of SORTS. A cursor is only valid with the sort it was issued for.
+        cursor: The next_cursor of the previous page (None for the first page).
         limit: Maximum number of datasets to return.
 
     Returns:
-        A list of Dataset objects.
+        The Page of Dataset objects. On the first page it also carries the number of
+        matching datasets: exact up to settings.LIST_TOTAL_EXACT_LIMIT, estimated above
+        (all public datasets can be many more than fit a window function).
     """
-    statement = (
-        select(Dataset)
-        # Filter condition: Dataset is public OR dataset belongs to the current user
-        .where(or_(Dataset.is_public == True, Dataset.user_id == user_id))
-        .offset(skip)
-        .limit(limit)
-        .order_by(Dataset.updated_at.desc()) # Order by most recently updated
+    keys, descending = SORTS[sort]
+    filters = _filters(storage_type=storage_type, is_public=is_public, name_prefix=name_prefix)
+    conditions = [condition for key, condition in filters.items() if key != "is_public"]
+    # Filter condition: Dataset is public OR dataset belongs to the current user.
+    # Written as UNION ALL of two disjoint branches rather than OR, so each branch
+    # reads one page from its own partial index (see models/dataset.py) in (updated_at, id) order.
+    # Plain `is_public` / `NOT is_public` (not `= true`) so the index predicates match.
+    branch_filters = []
+    if is_public is not False:
+        branch_filters.append((Dataset.is_public, *conditions))
+    if is_public is not True:
+        branch_filters.append((~Dataset.is_public, Dataset.user_id == user_id, *conditions))
+    page = paginate_union(
+        db, Dataset, [select(Dataset).where(*where) for where in branch_filters],
+        keys=keys, cursor=cursor, limit=limit, descending=descending,
     )
-    datasets = db.exec(statement).all()
-    return datasets
+    if cursor is not None:
+        return page
+
+    # The same branches for the total, each counted from its partial index
+    ids = [select(Dataset.id).where(*where) for where in branch_filters]
+    total, is_estimate = count_capped(
+        db, ids[0] if len(ids) == 1 else union_all(*ids), exact_limit=settings.LIST_TOTAL_EXACT_LIMIT
+    )
+    return page._replace(total=total, total_is_estimate=is_estimate)
+
+def get_facets(
+    db: Session,
+    *,
+    user_id: Optional[int],
+    storage_type: Optional[str] = None,
+    is_public: Optional[bool] = None,
+    name_prefix: Optional[str] = None,
+) -> Tuple[Dict[str, List[Dict[str, Any]]], bool]:
+    """
+    Counts the datasets visible to the user per storage type and visibility for the
+    given filters (each facet ignoring its own filter, see crud/facets.py): read from
+    the precomputed counts (DatasetFacetCount), or with a name prefix, counted like the
+    total (estimated when large).
+
+    Returns:
+        {facet: [{"value": ..., "count": ...}, ...]}, and whether the counts are estimates.
+    """
+    if name_prefix:
+        filters = _filters(storage_type=storage_type, is_public=is_public, name_prefix=name_prefix)
+        visible = or_(Dataset.is_public, Dataset.user_id == user_id)
+        return facet_counts(
+            db, facets=FACETS, filters=filters, scope=[visible], exact_limit=settings.LIST_TOTAL_EXACT_LIMIT
+        )
+    filters = _filters(storage_type=storage_type, is_public=is_public, name_prefix=None, table=DatasetFacetCount)
+    visible = or_(DatasetFacetCount.is_public, DatasetFacetCount.user_id == user_id)
+    counts = summary_facet_counts(
+        db, summary=DatasetFacetCount, facets=[column.key for column in FACETS], filters=filters, scope=[visible]
+    )
+    return counts, False
+
+def _facet_key(user_id: Optional[int], storage_type: str, is_public: bool) -> Tuple:
+    # The DatasetFacetCount combination of a dataset: public ones are counted together
+    return (None if is_public else user_id, storage_type, is_public)
+
+def rebuild_facet_counts_of_datasets(db: Session) -> int:
+    """
+    Recomputes the precomputed facet counts (DatasetFacetCount) from the dataset table.
+
+    Returns:
+        The number of facet value combinations.
+    """
+    owner = case((Dataset.is_public, None), else_=Dataset.user_id)
+    source = select(owner, Dataset.storage_type, Dataset.is_public, func.count()).group_by(
+        owner, Dataset.storage_type, Dataset.is_public
+    )
+    return rebuild_facet_counts(db, summary=DatasetFacetCount, keys=FACET_KEYS, source=source)
 
 def create_dataset(
     *, db: Session, dataset_in: DatasetCreate, user_id: int
@@ -79,10 +194,75 @@ def create_dataset(
         # --- End Placeholder ---
     )
     db.add(db_dataset)
+    crud_user_stats.increment(db, user_id=user_id, datasets=1)
+    increment_facet_counts(
+        db, summary=DatasetFacetCount, keys=FACET_KEYS,
+        deltas={_facet_key(user_id, db_dataset.storage_type, db_dataset.is_public): 1},
+    )
     db.commit()
     db.refresh(db_dataset)
     return db_dataset
 
+def bulk_write_datasets(*, db: Session, request: DatasetBulkRequest, user_id: int) -> BulkResult:
+    """
+    Create, update and delete the metadata of many datasets of a user in one
+    transaction (a handful of statements in total, see crud/bulk.py).
+    New datasets get the same placeholder storage info as create_dataset.
+
+    Args:
+        db: The database session.
+        request: The operations (create/update/delete lists).
+        user_id: The ID of the user; owner of the new datasets, and updates/deletes
+                 of other users' (including public) datasets are reported as 'forbidden'.
+
+    Returns:
+        A BulkResult with one entry per operation, in request order.
+    """
+    creates = [
+        {**item.model_dump(), "user_id": user_id, "storage_type": "placeholder", "storage_path": "pending_upload"}
+        for item in request.create
+    ]
+    # Storage type and visibility of the user's updated/deleted datasets before the request
+    # (locked, so the facet counts change from the values actually replaced)
+    changed_ids = {item.id for item in request.update} | set(request.delete)
+    before = {
+        id: (storage_type, is_public) for id, storage_type, is_public in db.exec(
+            select(Dataset.id, Dataset.storage_type, Dataset.is_public)
+            .where(Dataset.id.in_(changed_ids), Dataset.user_id == user_id)
+            .with_for_update()
+        ).all()
+    } if changed_ids else {}
+
+    def count_changes(result: BulkResult) -> None:
+        crud_user_stats.increment(
+            db, user_id=user_id,
+            datasets=sum(item.ok for item in result.created) - sum(item.ok for item in result.deleted),
+        )
+        deltas: Counter = Counter()
+        for item, item_result in zip(creates, result.created):
+            deltas[_facet_key(user_id, item["storage_type"], item["is_public"])] += item_result.ok
+        for item, item_result in zip(request.update, result.updated):
+            if item_result.ok and item.is_public is not None and item.is_public != before[item.id][1]:
+                storage_type, is_public = before[item.id]
+                deltas[_facet_key(user_id, storage_type, is_public)] -= 1
+                deltas[_facet_key(user_id, storage_type, item.is_public)] += 1
+        for item_result in result.deleted:
+            if item_result.ok:
+                deltas[_facet_key(user_id, *before[item_result.id])] -= 1
+        increment_facet_counts(db, summary=DatasetFacetCount, keys=FACET_KEYS, deltas=deltas)
+
+    return bulk_write(
+        db,
+        model=Dataset,
+        user_id=user_id,
+        creates=creates,
+        updates=[item.model_dump(exclude_unset=True) for item in request.update],
+        deletes=request.delete,
+        links=(ProjectDatasetLink.dataset_id,),
+        blockers=(TrainingRun.dataset_id,),
+        before_commit=count_changes,
+    )
+
 # Placeholder for update function if needed later
 # def update_dataset(...): ...
 
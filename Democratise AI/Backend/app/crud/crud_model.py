@@ -1,10 +1,20 @@
 # File: app/crud/crud_model.py
 
-from typing import List, Optional
+import csv
+import io
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+from sqlalchemy import and_, column, func, literal, or_, table, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlmodel import Session, select
 
+from app.core.config import settings
+from app.crud.facets import facet_counts, increment_facet_counts, rebuild_facet_counts, summary_facet_counts
+from app.crud.pagination import Page, count_capped, paginate
+from app.models.facet_count import ModelFacetCount
 from app.models.model import Model # The DB model
+from app.utils import aware_utcnow
 
 def get_model(*, db: Session, id: int) -> Optional[Model]:
     """
@@ -24,23 +34,219 @@ def get_model(*, db: Session, id: int) -> Optional[Model]:
     # model = db.exec(statement).first()
     return model
 
+# Sort options of the model listing: name -> (sort attributes, descending)
+SORTS: Dict[str, Tuple[Tuple[str, ...], bool]] = {
+    "id": (("id",), False),
+    "name": (("name", "id"), False),
+    "-updated_at": (("updated_at", "id"), True),
+}
+
+# Columns the listing reports facet counts for (also the columns of ModelFacetCount)
+FACETS = (Model.task_type, Model.framework, Model.source_type)
+FACET_KEYS = tuple(column.key for column in FACETS)
+
+def _filters(
+    *,
+    task_type: Optional[str],
+    framework: Optional[str],
+    source_type: Optional[str],
+    name_prefix: Optional[str],
+    table: Any = Model,
+) -> Dict[str, Any]:
+    """
+    Builds the WHERE conditions of the model listing, keyed by the attribute they filter on
+    (on `table`: Model, or ModelFacetCount without name_prefix).
+    """
+    filters: Dict[str, Any] = {}
+    if task_type is not None:
+        filters["task_type"] = table.task_type == task_type # ix_model_task_type
+    if framework is not None:
+        filters["framework"] = table.framework == framework # ix_model_framework
+    if source_type is not None:
+        filters["source_type"] = table.source_type == source_type # uq_model_source (leading column)
+    if name_prefix:
+        # LIKE 'prefix%' (wildcards in the prefix escaped); served by ix_model_name_prefix
+        filters["name"] = Model.name.startswith(name_prefix, autoescape=True)
+    return filters
+
 def get_multi(
-    db: Session, *, skip: int = 0, limit: int = 100
-) -> List[Model]:
+    db: Session,
+    *,
+    task_type: Optional[str] = None,
+    framework: Optional[str] = None,
+    source_type: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+    sort: str = "id",
+    cursor: Optional[str] = None,
+    limit: int = 100,
+) -> Page:
     """
-    Retrieve multiple models, with pagination.
+    Retrieve multiple models matching the given filters, with keyset (cursor) pagination.
 
     Args:
         db: The database session.
-        skip: Number of models to skip.
+        task_type: Only models for this task type (e.g. 'text-classification').
+        framework: Only models for this framework (e.g. 'pytorch').
+        source_type: Only models from this source (e.g. 'huggingface').
+        name_prefix: Only models whose name starts with this (case-sensitive).
+        sort: One of SORTS. A cursor is only valid with the sort it was issued for.
+        cursor: The next_cursor of the previous page (None for the first page).
         limit: Maximum number of models to return.
 
     Returns:
-        A list of Model objects.
+        The Page of Model objects (with the number of matching models on the first page,
+        estimated above LIST_TOTAL_EXACT_LIMIT).
+    """
+    keys, descending = SORTS[sort]
+    filters = _filters(task_type=task_type, framework=framework, source_type=source_type, name_prefix=name_prefix)
+    page = paginate(
+        db, select(Model).where(*filters.values()),
+        columns=[getattr(Model, key) for key in keys], cursor=cursor, limit=limit, descending=descending,
+    )
+    if cursor is not None:
+        return page
+    # Imported catalogs can hold hundreds of thousands of models: large totals are estimated
+    total, is_estimate = count_capped(
+        db, select(Model.id).where(*filters.values()), exact_limit=settings.LIST_TOTAL_EXACT_LIMIT
+    )
+    return page._replace(total=total, total_is_estimate=is_estimate)
+
+def get_facets(
+    db: Session,
+    *,
+    task_type: Optional[str] = None,
+    framework: Optional[str] = None,
+    source_type: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+) -> Tuple[Dict[str, List[Dict[str, Any]]], bool]:
+    """
+    Counts the models per task type, framework and source type for the given filters
+    (each facet ignoring its own filter, see crud/facets.py): read from the precomputed
+    counts (ModelFacetCount), or with a name prefix, counted like the total (estimated
+    when large).
+
+    Returns:
+        {facet: [{"value": ..., "count": ...}, ...]}, and whether the counts are estimates.
+    """
+    if name_prefix:
+        filters = _filters(task_type=task_type, framework=framework, source_type=source_type, name_prefix=name_prefix)
+        return facet_counts(db, facets=FACETS, filters=filters, exact_limit=settings.LIST_TOTAL_EXACT_LIMIT)
+    filters = _filters(
+        task_type=task_type, framework=framework, source_type=source_type, name_prefix=None, table=ModelFacetCount
+    )
+    return summary_facet_counts(db, summary=ModelFacetCount, facets=FACET_KEYS, filters=filters), False
+
+def _facet_tally(db: Session, keys: Any) -> Dict[Tuple, int]:
+    # Models per facet combination among the catalog keys of a batch (a select() of their key columns)
+    statement = (
+        select(*FACETS, func.count())
+        .where(tuple_(*(getattr(Model, key) for key in CATALOG_KEY)).in_(keys))
+        .group_by(*FACETS)
+    )
+    return {tuple(row[:-1]): row[-1] for row in db.exec(statement).all()}
+
+def rebuild_facet_counts_of_models(db: Session) -> int:
+    """
+    Recomputes the precomputed facet counts (ModelFacetCount) from the model table.
+
+    Returns:
+        The number of facet value combinations.
     """
-    statement = select(Model).offset(skip).limit(limit).order_by(Model.id)
-    models = db.exec(statement).all()
-    return models
+    source = select(*FACETS, func.count()).group_by(*FACETS)
+    return rebuild_facet_counts(db, summary=ModelFacetCount, keys=FACET_KEYS, source=source)
+
+# Catalog columns refreshed by upsert_catalog (the key is source_type + source_identifier)
+CATALOG_FIELDS = ("name", "description", "task_type", "framework")
+CATALOG_KEY = ("source_type", "source_identifier")
+
+def _copy_to_staging(db: Session, rows: Sequence[Dict[str, Any]]) -> Any:
+    """
+    COPYs catalog rows into a temporary table (dropped at commit) and returns it as a table().
+    PostgreSQL via psycopg2 only.
+    """
+    names = CATALOG_KEY + CATALOG_FIELDS
+    connection = db.connection()
+    connection.exec_driver_sql(
+        f"CREATE TEMPORARY TABLE model_staging ({', '.join(f'{name} text' for name in names)}) ON COMMIT DROP"
+    )
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([r"\N" if row[name] is None else row[name] for name in names])
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(r"COPY model_staging FROM STDIN WITH (FORMAT csv, NULL '\N')", buffer)
+    finally:
+        cursor.close()
+    return table("model_staging", *(column(name) for name in names))
+
+def upsert_catalog(db: Session, *, entries: Sequence[Dict[str, Any]]) -> int:
+    """
+    Inserts or updates a batch of catalog entries keyed by (source_type, source_identifier)
+    with a single INSERT ... ON CONFLICT DO UPDATE, and commits the batch.
+
+    Entries whose catalog fields are unchanged are not written at all (no new row
+    version, no row lock, updated_at kept), so a nightly refresh of a mostly unchanged
+    catalog costs little more than reading it.
+
+    - PostgreSQL (psycopg2): the batch is COPYed into a temporary staging table, anti-joined
+      against `model` to drop unchanged entries, and upserted with INSERT ... SELECT.
+    - Elsewhere: an executemany INSERT ... ON CONFLICT DO UPDATE ... WHERE <changed>.
+
+    Args:
+        db: The database session (PostgreSQL or SQLite).
+        entries: Dicts with source_type, source_identifier and the CATALOG_FIELDS.
+                 For repeated keys within the batch, the last entry wins.
+
+    Returns:
+        The number of models inserted or changed.
+    """
+    # ON CONFLICT can't update the same row twice in one statement
+    unique = {(entry["source_type"], entry["source_identifier"]): entry for entry in entries}
+    if not unique:
+        return 0
+    rows = [{name: entry.get(name) for name in CATALOG_KEY + CATALOG_FIELDS} for entry in unique.values()]
+    now = aware_utcnow()
+    # Core statements on the table: the ORM bulk path would split an executemany into
+    # a statement per run of rows with the same None columns
+    model = Model.__table__
+    bind = db.get_bind()
+
+    if bind.dialect.driver == "psycopg2":
+        staging = _copy_to_staging(db, rows)
+        keys = select(*(staging.c[key] for key in CATALOG_KEY))
+        changed = tuple_(*(model.c[field] for field in CATALOG_FIELDS)).is_distinct_from(
+            tuple_(*(staging.c[field] for field in CATALOG_FIELDS))
+        )
+        source = (
+            select(*(staging.c[name] for name in CATALOG_KEY + CATALOG_FIELDS), literal(now), literal(now))
+            .select_from(staging.outerjoin(model, and_(*(model.c[key] == staging.c[key] for key in CATALOG_KEY))))
+            .where(or_(model.c.id.is_(None), changed))
+        )
+        statement = postgresql.insert(model).from_select(
+            list(CATALOG_KEY + CATALOG_FIELDS) + ["created_at", "updated_at"], source
+        )
+        parameters = None
+    else:
+        dialect = postgresql if bind.dialect.name == "postgresql" else sqlite
+        statement = dialect.insert(model)
+        parameters = [{**row, "created_at": now, "updated_at": now} for row in rows]
+        keys = [tuple(row[key] for key in CATALOG_KEY) for row in rows]
+
+    statement = statement.on_conflict_do_update(
+        index_elements=[model.c[key] for key in CATALOG_KEY],
+        set_={**{field: statement.excluded[field] for field in CATALOG_FIELDS}, "updated_at": now},
+        where=or_(*(model.c[field].is_distinct_from(statement.excluded[field]) for field in CATALOG_FIELDS)),
+    ).returning(model.c.id) # Only inserted/updated rows are returned
+    # The batch's models per facet combination, before and after: the change of the facet counts
+    before = _facet_tally(db, keys)
+    written = len(db.execute(statement, parameters).all())
+    deltas = Counter(_facet_tally(db, keys) if written else before)
+    deltas.subtract(before)
+    increment_facet_counts(db, summary=ModelFacetCount, keys=FACET_KEYS, deltas=deltas)
+    db.commit()
+    return written
 
 # Placeholder for create function if needed later
 # def create_model(*, db: Session, model_in: schemas.ModelCreate) -> Model:
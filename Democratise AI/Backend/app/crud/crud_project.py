@@ -1,10 +1,55 @@
 # File: app/crud/crud_project.py
 
-from typing import List, Optional, Union, Dict, Any
+from typing import Optional, Union, Dict, Any
 
-from sqlmodel import Session, select
+from sqlalchemy import delete, text, tuple_
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, func, select
+from app.crud import crud_training_run, crud_user_stats
+from app.crud.bulk import bulk_write
+from app.crud.pagination import Page, paginate
+from app.models.links import ProjectDatasetLink, ProjectModelLink
 from app.models.project import Project # The DB model
-from app.schemas.project import ProjectCreate, ProjectUpdate # The Pydantic schemas
+from app.models.training_metric import TrainingMetricChunk
+from app.models.training_run import TrainingRun
+from app.schemas.bulk import BulkResult
+from app.schemas.project import ProjectBulkRequest, ProjectCreate, ProjectUpdate, ProjectSummary # The Pydantic schemas
+from app.services import run_archive
+from app.services.log_store import log_store
+
+# Status of a project whose DELETE was accepted: hidden from reads and updates until
+# the purger (purge_deleted_projects, run by app/services/purger.py) has removed it
+PROJECT_DELETING = "deleting"
+
+# Rows referencing a project, purged in this order before the project row itself
+_PURGED_CHILDREN = (
+    TrainingMetricChunk.project_id, TrainingRun.project_id, ProjectModelLink.project_id, ProjectDatasetLink.project_id,
+)
+
+# Eager loaders for the relationships serialized by schemas.ProjectPublic: one
+# batched "WHERE project_id IN (...)" query per relationship, however many projects.
+# Responses are serialized after the CRUD call returns, where an AsyncSession can't
+# lazy-load, so projects returned as ProjectPublic must be loaded with these.
+_CHILDREN_LOADERS = (
+    selectinload(Project.models),
+    selectinload(Project.datasets),
+    selectinload(Project.training_runs),
+)
+
+# Per-project child counts for ProjectSummary, as correlated subqueries
+# (each is an index lookup on the link/foreign key column)
+_MODEL_COUNT = (
+    select(func.count()).where(ProjectModelLink.project_id == Project.id)
+    .scalar_subquery().label("model_count")
+)
+_DATASET_COUNT = (
+    select(func.count()).where(ProjectDatasetLink.project_id == Project.id)
+    .scalar_subquery().label("dataset_count")
+)
+_TRAINING_RUN_COUNT = (
+    select(func.count()).where(TrainingRun.project_id == Project.id)
+    .scalar_subquery().label("training_run_count")
+)
 
 def create_project(*, db: Session, project_in: ProjectCreate, user_id: int) -> Project:
     """
@@ -23,50 +68,68 @@ def create_project(*, db: Session, project_in: ProjectCreate, user_id: int) -> P
     # Create the Project model instance, adding the owner's user_id
     db_project = Project(**project_data, user_id=user_id)
     db.add(db_project)
+    crud_user_stats.increment(db, user_id=user_id, projects=1)
     db.commit()
-    db.refresh(db_project)
-    return db_project
+    # Reload with children (instead of db.refresh + lazy loads)
+    return get_project(db=db, id=db_project.id, with_children=True)
 
-def get_project(*, db: Session, id: int) -> Optional[Project]:
+def get_project(*, db: Session, id: int, with_children: bool = False) -> Optional[Project]:
     """
     Retrieve a single project by its ID.
 
     Args:
         db: The database session.
         id: The ID of the project to retrieve.
+        with_children: Also load models/datasets/training_runs (for ProjectPublic responses).
 
     Returns:
-        The Project object if found, otherwise None.
+        The Project object if found (and not being deleted), otherwise None.
     """
     # SQLModel equivalent of db.query(Project).filter(Project.id == id).first()
-    statement = select(Project).where(Project.id == id)
-    project = db.exec(statement).first()
-    return project
+    statement = select(Project).where(Project.id == id, Project.status != PROJECT_DELETING)
+    if with_children:
+        # populate_existing: also (re)load children of a project already in the session
+        statement = statement.options(*_CHILDREN_LOADERS).execution_options(populate_existing=True)
+    return db.exec(statement).first()
 
 def get_multi_by_owner(
-    db: Session, *, user_id: int, skip: int = 0, limit: int = 100
-) -> List[Project]:
+    db: Session, *, user_id: int, cursor: Optional[str] = None, limit: int = 100
+) -> Page:
     """
-    Retrieve multiple projects owned by a specific user, with pagination.
+    Retrieve summaries (with child counts) of the projects owned by a specific user,
+    most recently updated first, with keyset (cursor) pagination.
+
+    Runs a single query per page: children are counted, not loaded, and the first
+    page also carries the number of projects the user owns (window function).
 
     Args:
         db: The database session.
         user_id: The ID of the owner user.
-        skip: Number of projects to skip (for pagination).
+        cursor: The next_cursor of the previous page (None for the first page).
         limit: Maximum number of projects to return (for pagination).
 
     Returns:
-        A list of Project objects owned by the user.
+        The Page of ProjectSummary objects (with the total on the first page).
     """
     statement = (
-        select(Project)
-        .where(Project.user_id == user_id)
-        .offset(skip)
-        .limit(limit)
-        .order_by(Project.updated_at.desc()) # Order by lastUpdated (or created_at/id)
+        select(Project, _MODEL_COUNT, _DATASET_COUNT, _TRAINING_RUN_COUNT)
+        .where(Project.user_id == user_id, Project.status != PROJECT_DELETING)
+    )
+    page = paginate(
+        db, statement, columns=(Project.updated_at, Project.id), cursor=cursor, limit=limit, with_total=True
     )
-    projects = db.exec(statement).all()
-    return projects
+    summaries = [
+        ProjectSummary.model_validate(
+            project,
+            update={
+                "model_count": model_count,
+                "dataset_count": dataset_count,
+                "training_run_count": training_run_count,
+            },
+        )
+        for project, model_count, dataset_count, training_run_count in page.items
+    ]
+    return page._replace(items=summaries)
 
 def update_project(
     *, db: Session, db_obj: Project, obj_in: Union[ProjectUpdate, Dict[str, Any]]
@@ -94,25 +157,135 @@ def update_project(
 
     db.add(db_obj) # Add the updated object back to the session
     db.commit()
-    db.refresh(db_obj) # Refresh to get any DB-generated changes
-    return db_obj
+    # Reload to get any DB-generated changes, with children (instead of db.refresh + lazy loads)
+    return get_project(db=db, id=db_obj.id, with_children=True)
 
 
 def remove_project(*, db: Session, id: int) -> Optional[Project]:
     """
-    Delete a project from the database by its ID.
+    Delete a project: marks it as 'deleting' (a tombstone) and returns at once.
+    Its training runs and links, however many, are removed later in small batches
+    by purge_deleted_projects, so the request neither cascades row by row nor
+    holds locks on the child tables.
 
     Args:
         db: The database session.
         id: The ID of the project to delete.
 
     Returns:
-        The deleted Project object if found and deleted, otherwise None.
+        The tombstoned Project object (children not loaded) if found, otherwise None.
     """
-    # Fetch the object first to ensure it exists and potentially return it
     db_obj = get_project(db=db, id=id)
     if db_obj:
-        db.delete(db_obj)
+        db_obj.status = PROJECT_DELETING
+        db.add(db_obj)
+        crud_user_stats.increment(db, user_id=db_obj.user_id, projects=-1)
         db.commit()
-        # Note: db_obj is now detached from the session but holds the data
-    return db_obj
\ No newline at end of file
+        db.refresh(db_obj) # Reload the columns here, not when the endpoint serializes them
+    return db_obj
+
+def purge_deleted_projects(db: Session, *, batch_size: int, lock_timeout_ms: Optional[int] = None) -> int:
+    """
+    Deletes up to `batch_size` child rows (training runs, then model/dataset links) of one
+    project marked 'deleting', in one transaction; the project row goes in the transaction
+    that finds no children left, along with its runs in the archive files (see
+    crud_training_run.remove_archived_runs). Call repeatedly until it returns 0.
+
+    Concurrent purgers skip a project another one is working on (FOR UPDATE SKIP LOCKED).
+    The logs of the purged training runs, archived or not, are deleted once the transaction
+    is committed.
+
+    Args:
+        db: The database session (primary).
+        batch_size: Maximum number of rows deleted (bounds the transaction's lock time).
+        lock_timeout_ms: PostgreSQL only: fail the batch instead of waiting longer than this
+                         for a row lock held by another transaction.
+
+    Returns:
+        The number of rows deleted (0 if no project is waiting to be purged).
+    """
+    if lock_timeout_ms and db.get_bind().dialect.name == "postgresql":
+        db.execute(text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}"))
+    project_id = db.exec(
+        select(Project.id).where(Project.status == PROJECT_DELETING) # ix_project_status
+        .order_by(Project.id).limit(1).with_for_update(skip_locked=True)
+    ).first()
+    if project_id is None:
+        db.commit()
+        return 0
+
+    deleted, purged_run_ids = 0, []
+    for column in _PURGED_CHILDREN:
+        if deleted >= batch_size:
+            break
+        key = tuple_(*column.table.primary_key.columns)
+        rows = select(*column.table.primary_key.columns).where(column == project_id).limit(batch_size - deleted)
+        if column.table is TrainingRun.__table__:
+            # The purged runs are no longer counted in their users' stats
+            purged = db.execute(
+                delete(column.table).where(key.in_(rows))
+                .returning(TrainingRun.id, TrainingRun.user_id, TrainingRun.status)
+            ).all()
+            deltas = crud_user_stats.run_deltas(((user_id, status) for _, user_id, status in purged), sign=-1)
+            for user_id, runs in deltas.items():
+                crud_user_stats.increment(db, user_id=user_id, runs=runs)
+            purged_run_ids += [run_id for run_id, _, _ in purged]
+            deleted += len(purged)
+        else:
+            deleted += db.execute(delete(column.table).where(key.in_(rows))).rowcount
+    removal = None
+    try:
+        if deleted < batch_size:
+            # No children left: the archived runs go with the project row
+            created_at = db.exec(select(Project.created_at).where(Project.id == project_id)).one()
+            removal = crud_training_run.remove_archived_runs(db, project_id=project_id, since=created_at)
+            purged_run_ids += removal.run_ids
+            deleted += db.execute(delete(Project).where(Project.id == project_id)).rowcount
+        db.commit()
+    except Exception:
+        if removal is not None:
+            run_archive.remove_files(removal.written) # The archives stay as they were
+        raise
+    if removal is not None:
+        run_archive.remove_files(removal.replaced)
+    for run_id in purged_run_ids: # Once the runs are gone for good
+        log_store.delete(run_id)
+    return deleted
+
+def bulk_write_projects(*, db: Session, request: ProjectBulkRequest, user_id: int) -> BulkResult:
+    """
+    Create, update and delete many projects of a user in one transaction
+    (a handful of statements in total, see crud/bulk.py).
+
+    Args:
+        db: The database session.
+        request: The operations (create/update/delete lists).
+        user_id: The ID of the user; owner of the new projects, and updates/deletes
+                 of other users' projects are reported as 'forbidden'.
+
+    Returns:
+        A BulkResult with one entry per operation, in request order.
+    """
+    return bulk_write(
+        db,
+        model=Project,
+        user_id=user_id,
+        creates=[{**item.model_dump(), "user_id": user_id} for item in request.create],
+        updates=[item.model_dump(exclude_unset=True) for item in request.update],
+        deletes=request.delete,
+        # Same as remove_project: deleted projects are tombstoned and purged in the background
+        scope=(Project.status != PROJECT_DELETING,),
+        tombstone={"status": PROJECT_DELETING},
+        before_commit=lambda result: crud_user_stats.increment(
+            db, user_id=user_id, projects=_bulk_project_delta(result)
+        ),
+    )
+
+def _bulk_project_delta(result: BulkResult) -> int:
+    """
+    The change of the user's project count made by a bulk request: created projects,
+    minus deleted ones (updates can't set the 'deleting' status, see ProjectUpdate).
+    """
+    created = sum(item.ok for item in result.created)
+    deleted = sum(item.ok for item in result.deleted)
+    return created - deleted
@@ -0,0 +1,225 @@
+# File: app/crud/crud_training_metric.py
+
+import math
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.training_metric import TrainingMetricChunk # The DB model
+from app.schemas.training_metric import MetricSeries
+from app.services import run_events
+from app.services.downsample import downsample
+
+# Advisory lock namespace of the appends to a run's metrics (PostgreSQL)
+_APPEND_LOCK_NAMESPACE = 0x6D657472 # "metr"
+
+def _pack(typecode: str, items: Iterable) -> bytes:
+    packed = array(typecode, items)
+    if sys.byteorder == "big":
+        packed.byteswap() # Stored little-endian whatever the host
+    return packed.tobytes()
+
+def _unpack(typecode: str, data: bytes) -> array:
+    unpacked = array(typecode)
+    unpacked.frombytes(data)
+    if sys.byteorder == "big":
+        unpacked.byteswap()
+    return unpacked
+
+def _fill(chunk: TrainingMetricChunk, steps: List[int], values: List[float]) -> None:
+    # Sets the chunk's points and the columns derived from them
+    lowest = min(range(len(values)), key=values.__getitem__)
+    highest = max(range(len(values)), key=values.__getitem__)
+    chunk.first_step, chunk.last_step, chunk.count = steps[0], steps[-1], len(steps)
+    chunk.min_step, chunk.min_value = steps[lowest], values[lowest]
+    chunk.max_step, chunk.max_value = steps[highest], values[highest]
+    chunk.steps, chunk.values = _pack("q", steps), _pack("d", values)
+
+def append_metrics(
+    db: Session, *, run_id: int, project_id: int, points: Iterable[Tuple[str, int, float]]
+) -> int:
+    """
+    Appends points (metric, step, value) to a run's per-step metrics, in one transaction.
+
+    Each metric's series only grows: points at or before its last stored step are
+    skipped, so a retried batch is not stored twice, as are non-finite values. New points
+    first fill the metric's last chunk, then go into new chunks of
+    settings.TRAINING_METRIC_CHUNK_POINTS points: earlier chunks are never rewritten.
+    A `metrics` event with the last new value of each metric is published to the run's
+    event streams.
+
+    Args:
+        db: The database session (primary).
+        run_id: The run the points belong to.
+        project_id: The run's project (the chunks are purged with it).
+        points: The points, of any metrics, in any order.
+
+    Returns:
+        The number of points stored.
+    """
+    by_metric: Dict[str, Dict[int, float]] = {}
+    for metric, step, value in points:
+        if math.isfinite(value):
+            by_metric.setdefault(metric, {})[step] = value # The last value of a repeated step wins
+    if not by_metric:
+        return 0
+    if db.get_bind().dialect.name == "postgresql":
+        # Concurrent appends to the same run take turns (two first chunks can't both be inserted)
+        db.execute(select(func.pg_advisory_xact_lock(_APPEND_LOCK_NAMESPACE, run_id)))
+
+    capacity = settings.TRAINING_METRIC_CHUNK_POINTS
+    appended, latest = 0, {}
+    for metric, values_by_step in sorted(by_metric.items()):
+        last = db.exec(
+            select(TrainingMetricChunk)
+            .where(TrainingMetricChunk.run_id == run_id, TrainingMetricChunk.metric == metric)
+            .order_by(TrainingMetricChunk.first_step.desc())
+            .limit(1)
+        ).first()
+        steps = sorted(step for step in values_by_step if last is None or step > last.last_step)
+        if not steps:
+            continue
+        values = [values_by_step[step] for step in steps]
+        appended += len(steps)
+        latest[metric] = {"step": steps[-1], "value": values[-1]}
+
+        if last is not None and last.count < capacity:
+            # Top up the last chunk (rewrites at most `capacity` points)
+            room = capacity - last.count
+            _fill(
+                last,
+                list(_unpack("q", last.steps)) + steps[:room],
+                list(_unpack("d", last.values)) + values[:room],
+            )
+            db.add(last)
+            steps, values = steps[room:], values[room:]
+        for start in range(0, len(steps), capacity):
+            chunk = TrainingMetricChunk(run_id=run_id, metric=metric, project_id=project_id)
+            _fill(chunk, steps[start:start + capacity], values[start:start + capacity])
+            db.add(chunk)
+
+    if latest:
+        run_events.publish_metrics(db, run_id, latest)
+    db.commit()
+    return appended
+
+def delete_run_metrics(db: Session, *, run_id: int) -> int:
+    """
+    Deletes a run's per-step metrics (e.g. before it's executed again).
+
+    Returns:
+        The number of chunks deleted.
+    """
+    deleted = db.execute(delete(TrainingMetricChunk).where(TrainingMetricChunk.run_id == run_id)).rowcount
+    db.commit()
+    return deleted
+
+def list_metrics(*, db: Session, run_id: int) -> List[str]:
+    """
+    Names of the metrics a run reported per step.
+    """
+    return list(db.exec(
+        select(TrainingMetricChunk.metric).where(TrainingMetricChunk.run_id == run_id).distinct()
+        .order_by(TrainingMetricChunk.metric)
+    ).all())
+
+def _chunks_in_range(run_id: int, metric: str, start: Optional[int], end: Optional[int], *columns):
+    # The chunks holding steps in [start, end], in step order. Chunks of a metric don't
+    # overlap: the first one is the last starting at or before `start`, so the range is
+    # a primary key range scan.
+    query = select(*columns).where(TrainingMetricChunk.run_id == run_id, TrainingMetricChunk.metric == metric)
+    if start is not None:
+        first = (
+            select(func.max(TrainingMetricChunk.first_step))
+            .where(
+                TrainingMetricChunk.run_id == run_id,
+                TrainingMetricChunk.metric == metric,
+                TrainingMetricChunk.first_step <= start,
+            )
+            .scalar_subquery()
+        )
+        query = query.where(TrainingMetricChunk.first_step >= func.coalesce(first, start))
+    if end is not None:
+        query = query.where(TrainingMetricChunk.first_step <= end)
+    return query.order_by(TrainingMetricChunk.first_step)
+
+def _points_in_range(
+    chunk_steps: bytes, chunk_values: bytes, start: Optional[int], end: Optional[int]
+) -> Tuple[List[int], List[float]]:
+    steps, values = _unpack("q", chunk_steps), _unpack("d", chunk_values)
+    kept = [
+        index for index in range(len(steps))
+        if (start is None or steps[index] >= start) and (end is None or steps[index] <= end)
+    ]
+    if len(kept) == len(steps):
+        return list(steps), list(values)
+    return [steps[index] for index in kept], [values[index] for index in kept]
+
+def query_metric(
+    *, db: Session, run_id: int, metric: str, start: Optional[int], end: Optional[int], points: int, method: str
+) -> MetricSeries:
+    """
+    One metric of a run over the steps [start, end] (None: unbounded), downsampled to at
+    most `points` points with `method` ("lttb" or "minmax", see app/services/downsample.py).
+
+    When the range spans at least `points` chunks, the curve is computed from the
+    chunks' lowest and highest points alone (a min-max preselection, then `method`):
+    only the chunks at the edges of the range are read, however many steps it holds.
+    Otherwise the points of the range are read and downsampled.
+
+    Returns:
+        The series (empty if the metric has no points in the range).
+    """
+    Chunk = TrainingMetricChunk
+    summaries = db.exec(_chunks_in_range(
+        run_id, metric, start, end, Chunk.first_step, Chunk.last_step, Chunk.count, Chunk.min_step, Chunk.min_value, Chunk.max_step, Chunk.max_value,
+    )).all()
+
+    if len(summaries) < points:
+        steps, values = [], []
+        for chunk_steps, chunk_values in db.exec(_chunks_in_range(run_id, metric, start, end, Chunk.steps, Chunk.values)):
+            more_steps, more_values = _points_in_range(chunk_steps, chunk_values, start, end)
+            steps += more_steps
+            values += more_values
+        count = len(steps)
+    else:
+        count, candidates = 0, []
+        edges = {
+            summary.first_step for summary in (summaries[0], summaries[-1])
+            if (start is not None and summary.first_step < start) or (end is not None and summary.last_step > end)
+        }
+        edge_points = {}
+        if edges:
+            # Chunks partly outside the range: their extremes are taken from the points inside
+            for first_step, chunk_steps, chunk_values in db.exec(
+                select(Chunk.first_step, Chunk.steps, Chunk.values)
+                .where(Chunk.run_id == run_id, Chunk.metric == metric, Chunk.first_step.in_(edges))
+            ):
+                edge_points[first_step] = _points_in_range(chunk_steps, chunk_values, start, end)
+        for summary in summaries:
+            if summary.first_step in edge_points:
+                chunk_steps, chunk_values = edge_points[summary.first_step]
+                if not chunk_steps:
+                    continue
+                lowest = min(range(len(chunk_values)), key=chunk_values.__getitem__)
+                highest = max(range(len(chunk_values)), key=chunk_values.__getitem__)
+                extremes = {(chunk_steps[lowest], chunk_values[lowest]), (chunk_steps[highest], chunk_values[highest])}
+                count += len(chunk_steps)
+            else:
+                extremes = {(summary.min_step, summary.min_value), (summary.max_step, summary.max_value)}
+                count += summary.count
+            candidates += sorted(extremes)
+        steps = [step for step, _ in candidates]
+        values = [value for _, value in candidates]
+
+    downsampled = None
+    if len(steps) > points:
+        steps, values = downsample(steps, values, points, method)
+        downsampled = method
+    elif len(steps) < count:
+        downsampled = "minmax" # The chunks' extremes, already fewer than `points`
+    return MetricSeries(metric=metric, count=count, steps=steps, values=values, downsampled=downsampled)
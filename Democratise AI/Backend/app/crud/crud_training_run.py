@@ -1,11 +1,64 @@
 # File: app/crud/crud_training_run.py
 
-from typing import List, Optional
+import hashlib
+import json
+import re
+import secrets
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
 
+from sqlalchemy import Float, String, and_, bindparam, case, cast, delete, func, or_, text, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Session, select
 
-from app.models.training_run import TrainingRun # The DB model
+from app.core.config import settings
+from app.crud import crud_user_stats
+from app.crud.pagination import Page, paginate
+from app.db import partitions
+from app.models.idempotency_key import IdempotencyKey
+from app.models.training_run import TrainingRun, TrainingRunArchive, TrainingRunArchiveProject # The DB models
+from app.models.training_share import TrainingShare
+from app.models.user_stats import UserStats
 from app.schemas.training_run import TrainingRunCreate # The input schema
+from app.services import run_archive, run_events
+from app.utils import aware_utcnow
+
+# Statuses of runs that won't change anymore (the runs that can be archived)
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+# Run queries: "<key><op><value>" filters on top-level config_params/metrics keys,
+# e.g. "optimizer=adam" (config) or "accuracy>0.9" (metrics)
+_KEY = r"[A-Za-z0-9_./-]{1,100}"
+_CONFIG_FILTER = re.compile(rf"^({_KEY})=(.*)$")
+_METRIC_FILTER = re.compile(rf"^({_KEY})(>=|<=|!=|>|<|=)(.+)$")
+_SORT = re.compile(rf"^(-?)(created_at|(metrics|config)\.({_KEY}))$")
+_COMPARISONS = {
+    ">=": lambda a, b: a >= b, "<=": lambda a, b: a <= b, "!=": lambda a, b: a != b,
+    ">": lambda a, b: a > b, "<": lambda a, b: a < b, "=": lambda a, b: a == b,
+}
+
+# Runs not picked up by a worker yet: an identical submission returns them instead of queuing another
+PENDING_STATUSES = ("queued", "starting")
+
+# Runs held by a worker under a lease (see claim_training_runs)
+CLAIMED_STATUSES = ("starting", "running")
+
+# pg_advisory_xact_lock namespace serializing the submissions of a project ("subm")
+_SUBMIT_LOCK_NAMESPACE = 0x7375626D
+
+class IdempotencyKeyReused(ValueError):
+    """
+    Raised when an Idempotency-Key is sent again with a different submission.
+    """
+
+class InvalidRunQuery(ValueError):
+    """
+    Raised for a malformed filter or sort of query_project_runs.
+    Mapped to a 400 response in app/main.py.
+    """
 
 def get_training_run(*, db: Session, id: int) -> Optional[TrainingRun]:
     """
@@ -17,15 +70,59 @@ def get_training_run(*, db: Session, id: int) -> Optional[TrainingRun]:
 
     Returns:
         The TrainingRun object if found, otherwise None.
+        Archived runs are not in the table (see get_archives_for_run).
     """
     run = db.get(TrainingRun, id)
     return run
 
+def get_archives_for_run(*, db: Session, id: int) -> List[TrainingRunArchive]:
+    """
+    The archive files whose id range contains `id` (newest first), for runs moved
+    out of the table by archive_training_runs.
+    """
+    statement = (
+        select(TrainingRunArchive)
+        .where(TrainingRunArchive.min_id <= id, TrainingRunArchive.max_id >= id)
+        .order_by(TrainingRunArchive.id.desc())
+    )
+    return db.exec(statement).all()
+
+def read_archived_training_run(archives: List[TrainingRunArchive], id: int) -> Optional[TrainingRun]:
+    """
+    Reads a training run from archive files (blocking file I/O, no database access).
+
+    Returns:
+        A transient TrainingRun built from the archived record, or None.
+    """
+    for archive in archives:
+        try:
+            record = run_archive.find_record(Path(archive.path), id)
+        except FileNotFoundError:
+            continue # Replaced since the lookup (remove_archived_runs) or lost
+        if record is not None:
+            return TrainingRun.model_validate(record)
+    return None
+
+def _new_training_run(db: Session, *, run_in: TrainingRunCreate, project_id: int, user_id: int) -> TrainingRun:
+    # Adds a queued run (and counts it) without committing
+    _join_fair_share(db, user_id=user_id)
+    db_run = TrainingRun(
+        **run_in.model_dump(), # Includes model_id, dataset_id, config_params
+        project_id=project_id,
+        user_id=user_id,
+        status="queued", # Set initial status
+        # Other fields like metrics, logs_location, started/completed_at are initially None/empty
+    )
+    db.add(db_run)
+    crud_user_stats.increment(db, user_id=user_id, runs={"queued": 1})
+    return db_run
+
 def create_training_run(
     *, db: Session, run_in: TrainingRunCreate, project_id: int, user_id: int
 ) -> TrainingRun:
     """
     Creates a database record for a new training run, initially in 'queued' status.
+    API submissions go through submit_training_run (retries and duplicates are folded).
 
     Args:
         db: The database session.
@@ -36,22 +133,670 @@ def create_training_run(
     Returns:
         The created TrainingRun database object.
     """
-    # Extract data from the input schema
-    run_data = run_in.model_dump()
-
-    # Create the TrainingRun model instance
-    db_run = TrainingRun(
-        **run_data, # Includes model_id, dataset_id, config_params
-        project_id=project_id,
-        user_id=user_id,
-        status="queued", # Set initial status
-        # Other fields like metrics, logs_location, started/completed_at are initially None/empty
-    )
-    db.add(db_run)
+    db_run = _new_training_run(db, run_in=run_in, project_id=project_id, user_id=user_id)
     db.commit()
     db.refresh(db_run)
     return db_run
 
+def _submission_hash(project_id: int, run_in: TrainingRunCreate) -> str:
+    # Fingerprint of a submission: same project, model, dataset and config (key order ignored)
+    payload = json.dumps({"project_id": project_id, **run_in.model_dump()}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def submit_training_run(
+    *,
+    db: Session,
+    run_in: TrainingRunCreate,
+    project_id: int,
+    user_id: int,
+    idempotency_key: Optional[str] = None,
+) -> Tuple[TrainingRun, bool]:
+    """
+    Queues a training run for a job submission, unless it repeats an earlier one:
+
+    - Idempotency-Key: a key seen in the last settings.TRAINING_IDEMPOTENCY_KEY_TTL_HOURS
+      returns the run it created (client retries don't queue more runs).
+    - Without a key, a submission identical to a run still queued/starting and created
+      in the last settings.TRAINING_SUBMIT_DEDUPE_SECONDS returns that run (double submits).
+
+    On PostgreSQL the submissions of a project are serialized by an advisory lock held
+    until the commit, so of two identical concurrent submissions the second one sees
+    the run of the first.
+
+    Args:
+        db: The database session (primary).
+        run_in: Training run creation data (model_id, dataset_id, config_params).
+        project_id: The ID of the associated project.
+        user_id: The ID of the user submitting the job.
+        idempotency_key: The request's Idempotency-Key header, if any.
+
+    Returns:
+        The run, and whether it was created by this call (False: an earlier run).
+
+    Raises:
+        IdempotencyKeyReused: If the key was used for a different submission.
+    """
+    request_hash = _submission_hash(project_id, run_in)
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(select(func.pg_advisory_xact_lock(_SUBMIT_LOCK_NAMESPACE, project_id)))
+    now = aware_utcnow()
+
+    run = None
+    if idempotency_key is not None:
+        stored = db.exec(
+            select(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == idempotency_key,
+                IdempotencyKey.created_at >= now - timedelta(hours=settings.TRAINING_IDEMPOTENCY_KEY_TTL_HOURS),
+            )
+        ).first()
+        if stored is not None:
+            if stored.request_hash != request_hash:
+                db.rollback()
+                raise IdempotencyKeyReused("This Idempotency-Key was already used for a different request")
+            run = db.get(TrainingRun, stored.training_run_id)
+            if run is not None:
+                db.commit()
+                return run, False
+            # The run is gone (its project was deleted): the key is free again
+
+    if settings.TRAINING_SUBMIT_DEDUPE_SECONDS:
+        # A handful of recent runs at most (ix_trainingrun_project_id_created_at)
+        recent = db.exec(
+            select(TrainingRun).where(
+                TrainingRun.project_id == project_id,
+                TrainingRun.created_at >= now - timedelta(seconds=settings.TRAINING_SUBMIT_DEDUPE_SECONDS),
+                TrainingRun.user_id == user_id,
+                TrainingRun.model_id == run_in.model_id,
+                TrainingRun.dataset_id == run_in.dataset_id,
+                TrainingRun.status.in_(PENDING_STATUSES),
+            ).order_by(TrainingRun.created_at.desc())
+        ).all()
+        run = next((candidate for candidate in recent if candidate.config_params == run_in.config_params), None)
+
+    created = run is None
+    if created:
+        run = _new_training_run(db, run_in=run_in, project_id=project_id, user_id=user_id)
+        db.flush() # Assigns run.id
+    if idempotency_key is not None:
+        # Replaces an expired entry of the same key
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        values = dict(request_hash=request_hash, training_run_id=run.id, created_at=now)
+        db.execute(
+            dialect.insert(IdempotencyKey.__table__)
+            .values(user_id=user_id, key=idempotency_key, **values)
+            .on_conflict_do_update(index_elements=["user_id", "key"], set_=values)
+        )
+    db.commit()
+    db.refresh(run)
+    return run, created
+
+def delete_expired_idempotency_keys(db: Session, *, before: datetime) -> int:
+    """
+    Deletes the idempotency keys created before `before` (ix_idempotencykey_created_at).
+
+    Returns:
+        The number of keys deleted.
+    """
+    deleted = db.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < before)).rowcount
+    db.commit()
+    return deleted
+
+def _join_fair_share(db: Session, *, user_id: int) -> None:
+    # Before queuing a run: a user with no run waiting (re)joins the scheduler's rotation at
+    # the smallest virtual time of the waiting users, not behind them, nor ahead with the
+    # credit of the time they were idle
+    if db.exec(select(UserStats.runs_queued).where(UserStats.user_id == user_id)).first():
+        return
+    floor = db.exec(
+        select(func.min(TrainingShare.virtual_time))
+        .join(UserStats, UserStats.user_id == TrainingShare.user_id)
+        .where(UserStats.runs_queued > 0)
+    ).one()
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(TrainingShare.__table__).values(user_id=user_id, virtual_time=floor or 0.0)
+    if floor is None:
+        statement = statement.on_conflict_do_nothing(index_elements=["user_id"])
+    else:
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={"virtual_time": case((TrainingShare.virtual_time < floor, floor), else_=TrainingShare.virtual_time)},
+        )
+    db.execute(statement)
+
+def _next_fair_share(db: Session, *, skip: Sequence[int], verify: bool = False) -> Optional[TrainingShare]:
+    # The user with runs queued, below their concurrency cap and next in line (other than
+    # `skip`). Their share row is locked, and rows locked by concurrent claims skipped:
+    # parallel workers claim for different users, and a user's cap can't be exceeded by a race.
+    # Uses the counts kept in userstats (ix_userstats_runs_queued), not a scan of the queue;
+    # with `verify`, checks each user's queue instead (ix_trainingrun_user_id_queued), for
+    # when the counts have drifted.
+    active = UserStats.runs_starting + UserStats.runs_running
+    cap = func.coalesce(TrainingShare.max_active_runs, settings.TRAINING_MAX_ACTIVE_RUNS_PER_USER)
+    if verify:
+        queued = (
+            select(TrainingRun.id)
+            .where(TrainingRun.user_id == TrainingShare.user_id, TrainingRun.status == "queued")
+            .exists()
+        )
+    else:
+        queued = UserStats.runs_queued > 0
+    return db.exec(
+        select(TrainingShare)
+        .join(UserStats, UserStats.user_id == TrainingShare.user_id)
+        .where(queued, or_(cap <= 0, active < cap), TrainingShare.user_id.not_in(skip))
+        .order_by(TrainingShare.virtual_time, TrainingShare.user_id)
+        .limit(1)
+        .with_for_update(of=TrainingShare, skip_locked=True)
+    ).first()
+
+def _claim_next_run(db: Session, *, user_id: int, worker_id: str, lease_seconds: float) -> Optional[TrainingRun]:
+    # The user's next queued run, highest priority then oldest (ix_trainingrun_user_id_queued)
+    now = aware_utcnow()
+    claimable = (
+        select(TrainingRun.id, TrainingRun.created_at)
+        .where(TrainingRun.user_id == user_id, TrainingRun.status == "queued")
+        .order_by(TrainingRun.priority.desc(), TrainingRun.created_at, TrainingRun.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    return db.scalars(
+        update(TrainingRun)
+        # "= (subquery)", not "IN": the locking subquery runs once (an InitPlan), whereas a
+        # semi join may rescan it per row and, skipping the row just claimed, claim more.
+        # status is checked again for SQLite, which ignores FOR UPDATE (writers are serialized instead)
+        .where(
+            tuple_(TrainingRun.id, TrainingRun.created_at) == claimable.scalar_subquery(),
+            TrainingRun.status == "queued",
+        )
+        .values(
+            status="starting",
+            worker_id=worker_id,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            attempts=TrainingRun.attempts + 1,
+            updated_at=now,
+        )
+        .returning(TrainingRun),
+        execution_options={"synchronize_session": False},
+    ).first()
+
+def claim_training_runs(db: Session, *, worker_id: str, lease_seconds: float, limit: int = 1) -> List[TrainingRun]:
+    """
+    Claims queued runs for a worker: they move to 'starting' under a lease the worker
+    must renew (renew_training_run_lease) until it finishes them.
+
+    Runs are scheduled by fair share (see TrainingShare): each run goes to the user with
+    runs queued, below their cap of active runs, and with the smallest virtual time,
+    which then grows by 1/weight. Users are found through their userstats.runs_queued
+    count, so a user whose count is 0 with runs queued (written outside the CRUD
+    functions) isn't scheduled until `python -m app.scripts.rebuild_user_stats` repairs it. Within a user's runs, higher priority and then older
+    runs come first. Queued runs are selected FOR UPDATE SKIP LOCKED: concurrent workers
+    never wait for each other nor claim the same run.
+
+    Args:
+        db: The database session.
+        worker_id: Identifies the claiming worker.
+        lease_seconds: How long the claim holds without being renewed.
+        limit: Maximum number of runs to claim.
+
+    Returns:
+        The claimed runs (empty if no run can be started).
+    """
+    runs = []
+    while len(runs) < limit:
+        run, skip, verify = None, [], False
+        # A few users at most, in case the next user's queued runs are all being claimed already
+        while run is None and len(skip) < 10:
+            share = _next_fair_share(db, skip=skip, verify=verify)
+            if share is None:
+                break
+            run = _claim_next_run(db, user_id=share.user_id, worker_id=worker_id, lease_seconds=lease_seconds)
+            skip.append(share.user_id)
+            # userstats counted runs the user has no longer (or are being claimed): the next
+            # users are picked from the queue itself, so stale counts can't stall the claim
+            verify = run is None
+        if run is None:
+            break
+        share.virtual_time += 1.0 / share.weight if share.weight > 0 else 1.0
+        db.add(share)
+        db.flush() # The next claim's user is picked with this virtual time
+        crud_user_stats.increment(db, user_id=run.user_id, runs={"queued": -1, "starting": 1})
+        run_events.publish(db, run)
+        runs.append(run)
+    db.commit()
+    return runs
+
+def _move_claimed_run(
+    db: Session, *, run_id: int, worker_id: str, from_status: str, to_status: str, values: Dict[str, Any]
+) -> Optional[TrainingRun]:
+    # One UPDATE ... RETURNING, only while the worker still holds the run in `from_status`
+    # (its lease may have expired and the run been given to another worker)
+    run = db.scalars(
+        update(TrainingRun)
+        .where(TrainingRun.id == run_id, TrainingRun.worker_id == worker_id, TrainingRun.status == from_status)
+        .values(status=to_status, updated_at=aware_utcnow(), **values)
+        .returning(TrainingRun),
+        execution_options={"synchronize_session": False},
+    ).first()
+    if run is None:
+        db.rollback()
+        return None
+    crud_user_stats.increment(db, user_id=run.user_id, runs={from_status: -1, to_status: 1})
+    run_events.publish(db, run)
+    db.commit()
+    return run
+
+def _set_status(db: Session, run: TrainingRun, status: str) -> None:
+    crud_user_stats.increment(db, user_id=run.user_id, runs={run.status: -1, status: 1})
+    run.status = status
+
+def start_training_run(
+    db: Session, *, run_id: int, worker_id: str, lease_seconds: float, logs_location: Optional[str] = None
+) -> Optional[TrainingRun]:
+    """
+    Moves a claimed run to 'running' (sets started_at and logs_location) and renews its lease.
+
+    Returns:
+        The run, or None if the worker no longer holds it.
+    """
+    now = aware_utcnow()
+    values = {"started_at": now, "lease_expires_at": now + timedelta(seconds=lease_seconds)}
+    if logs_location is not None:
+        values["logs_location"] = logs_location
+    return _move_claimed_run(
+        db, run_id=run_id, worker_id=worker_id, from_status="starting", to_status="running", values=values
+    )
+
+def renew_training_run_lease(db: Session, *, run_id: int, worker_id: str, lease_seconds: float) -> bool:
+    """
+    Extends the lease of a run the worker is working on (its heartbeat).
+
+    Returns:
+        False if the lease was lost (expired and requeued): the worker should abandon the run.
+    """
+    renewed = db.execute(
+        update(TrainingRun)
+        .where(TrainingRun.id == run_id, TrainingRun.worker_id == worker_id, TrainingRun.status.in_(CLAIMED_STATUSES))
+        .values(lease_expires_at=aware_utcnow() + timedelta(seconds=lease_seconds))
+    ).rowcount
+    db.commit()
+    return renewed > 0
+
+def finish_training_run(
+    db: Session,
+    *,
+    run_id: int,
+    worker_id: str,
+    status: str,
+    metrics: Optional[Dict[str, Any]] = None,
+    error: Optional[str] = None,
+) -> bool:
+    """
+    Records the outcome of a running run ('completed' or 'failed'), sets completed_at
+    and releases the lease.
+
+    Returns:
+        False if the worker no longer held the run (nothing is written).
+    """
+    values = {"error": error, "completed_at": aware_utcnow(), "worker_id": None, "lease_expires_at": None}
+    if metrics is not None:
+        values["metrics"] = metrics
+    run = _move_claimed_run(
+        db, run_id=run_id, worker_id=worker_id, from_status="running", to_status=status, values=values
+    )
+    return run is not None
+
+def requeue_expired_runs(db: Session, *, max_attempts: int, limit: int = 100) -> Tuple[int, int]:
+    """
+    Takes back the runs whose worker stopped renewing its lease (crashed, killed, partitioned
+    away): they are queued again, or failed once claimed `max_attempts` times.
+    Safe to call from every worker concurrently (SKIP LOCKED, ix_trainingrun_lease_expires_at).
+
+    Returns:
+        The number of runs requeued and failed.
+    """
+    now = aware_utcnow()
+    expired = db.exec(
+        select(TrainingRun)
+        .where(TrainingRun.status.in_(CLAIMED_STATUSES), TrainingRun.lease_expires_at < now)
+        .order_by(TrainingRun.lease_expires_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+    requeued = failed = 0
+    for run in expired:
+        if run.attempts >= max_attempts:
+            _set_status(db, run, "failed")
+            run.error = f"Worker lost {run.attempts} times"
+            run.completed_at = now
+            failed += 1
+        else:
+            _set_status(db, run, "queued")
+            requeued += 1
+        run.worker_id = None
+        run.lease_expires_at = None
+        run.updated_at = now # Set here rather than on flush: the event carries it
+        db.add(run)
+        run_events.publish(db, run)
+    db.commit()
+    return requeued, failed
+
+def _uncount_runs(db: Session, runs: Iterable[Tuple[int, str]]) -> None:
+    # Archived runs leave their users' stats (which count the runs in the table)
+    for user_id, deltas in crud_user_stats.run_deltas(runs, sign=-1).items():
+        crud_user_stats.increment(db, user_id=user_id, runs=deltas)
+
+def _delete_archived_rows(db: Session, rows: Sequence[Tuple[int, datetime, datetime]]) -> List[Tuple[int, str]]:
+    """
+    Deletes the rows written to an archive, by (id, created_at, updated_at): exactly the
+    rows as they were archived, so a run updated (or finished) since then is kept.
+    On PostgreSQL: one DELETE ... USING unnest(...) (three array parameters), elsewhere
+    a row-value IN list in chunks.
+
+    Returns:
+        The (user_id, status) of the deleted runs.
+    """
+    table = TrainingRun.__table__
+    finished = table.c.status.in_(FINISHED_STATUSES)
+    if db.get_bind().dialect.name != "postgresql":
+        deleted = []
+        for start in range(0, len(rows), 1000): # Bound parameters per statement (3 per row)
+            key = tuple_(table.c.id, table.c.created_at, table.c.updated_at)
+            deleted += db.execute(
+                delete(table).where(key.in_(rows[start:start + 1000]), finished)
+                .returning(table.c.user_id, table.c.status)
+            ).all()
+        return deleted
+
+    keys = ("id", "created_at", "updated_at")
+    arrays = [
+        bindparam(f"{key}_values", [row[index] for row in rows], type_=postgresql.ARRAY(table.c[key].type))
+        for index, key in enumerate(keys)
+    ]
+    # unnest(...) AS data(id, created_at, updated_at): one row per archived run
+    data = func.unnest(*arrays).table_valued(*keys).render_derived(name="data")
+    return db.execute(
+        delete(table)
+        .where(*(table.c[key] == data.c[key] for key in keys), finished)
+        .returning(table.c.user_id, table.c.status)
+    ).all()
+
+def archive_training_runs(db: Session, *, before: datetime, directory: str, batch_size: int = 10000) -> int:
+    """
+    Moves the finished runs of every month that ended before `before` from the database
+    to archive files (gzipped JSON Lines, one file per month and pass), recorded in
+    TrainingRunArchive: get_archives_for_run and read_archived_training_run still find
+    them (GET /training/jobs/{id} falls back to them).
+
+    On a partitioned table (PostgreSQL), a month without unfinished runs is removed by
+    dropping its partition; otherwise the archived rows are deleted in batches.
+
+    Args:
+        db: The database session (primary).
+        before: Archive months ending on or before this (naive UTC).
+        directory: Where the archive files are written.
+        batch_size: Rows per DELETE transaction (when no partition can be dropped).
+
+    Returns:
+        The number of runs archived.
+    """
+    table = TrainingRun.__table__
+    partitioned = partitions.is_partitioned(db.connection(), table.name)
+    oldest = db.exec(select(func.min(TrainingRun.created_at))).one()
+    if oldest is None:
+        return 0
+
+    archived = 0
+    month = partitions.month_start(oldest)
+    while partitions.add_months(month, 1) <= before:
+        end = partitions.add_months(month, 1)
+        in_month = and_(table.c.created_at >= month, table.c.created_at < end)
+        finished = and_(in_month, table.c.status.in_(FINISHED_STATUSES))
+
+        # With its own partition, the month is locked against writes while it's archived so
+        # the partition can be dropped without losing a concurrent update
+        droppable = partitioned and partitions.partition_exists(db.connection(), table.name, month)
+        if droppable:
+            db.execute(text(f"LOCK TABLE {partitions.partition_name(table.name, month)} IN SHARE MODE"))
+
+        passes = db.exec(select(func.count()).where(TrainingRunArchive.month == month)).one()
+        path = Path(directory) / f"{table.name}-{month:%Y-%m}{f'-{passes + 1}' if passes else ''}.jsonl.gz"
+        while path.exists(): # Taken by a later pass (remove_archived_runs deleted an earlier one)
+            passes += 1
+            path = Path(directory) / f"{table.name}-{month:%Y-%m}-{passes + 1}.jsonl.gz"
+        # Streamed in id order, without loading the month into memory
+        rows = db.execute(select(table).where(finished).order_by(table.c.id).execution_options(yield_per=1000))
+        written: List[Tuple[int, datetime, datetime]] = [] # (id, created_at, updated_at) of the archived rows
+        streamed: Counter = Counter() # (user_id, status) -> runs archived
+        project_ids = set()
+
+        def records():
+            for row in rows:
+                record = dict(row._mapping)
+                written.append((record["id"], record["created_at"], record["updated_at"]))
+                streamed[record["user_id"], record["status"]] += 1
+                project_ids.add(record["project_id"])
+                yield record
+
+        count, min_id, max_id = run_archive.write_records(path, records())
+        if not count:
+            path.unlink(missing_ok=True) # Nothing finished in that month (yet)
+        else:
+            archive = TrainingRunArchive(month=month, path=str(path), row_count=count, min_id=min_id, max_id=max_id)
+            db.add(archive)
+            db.flush()
+            db.add_all(TrainingRunArchiveProject(archive_id=archive.id, project_id=project_id) for project_id in sorted(project_ids))
+            archived += count
+        if droppable and not db.exec(select(func.count()).select_from(table).where(in_month, ~finished)).one():
+            partitions.drop_partition(db.connection(), table.name, month)
+            _uncount_runs(db, streamed.elements())
+            db.commit()
+        else:
+            db.commit() # The archive is recorded before its rows go
+            for start in range(0, len(written), batch_size):
+                deleted = _delete_archived_rows(db, written[start:start + batch_size])
+                _uncount_runs(db, deleted)
+                db.commit()
+        month = end
+    return archived
+
+class ArchivedRunsRemoval(NamedTuple):
+    run_ids: List[int] # The removed runs (their logs go once committed)
+    written: List[Path] # The rewritten archive files: remove them if the transaction fails
+    replaced: List[Path] # The files they replace: remove them once the transaction is committed
+
+def remove_archived_runs(db: Session, *, project_id: int, since: datetime) -> ArchivedRunsRemoval:
+    """
+    Removes the archived runs of a project (being purged): the archive files holding
+    some are rewritten without them under new names, and their TrainingRunArchive rows
+    pointed at the new files (or deleted if nothing is left). Doesn't commit, and the
+    current files stay in place: the caller removes `replaced` once committed and
+    `written` if the transaction fails, so archives always match the committed rows.
+
+    Only the files recorded as holding the project's runs (TrainingRunArchiveProject)
+    are read, plus those archived before the projects were recorded.
+
+    Args:
+        db: The database session (primary); the archive rows are locked until the commit.
+        project_id: The project whose runs are removed.
+        since: The project's creation time (older unrecorded archives can't hold its runs).
+    """
+    recorded = select(TrainingRunArchiveProject.archive_id).where(TrainingRunArchiveProject.project_id == project_id)
+    archives = db.exec(
+        select(TrainingRunArchive)
+        .where(or_(
+            TrainingRunArchive.id.in_(recorded),
+            and_(~TrainingRunArchive.projects_recorded, TrainingRunArchive.month >= partitions.month_start(since)),
+        ))
+        .order_by(TrainingRunArchive.id).with_for_update()
+    ).all()
+    removal = ArchivedRunsRemoval([], [], [])
+    try:
+        for archive in archives:
+            path = Path(archive.path)
+            db.execute(delete(TrainingRunArchiveProject).where(
+                TrainingRunArchiveProject.archive_id == archive.id, TrainingRunArchiveProject.project_id == project_id
+            ))
+            if not path.exists():
+                continue # Lost (its runs can't be read anyway)
+            if not archive.projects_recorded and not any(
+                record["project_id"] == project_id for record in run_archive.read_records(path)
+            ):
+                continue
+            removed: List[int] = []
+
+            def kept():
+                for record in run_archive.read_records(path):
+                    if record["project_id"] == project_id:
+                        removed.append(record["id"])
+                    else:
+                        yield record
+
+            # A new name, unique to this rewrite (the current file stays until the commit)
+            name = f"{TrainingRun.__table__.name}-{archive.month:%Y-%m}-{archive.id}-{secrets.token_hex(4)}.jsonl.gz"
+            new_path = path.with_name(name)
+            removal.written.append(new_path)
+            count, min_id, max_id = run_archive.write_records(new_path, kept())
+            if count:
+                archive.path, archive.row_count, archive.min_id, archive.max_id = str(new_path), count, min_id, max_id
+                db.add(archive)
+            else:
+                run_archive.remove_files([removal.written.pop()])
+                db.execute(delete(TrainingRunArchiveProject).where(TrainingRunArchiveProject.archive_id == archive.id))
+                db.delete(archive)
+            removal.replaced.append(path)
+            removal.run_ids.extend(removed)
+    except Exception:
+        run_archive.remove_files(removal.written)
+        raise
+    return removal
+
+def create_partitions(db: Session, *, months_ahead: int) -> List[str]:
+    """
+    Creates the missing monthly partitions of the training run table from the current
+    month to `months_ahead` months ahead (no-op unless the table is partitioned).
+
+    Returns:
+        The names of the partitions created.
+    """
+    connection = db.connection()
+    name = TrainingRun.__table__.name
+    if not partitions.is_partitioned(connection, name):
+        return []
+    now = datetime.utcnow()
+    created = partitions.create_monthly_partitions(
+        connection, name, column="created_at", first=now, last=partitions.add_months(now, months_ahead)
+    )
+    db.commit()
+    return created
+
+def _inline(value: str) -> Any:
+    # Rendered as a literal, not a parameter, so PostgreSQL matches the expression indexes
+    return bindparam(None, value, type_=String, literal_execute=True)
+
+def json_number(dialect: str, column: Any, key: str) -> Any:
+    """
+    The numeric value of a top-level key of a JSON column: NULL if the key is missing
+    or not a number, so comparing or sorting never fails on other JSON types.
+    On PostgreSQL it's the expression of the ix_trainingrun_project_id_metrics_* indexes.
+    """
+    if dialect == "postgresql":
+        return case(
+            (func.jsonb_typeof(column.op("->")(_inline(key))) == _inline("number"),
+             cast(column.op("->>")(_inline(key)), Float))
+        )
+    path = _inline(f'$."{key}"')
+    return case(
+        (func.json_type(column, path).in_(["integer", "real"]), cast(func.json_extract(column, path), Float))
+    )
+
+def _json_value(text_value: str) -> Any:
+    # Filter values are JSON when they parse as such (0.001, true, "a b"), plain strings otherwise
+    try:
+        return json.loads(text_value)
+    except ValueError:
+        return text_value
+
+def _config_equals(dialect: str, key: str, value: Any) -> Any:
+    if dialect == "postgresql":
+        # Containment, served by the GIN index ix_trainingrun_config_params
+        return TrainingRun.config_params.op("@>")(bindparam(None, {key: value}, type_=JSONB))
+    path = _inline(f'$."{key}"')
+    if isinstance(value, (dict, list)):
+        return func.json_extract(TrainingRun.config_params, path) == json.dumps(value, separators=(",", ":"))
+    return func.json_extract(TrainingRun.config_params, path) == value
+
+def query_project_runs(
+    db: Session,
+    *,
+    project_id: int,
+    status: Optional[str] = None,
+    config: Sequence[str] = (),
+    metrics: Sequence[str] = (),
+    sort: str = "-created_at",
+    cursor: Optional[str] = None,
+    limit: int = 100,
+) -> Page:
+    """
+    Retrieve a project's training runs filtered and sorted by their config and metric
+    values, entirely in the database, with keyset (cursor) pagination.
+
+    Args:
+        db: The database session.
+        project_id: The project whose runs are queried.
+        status: Only runs with this status.
+        config: "key=value" filters on config_params (equality; the value is parsed as JSON
+                if possible, e.g. "epochs=10", "optimizer=adam").
+        metrics: "key<op>number" filters on metrics, op one of >, >=, <, <=, =, !=
+                 (e.g. "accuracy>0.9"). Runs without a numeric value for the key don't match.
+        sort: "created_at", "metrics.<key>" or "config.<key>", "-" prefixed for descending.
+              Sorting by a key skips the runs without a numeric value for it.
+              A cursor is only valid with the sort it was issued for.
+        cursor: The next_cursor of the previous page (None for the first page).
+        limit: Maximum number of runs to return.
+
+    Returns:
+        The Page of TrainingRun objects (without a total).
+
+    Raises:
+        InvalidRunQuery: If a filter or the sort is malformed.
+    """
+    dialect = db.get_bind().dialect.name
+    conditions: List[Any] = [TrainingRun.project_id == project_id]
+    if status is not None:
+        conditions.append(TrainingRun.status == status)
+    for expression in config:
+        match = _CONFIG_FILTER.match(expression)
+        if match is None:
+            raise InvalidRunQuery(f"Invalid config filter {expression!r}, expected key=value")
+        conditions.append(_config_equals(dialect, match.group(1), _json_value(match.group(2))))
+    for expression in metrics:
+        match = _METRIC_FILTER.match(expression)
+        value = _json_value(match.group(3)) if match else None
+        if match is None or isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise InvalidRunQuery(f"Invalid metric filter {expression!r}, expected e.g. accuracy>0.9")
+        key, op = match.group(1), match.group(2)
+        conditions.append(_COMPARISONS[op](json_number(dialect, TrainingRun.metrics, key), value))
+
+    match = _SORT.match(sort)
+    if match is None:
+        raise InvalidRunQuery(f"Invalid sort {sort!r}, expected created_at, metrics.<key> or config.<key>")
+    descending = match.group(1) == "-"
+    if match.group(2) == "created_at":
+        return paginate(
+            db, select(TrainingRun).where(*conditions), columns=[TrainingRun.created_at, TrainingRun.id],
+            cursor=cursor, limit=limit, descending=descending,
+        )
+
+    column = TrainingRun.metrics if match.group(3) == "metrics" else TrainingRun.config_params
+    sort_value = json_number(dialect, column, match.group(4))
+    statement = select(TrainingRun, sort_value.label("sort_value")).where(*conditions, sort_value.is_not(None))
+    page = paginate(
+        db, statement, columns=[sort_value.label("sort_value"), TrainingRun.id],
+        cursor=cursor, limit=limit, descending=descending,
+    )
+    return page._replace(items=[run for run, _ in page.items])
+
 # Optional: Function to get runs for a specific project
 # def get_multi_by_project(
 #     db: Session, *, project_id: int, skip: int = 0, limit: int = 100
@@ -1,9 +1,11 @@
 # File: app/crud/crud_user.py
 
 from typing import Optional
+from sqlalchemy.orm import make_transient_to_detached
 from sqlmodel import Session, select # Use select for SQLModel queries
 
-from app.core.security import get_password_hash, verify_password
+from app.core.principal_cache import principal_cache
+from app.services.hashing import hashing_service # bcrypt runs in the hashing process pool
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdateProfile 
 from typing import Any, Union, Dict
@@ -26,18 +28,22 @@ def get_user_by_email(db: Session, *, email: str) -> Optional[User]:
     user = db.exec(statement).first()
     return user
 
-def create_user(db: Session, *, user_in: UserCreate) -> User:
+def create_user(
+    db: Session, *, user_in: UserCreate, password_hash: Optional[str] = None
+) -> User:
     """
     Creates a new user in the database.
 
     Args:
         db: The database session.
         user_in: User creation data (from UserCreate schema).
+        password_hash: Pre-computed hash of user_in.password (e.g. hashed by an async
+                       endpoint). If None, the password is hashed here.
 
     Returns:
         The created User object.
     """
-    hashed_password = get_password_hash(user_in.password)
+    hashed_password = password_hash or hashing_service.get_password_hash(user_in.password)
     # Create a User model instance from the schema data
     # Exclude the plain password, add the hashed version
     user_data = user_in.model_dump(exclude={"password"}) # Use model_dump in Pydantic v2
@@ -63,12 +69,43 @@ def authenticate_user(db: Session, *, email: str, password: str) -> Optional[Use
     user = get_user_by_email(db, email=email)
     if not user:
         return None # User not found
-    if not verify_password(password, user.password_hash):
+    if not hashing_service.verify_password(password, user.password_hash):
         return None # Incorrect password
     return user
 
-# Add update_user function later for settings page
-# def update_user(...): ...
+def attach_user_snapshot(db: Session, *, snapshot: Dict[str, Any]) -> User:
+    """
+    Rebuilds a User from cached column values and attaches it to the session
+    without emitting SQL (used for principal cache hits).
+
+    Args:
+        db: The database session (for an AsyncSession, pass its sync_session).
+        snapshot: Column values as produced by User.model_dump().
+
+    Returns:
+        The session-bound User object.
+    """
+    cached_user = User(**snapshot)
+    make_transient_to_detached(cached_user) # Clean, detached state with identity key
+    return db.merge(cached_user, load=False)
+
+def update_password(db: Session, *, db_obj: User, password_hash: str) -> User:
+    """
+    Stores a new password hash for a user and drops their cached principal.
+
+    Args:
+        db: The database session.
+        db_obj: The User database object.
+        password_hash: The already hashed new password.
+
+    Returns:
+        The updated User object.
+    """
+    db_obj.password_hash = password_hash
+    db.add(db_obj)
+    db.commit()
+    principal_cache.invalidate(db_obj.email) # Cached snapshot holds the old hash
+    return db_obj
 
 def update_user(
     *, db: Session, db_obj: User, obj_in: Union[UserUpdateProfile, Dict[str, Any]]
@@ -102,6 +139,8 @@ def update_user(
             # Alternatively, raise ValueError("Email already registered by another user.")
             pass # Let endpoint handle potential DB unique constraint error or check first
 
+    previous_email = db_obj.email
+
     # Update model fields
     for field, value in update_data.items():
         # Ensure we don't accidentally update forbidden fields if input is dict
@@ -110,5 +149,7 @@ def update_user(
 
     db.add(db_obj)
     db.commit()
+    # Drop cached principals for both the old and the new email (token subject)
+    principal_cache.invalidate(previous_email, db_obj.email)
     db.refresh(db_obj)
     return db_obj
@@ -0,0 +1,108 @@
+# File: app/crud/crud_user_stats.py
+
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+
+from app.models.dataset import Dataset
+from app.models.project import Project
+from app.models.training_run import TrainingRun
+from app.models.user_stats import UserStats # The DB model
+from app.utils import aware_utcnow
+
+# Training run statuses with a runs_<status> column in UserStats
+RUN_STATUSES = ("queued", "starting", "running", "completed", "failed", "cancelled")
+
+# Projects in this status are being purged and no longer counted (crud_project.PROJECT_DELETING)
+_PROJECT_DELETING = "deleting"
+
+def get_user_stats(*, db: Session, user_id: int) -> Optional[UserStats]:
+    """
+    Retrieve the dashboard counts of a user (one primary-key lookup).
+
+    Returns:
+        The UserStats row, or None for a user who never wrote anything (all counts 0).
+    """
+    return db.get(UserStats, user_id)
+
+def run_deltas(rows: Iterable[Tuple[int, str]], sign: int = 1) -> Dict[int, Counter]:
+    """
+    Groups (user_id, status) pairs of training runs into per-user status counts,
+    ready for increment(runs=...). Use sign=-1 for removed runs.
+    """
+    deltas: Dict[int, Counter] = {}
+    for user_id, status in rows:
+        deltas.setdefault(user_id, Counter())[status] += sign
+    return deltas
+
+def increment(
+    db: Session,
+    *,
+    user_id: int,
+    projects: int = 0,
+    datasets: int = 0,
+    runs: Optional[Dict[str, int]] = None,
+) -> None:
+    """
+    Adds (or with negative values, subtracts) to a user's counts in one atomic upsert.
+    Doesn't commit: call it in the transaction of the write being counted, just before
+    its commit, so the counts change exactly when the write becomes visible (and the
+    stats row stays locked for as short as possible).
+
+    Args:
+        db: The database session.
+        user_id: The user whose counts change.
+        projects: Change of the number of projects.
+        datasets: Change of the number of datasets.
+        runs: Change of the number of training runs per status (other statuses are ignored).
+    """
+    deltas = {"projects": projects, "datasets": datasets}
+    for status, count in (runs or {}).items():
+        if status in RUN_STATUSES:
+            deltas[f"runs_{status}"] = deltas.get(f"runs_{status}", 0) + count
+    deltas = {name: count for name, count in deltas.items() if count}
+    if not deltas:
+        return
+
+    table = UserStats.__table__
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    now = aware_utcnow()
+    statement = dialect.insert(table).values(user_id=user_id, updated_at=now, **deltas)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={**{name: table.c[name] + count for name, count in deltas.items()}, "updated_at": now},
+    )
+    db.execute(statement)
+
+def rebuild_user_stats(db: Session, *, user_id: int) -> UserStats:
+    """
+    Recomputes a user's counts from the tables (to repair drift, e.g. after writes made
+    outside the CRUD functions). The stats row is locked first, so writes committing
+    meanwhile are counted either here or by their own increment, not twice.
+
+    Returns:
+        The recomputed UserStats.
+    """
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    db.execute(
+        dialect.insert(UserStats.__table__).values(user_id=user_id, updated_at=aware_utcnow())
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    stats = db.exec(select(UserStats).where(UserStats.user_id == user_id).with_for_update()).one()
+    stats.projects = db.exec(
+        select(func.count()).where(Project.user_id == user_id, Project.status != _PROJECT_DELETING)
+    ).one()
+    stats.datasets = db.exec(select(func.count()).where(Dataset.user_id == user_id)).one()
+    by_status = dict(db.exec(
+        select(TrainingRun.status, func.count()).where(TrainingRun.user_id == user_id).group_by(TrainingRun.status)
+    ).all())
+    for status in RUN_STATUSES:
+        setattr(stats, f"runs_{status}", by_status.get(status, 0))
+    stats.updated_at = aware_utcnow()
+    db.add(stats)
+    db.commit()
+    db.refresh(stats)
+    return stats
@@ -0,0 +1,146 @@
+# File: app/crud/facets.py
+
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, text, update
+from sqlmodel import Session, select
+
+from app.crud.pagination import _planner_estimate
+
+Counts = Dict[str, List[Dict[str, Any]]]
+
+
+def _ranked(rows: Iterable[Tuple[Any, int]]) -> List[Dict[str, Any]]:
+    # Most frequent value first, then by value (None last); sorted here, the rows are few
+    ranked = sorted((row for row in rows if row[1] > 0), key=lambda row: (-row[1], row[0] is None, row[0]))
+    return [{"value": value, "count": count} for value, count in ranked]
+
+
+def summary_facet_counts(
+    db: Session,
+    *,
+    summary: Any,
+    facets: Sequence[str],
+    filters: Dict[str, Any],
+    scope: Sequence[Any] = (),
+) -> Counts:
+    """
+    Reads facet counts from a precomputed counts table (app/models/facet_count.py): one
+    small GROUP BY per facet over the rows of the matching value combinations, however
+    many rows the counted table has.
+
+    Each facet is counted with all active filters except its own, so the counts
+    show what selecting another value of that facet would return.
+
+    Args:
+        db: The database session.
+        summary: The counts table, e.g. ModelFacetCount.
+        facets: The facet attributes, e.g. ("task_type", "framework").
+        filters: The active filter conditions on `summary`, keyed by the attribute they filter on.
+        scope: Conditions on `summary` that always apply (e.g. visibility).
+
+    Returns:
+        {facet attribute: [{"value": ..., "count": ...}, ...]}, most frequent value first.
+    """
+    counts: Counts = {}
+    for key in facets:
+        column = getattr(summary, key)
+        conditions = [*scope, *(condition for name, condition in filters.items() if name != key)]
+        statement = select(column, func.sum(summary.count)).where(*conditions).group_by(column)
+        counts[key] = _ranked(db.exec(statement).all())
+    return counts
+
+
+def facet_counts(
+    db: Session,
+    *,
+    facets: Sequence[Any],
+    filters: Dict[str, Any],
+    scope: Sequence[Any] = (),
+    exact_limit: int,
+) -> Tuple[Counts, bool]:
+    """
+    Counts rows per distinct value of each facet column (one GROUP BY query per facet),
+    for filters the precomputed counts can't serve (e.g. a name prefix).
+
+    Each facet is counted with all active filters except its own. Like count_capped,
+    a facet reads at most `exact_limit + 1` rows: larger counts are scaled up to
+    PostgreSQL's estimate of the matching rows (other databases count exactly).
+
+    Args:
+        db: The database session.
+        facets: The columns to count by, e.g. (Model.task_type, Model.framework).
+        filters: The active filter conditions, keyed by the attribute they filter on.
+        scope: Conditions that always apply (e.g. visibility), regardless of the filters.
+        exact_limit: Most rows counted exactly per facet.
+
+    Returns:
+        {facet attribute: [{"value": ..., "count": ...}, ...]}, most frequent value first,
+        and whether the counts are estimates.
+    """
+    counts: Counts = {}
+    is_estimate = False
+    for column in facets:
+        conditions = [*scope, *(condition for key, condition in filters.items() if key != column.key)]
+        sample = select(column).where(*conditions).limit(exact_limit + 1).subquery()
+        rows = db.exec(select(sample.c[column.key], func.count()).group_by(sample.c[column.key])).all()
+        read = sum(count for _, count in rows)
+        if read > exact_limit:
+            if db.get_bind().dialect.name == "postgresql":
+                scale = max(_planner_estimate(db, select(column).where(*conditions)), read) / read
+                rows = [(value, round(count * scale)) for value, count in rows]
+                is_estimate = True
+            else:
+                rows = db.exec(select(column, func.count()).where(*conditions).group_by(column)).all()
+        counts[column.key] = _ranked(rows)
+    return counts, is_estimate
+
+
+def increment_facet_counts(db: Session, *, summary: Any, keys: Sequence[str], deltas: Dict[Tuple, int]) -> None:
+    """
+    Adds (or with negative values, subtracts) to the precomputed counts of value
+    combinations. Doesn't commit: call it in the transaction of the counted writes.
+
+    Args:
+        db: The database session.
+        summary: The counts table, e.g. ModelFacetCount.
+        keys: The attributes of a combination, e.g. ("task_type", "framework", "source_type").
+        deltas: Change of the count per combination (values in `keys` order).
+    """
+    for values, delta in sorted(deltas.items(), key=repr): # Same lock order in every transaction
+        if not delta:
+            continue
+        match = [
+            getattr(summary, key).is_(None) if value is None else getattr(summary, key) == value
+            for key, value in zip(keys, values)
+        ]
+        # The first row of the combination (others only appear after concurrent first inserts)
+        first = select(func.min(summary.id)).where(*match).scalar_subquery()
+        updated = db.execute(update(summary).where(summary.id == first).values(count=summary.count + delta))
+        if not updated.rowcount:
+            db.execute(insert(summary).values(**dict(zip(keys, values)), count=delta))
+
+
+def rebuild_facet_counts(db: Session, *, summary: Any, keys: Sequence[str], source: Any) -> int:
+    """
+    Recomputes a counts table from the counted table (one full scan; to repair drift,
+    e.g. after writes made outside the CRUD functions) and commits.
+
+    Args:
+        db: The database session.
+        summary: The counts table, e.g. ModelFacetCount.
+        keys: The attributes of a combination.
+        source: A select() of the combination's values and their count, grouped by them.
+
+    Returns:
+        The number of combinations.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        # Concurrent increments wait for the rebuild, then apply on top of it
+        db.execute(text(f"LOCK TABLE {summary.__tablename__} IN EXCLUSIVE MODE"))
+    db.execute(delete(summary))
+    rows = [{**dict(zip(keys, row[:-1])), "count": row[-1]} for row in db.exec(source).all()]
+    if rows:
+        db.execute(insert(summary), rows)
+    db.commit()
+    return len(rows)
@@ -0,0 +1,242 @@
+# File: app/crud/pagination.py
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import String, func, tuple_, union_all
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import aliased
+from sqlmodel import AutoString, Session, select
+
+
+class InvalidCursor(ValueError):
+    """
+    Raised for a cursor that wasn't produced by encode_cursor (or doesn't match
+    the listing it's used on). Mapped to a 400 response in app/main.py.
+    """
+
+
+class Page(NamedTuple):
+    """
+    One page of a keyset-paginated listing.
+    """
+    items: List[Any]
+    next_cursor: Optional[str] # None on the last page
+    total: Optional[int] = None # Rows matching the filters (first page only, if requested)
+    total_is_estimate: bool = False # True if `total` is a planner estimate, not an exact count
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encodes the sort key of the last row of a page as an opaque, URL-safe string.
+    """
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """
+    Decodes a cursor back into one value per sort column.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed or has the wrong shape.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise InvalidCursor("Invalid cursor")
+        values = []
+        for column, value in zip(columns, payload):
+            # SQLModel's AutoString (a TypeDecorator) doesn't implement python_type
+            is_string = isinstance(column.type, (String, AutoString))
+            python_type = str if is_string else column.type.python_type
+            if python_type is datetime:
+                values.append(datetime.fromisoformat(value))
+            elif python_type is int and isinstance(value, int) and not isinstance(value, bool):
+                values.append(value)
+            elif python_type is float and isinstance(value, (int, float)) and not isinstance(value, bool):
+                values.append(float(value))
+            elif python_type is str and isinstance(value, str):
+                values.append(value)
+            else:
+                raise InvalidCursor("Invalid cursor")
+        return values
+    except (ValueError, TypeError):
+        # Covers base64/JSON errors (and re-raises InvalidCursor, a ValueError)
+        raise InvalidCursor("Invalid cursor") from None
+
+
+def _after(statement: Any, columns: Sequence[Any], after: Sequence[Any], descending: bool) -> Any:
+    """
+    Restricts a select() to the rows that sort after the given key.
+    """
+    if len(columns) == 1:
+        key, bound = columns[0], after[0]
+    else:
+        # Row value comparison, e.g. (updated_at, id) < (:updated_at, :id)
+        key, bound = tuple_(*columns), tuple_(*after)
+    return statement.where(key < bound if descending else key > bound)
+
+
+def _page(rows: Sequence[Any], columns: Sequence[Any], limit: int) -> Page:
+    """
+    Splits `limit + 1` fetched rows into the page and the cursor of the next page.
+    """
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        entity = last[0] if isinstance(last, (Row, tuple)) else last
+        # A sort expression (e.g. a JSON value) is selected as a labelled extra column
+        extra = last._mapping if isinstance(last, Row) else {}
+        next_cursor = encode_cursor([
+            extra[column.key] if column.key in extra else getattr(entity, column.key) for column in columns
+        ])
+    return Page(items, next_cursor)
+
+
+def paginate(
+    db: Session,
+    statement: Any,
+    *,
+    columns: Sequence[Any],
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True,
+    with_total: bool = False,
+) -> Page:
+    """
+    Keyset (cursor) pagination: instead of OFFSET, continue after the last row
+    of the previous page, so every page costs the same as the first one
+    (given an index matching the filter + sort columns).
+
+    Args:
+        db: The database session.
+        statement: The filtered select() to paginate (without order_by/limit). If it
+                   selects extra columns, the entity carrying the sort columns comes first.
+        columns: Sort columns; the last one must be unique (e.g. the primary key). A sort
+                 expression must be labelled and selected by the statement too.
+        cursor: The `next_cursor` of the previous page, or None for the first page.
+        limit: Maximum number of rows to return.
+        descending: Sort direction (applied to all columns).
+        with_total: On the first page, also count all matching rows in the same query
+                    (COUNT(*) OVER ()). This reads every matching row, so only use it
+                    for listings that stay small (e.g. one owner's projects).
+
+    Returns:
+        The Page: rows, cursor of the next page (None on the last page) and total.
+    """
+    if cursor is not None:
+        statement = _after(statement, columns, decode_cursor(cursor, columns), descending)
+
+    count_total = with_total and cursor is None
+    single_entity = len(statement.column_descriptions) == 1 # e.g. select(Model), not select(Model, count)
+    if count_total:
+        # The window is evaluated over all rows matching the WHERE clause, before LIMIT
+        statement = statement.add_columns(func.count().over().label("total"))
+
+    order_by = [column.desc() if descending else column.asc() for column in columns]
+    # Fetch one extra row to know whether there is a next page
+    statement = statement.order_by(*order_by).limit(limit + 1)
+    if not count_total:
+        return _page(db.exec(statement).all(), columns, limit)
+
+    # execute(), not exec(): SQLModel would return only the first column of a single-entity select
+    rows = db.execute(statement).all()
+    total = rows[0][-1] if rows else 0
+    rows = [row[0] if single_entity else tuple(row[:-1]) for row in rows]
+    return _page(rows, columns, limit)._replace(total=total)
+
+
+def paginate_union(
+    db: Session,
+    entity: Any,
+    branches: Sequence[Any],
+    *,
+    keys: Sequence[str],
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True,
+) -> Page:
+    """
+    Keyset pagination over the UNION ALL of disjoint select(entity) branches, e.g.
+    to replace an OR filter that no single index can serve.
+
+    The cursor condition, ORDER BY and LIMIT are applied inside every branch, so
+    each branch reads at most one page from its own index; only those rows are merged.
+
+    Args:
+        db: The database session.
+        entity: The table model all branches select.
+        branches: The filtered select(entity) statements (without order_by/limit).
+        keys: Names of the sort attributes; the last one must be unique.
+        cursor: The `next_cursor` of the previous page, or None for the first page.
+        limit: Maximum number of rows to return.
+        descending: Sort direction (applied to all keys).
+
+    Returns:
+        The Page of entities (without a total, see count_capped).
+    """
+    columns = [getattr(entity, key) for key in keys]
+    after = decode_cursor(cursor, columns) if cursor is not None else None
+
+    parts = []
+    for branch in branches:
+        if after is not None:
+            branch = _after(branch, columns, after, descending)
+        order_by = [column.desc() if descending else column.asc() for column in columns]
+        # Each limited branch is wrapped in a subquery (SQLite can't parse ordered
+        # UNION members; PostgreSQL plans it with the LIMIT, i.e. as an index scan)
+        limited = branch.order_by(*order_by).limit(limit + 1).subquery()
+        parts.append(select(aliased(entity, limited)))
+
+    merged = aliased(entity, union_all(*parts).subquery())
+    merged_columns = [getattr(merged, key) for key in keys]
+    order_by = [column.desc() if descending else column.asc() for column in merged_columns]
+    rows = db.exec(select(merged).order_by(*order_by).limit(limit + 1)).all()
+    return _page(rows, columns, limit)
+
+
+def _planner_estimate(db: Session, statement: Any) -> int:
+    """
+    Returns PostgreSQL's row estimate for a select() (EXPLAIN, the query isn't run).
+    """
+    connection = db.connection()
+    compiled = statement.compile(dialect=connection.dialect)
+    params = compiled.params
+    if compiled.positional:
+        # e.g. asyncpg ($1, $2, ...)
+        params = tuple(params[name] for name in compiled.positiontup)
+    plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + compiled.string, params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan) # asyncpg doesn't decode json results
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_capped(db: Session, statement: Any, *, exact_limit: int) -> Tuple[int, bool]:
+    """
+    Counts the rows of a select(), reading at most `exact_limit + 1` of them.
+
+    Larger results are reported as PostgreSQL's planner estimate (never below
+    `exact_limit + 1`), so a count over e.g. every public dataset costs about
+    as much as a page, not a full scan. Other databases count exactly.
+
+    Args:
+        db: The database session.
+        statement: The filtered select() to count (a narrow one, e.g. of the primary key).
+        exact_limit: Largest count that is computed exactly.
+
+    Returns:
+        The count, and whether it is an estimate.
+    """
+    capped = select(func.count()).select_from(statement.limit(exact_limit + 1).subquery())
+    count = db.exec(capped).one()
+    if count <= exact_limit:
+        return count, False
+    if db.get_bind().dialect.name != "postgresql":
+        return db.exec(select(func.count()).select_from(statement.subquery())).one(), False
+    return max(_planner_estimate(db, statement), count), True
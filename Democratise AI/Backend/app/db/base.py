@@ -11,8 +11,14 @@ from app.models.project import Project
 from app.models.model import Model # <<< ADD
 from app.models.dataset import Dataset # <<< ADD
 from app.models.training_run import TrainingRun # <<< ADD
+from app.models.training_run import TrainingRunArchive, TrainingRunArchiveProject
 from app.models.links import ProjectModelLink # <<< ADD
 from app.models.links import ProjectDatasetLink # <<< ADD
+from app.models.user_stats import UserStats
+from app.models.idempotency_key import IdempotencyKey
+from app.models.training_share import TrainingShare
+from app.models.training_metric import TrainingMetricChunk
+from app.models.facet_count import DatasetFacetCount, ModelFacetCount
 
 # --- Add imports for future models below this line ---
 # from app.models.dataset import Dataset # Example
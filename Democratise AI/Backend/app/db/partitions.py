@@ -0,0 +1,124 @@
+# File: app/db/partitions.py
+
+import logging
+import re
+from datetime import datetime
+from typing import Any, List
+
+from sqlalchemy import text
+
+# Monthly range partitions are named <table>_pYYYY_MM, next to a <table>_default partition
+_PARTITION_NAME = re.compile(r"^(?P<table>\w+?)_(p\d{4}_\d{2}|default)$")
+
+
+def month_start(value: datetime) -> datetime:
+    """
+    The first instant of the month of `value` (naive, like the timestamp columns).
+    """
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """
+    The first instant of the month `months` months after the month of `value`.
+    """
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+def is_partition_name(name: str) -> bool:
+    """
+    True for the name of a partition created by this module (used to hide them from
+    Alembic's autogenerate, which only knows the parent table).
+    """
+    return _PARTITION_NAME.match(name) is not None
+
+
+def is_partitioned(connection: Any, table: str) -> bool:
+    """
+    True if `table` is a partitioned table (PostgreSQL; always False elsewhere).
+    """
+    if connection.dialect.name != "postgresql":
+        return False
+    return connection.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = :table AND pg_table_is_visible(c.oid)"
+        ),
+        {"table": table},
+    ).first() is not None
+
+
+def partition_exists(connection: Any, table: str, month: datetime) -> bool:
+    return connection.execute(
+        text("SELECT to_regclass(:name) IS NOT NULL"), {"name": partition_name(table, month)}
+    ).scalar()
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def create_monthly_partitions(connection: Any, table: str, *, column: str, first: datetime, last: datetime) -> List[str]:
+    """
+    Creates the missing monthly partitions of a table range-partitioned on a timestamp,
+    from the month of `first` to the month of `last` (inclusive).
+
+    Rows of a new month already in the default partition (written while its partition
+    was missing) are moved to the new partition: PostgreSQL refuses to create a
+    partition whose rows are in the default one.
+
+    Args:
+        connection: The connection (the caller commits).
+        table: The partitioned table.
+        column: The partition key column.
+        first: A time in the first month.
+        last: A time in the last month.
+
+    Returns:
+        The names of the partitions created.
+    """
+    created = []
+    default = default_partition_name(table)
+    has_default = connection.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": default}).scalar()
+    month = month_start(first)
+    while month <= last:
+        if not partition_exists(connection, table, month):
+            name = partition_name(table, month)
+            end = add_months(month, 1)
+            in_month = f"{column} >= '{month:%Y-%m-%d}' AND {column} < '{end:%Y-%m-%d}'"
+            stray = has_default and connection.execute(text(f"SELECT 1 FROM {default} WHERE {in_month} LIMIT 1")).first()
+            if stray:
+                # Writes wait until the rows are in the new partition (the lock the CREATE takes anyway)
+                connection.execute(text(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE"))
+                connection.execute(text(f"CREATE TEMPORARY TABLE {name}_moved (LIKE {table})"))
+                connection.execute(text(
+                    f"WITH moved AS (DELETE FROM {default} WHERE {in_month} RETURNING *) "
+                    f"INSERT INTO {name}_moved SELECT * FROM moved"
+                ))
+            connection.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+            ))
+            if stray:
+                moved = connection.execute(text(f"INSERT INTO {table} SELECT * FROM {name}_moved")).rowcount
+                connection.execute(text(f"DROP TABLE {name}_moved"))
+                logging.warning(f"Moved {moved} rows of {table} from {default} to the new partition {name}")
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def drop_partition(connection: Any, table: str, month: datetime) -> bool:
+    """
+    Drops the partition holding `month` (and its rows) if it exists.
+    Dropping a partition is instant, unlike deleting its rows (no dead tuples, no vacuum).
+    """
+    if not partition_exists(connection, table, month):
+        return False
+    connection.execute(text(f"DROP TABLE {partition_name(table, month)}"))
+    return True
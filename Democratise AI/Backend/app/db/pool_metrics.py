@@ -0,0 +1,150 @@
+# File: app/db/pool_metrics.py
+
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from typing import Any, Dict, Optional, Tuple, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+# Upper bounds (milliseconds) of the checkout wait time histogram buckets
+WAIT_BUCKETS_MS: Tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolMetrics:
+    """
+    Live counters for one connection pool: checkout wait histogram,
+    checkout timeouts and connection ages. Read via snapshot().
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine: Optional[Engine] = None # engine.pool changes after dispose()
+        self._lock = threading.Lock()
+        self._wait_counts = [0] * (len(WAIT_BUCKETS_MS) + 1) # Last bucket is +Inf
+        self._wait_sum_ms = 0.0
+        self._checkouts = 0
+        self._timeouts = 0
+        # Connection records currently holding a DBAPI connection
+        self._records: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+    def observe_wait(self, seconds: float) -> None:
+        wait_ms = seconds * 1000
+        with self._lock:
+            self._wait_counts[bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+            self._wait_sum_ms += wait_ms
+            self._checkouts += 1
+
+    def observe_timeout(self) -> None:
+        with self._lock:
+            self._timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the current pool state and counters as a JSON-friendly dict.
+        """
+        now = time.time()
+        ages = [
+            now - record.info["connected_at"]
+            for record in list(self._records)
+            if record.dbapi_connection is not None and "connected_at" in record.info
+        ]
+        with self._lock:
+            buckets = {str(bound): count for bound, count in zip(WAIT_BUCKETS_MS, self._wait_counts)}
+            buckets["+Inf"] = self._wait_counts[-1]
+            wait = {"buckets": buckets, "count": self._checkouts, "sum": round(self._wait_sum_ms, 3)}
+            timeouts = self._timeouts
+
+        pool = self.engine.pool if self.engine is not None else None
+        return {
+            "pool": self.name,
+            "size": pool.size() if pool is not None else None,
+            "checked_out": pool.checkedout() if pool is not None else None,
+            "checked_in": pool.checkedin() if pool is not None else None,
+            # Pool.overflow() is negative while below pool_size; report overflow connections in use
+            "overflow": max(pool.overflow(), 0) if pool is not None else None,
+            "checkout_timeouts": timeouts,
+            "checkout_wait_ms": wait,
+            "connection_age_seconds": {
+                "count": len(ages),
+                "min": round(min(ages), 3) if ages else None,
+                "max": round(max(ages), 3) if ages else None,
+                "avg": round(sum(ages) / len(ages), 3) if ages else None,
+            },
+        }
+
+
+# All instrumented pools in this process, by name (e.g. "primary")
+registry: Dict[str, PoolMetrics] = {}
+
+
+class _TimedCheckoutMixin:
+    """
+    Times Pool._do_get, i.e. how long a checkout waits for a free connection.
+    """
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.observe_timeout()
+            raise
+        self.metrics.observe_wait(time.perf_counter() - start)
+        return connection
+
+
+def instrumented_pool_class(base: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """
+    Builds a pool class that reports checkout waits to `metrics`.
+    The metrics are a class attribute so they survive Pool.recreate() (engine.dispose()).
+    """
+    return type(f"Instrumented{base.__name__}", (_TimedCheckoutMixin, base), {"metrics": metrics})
+
+
+def instrument_engine(
+    engine: Engine, metrics: PoolMetrics, *, idle_ping_seconds: Optional[float] = None
+) -> None:
+    """
+    Registers pool event listeners on a (sync) engine.
+
+    Args:
+        engine: The engine (for an AsyncEngine, pass its sync_engine).
+        metrics: The PoolMetrics receiving the events.
+        idle_ping_seconds: If set, ping connections on checkout only when they sat
+                           idle in the pool for longer than this ("idle" pre-ping strategy).
+    """
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        connection_record.info["connected_at"] = time.time()
+        metrics._records.add(connection_record)
+
+    @event.listens_for(engine, "close")
+    def _on_close(dbapi_connection, connection_record):
+        metrics._records.discard(connection_record)
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    if idle_ping_seconds is not None:
+
+        @event.listens_for(engine, "checkout")
+        def _ping_idle_connection(dbapi_connection, connection_record, connection_proxy):
+            checked_in_at = connection_record.info.get("checked_in_at")
+            if checked_in_at is None or time.monotonic() - checked_in_at < idle_ping_seconds:
+                return # Fresh or recently used connection: skip the round trip
+            try:
+                engine.dialect.do_ping(dbapi_connection)
+            except Exception:
+                # The pool discards this connection and retries the checkout
+                raise exc.DisconnectionError() from None
+
+    metrics.engine = engine
+    registry[metrics.name] = metrics
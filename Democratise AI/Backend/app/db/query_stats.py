@@ -0,0 +1,143 @@
+# File: app/db/query_stats.py
+
+import contextvars
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """
+    SQL statements executed on behalf of one request (or one query_budget block):
+    count, total database time, the slowest statement and per-statement repeats.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock() # Sync CRUD calls may run in several threadpool threads
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest: Optional[Tuple[float, str]] = None # (duration ms, statement)
+        self.statements: "Counter[str]" = Counter()
+
+    def observe(self, statement: str, duration_ms: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_ms += duration_ms
+            if self.slowest is None or duration_ms > self.slowest[0]:
+                self.slowest = (duration_ms, statement)
+            self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Statements executed at least `threshold` times (the signature of an N+1 query loop).
+        """
+        with self._lock:
+            return [(statement, count) for statement, count in self.statements.items() if count >= threshold]
+
+    def server_timing(self) -> str:
+        """
+        Formats the stats as a Server-Timing header value (shown in the browser devtools).
+        """
+        timing = f'db;dur={self.total_ms:.1f};desc="{self.count} queries"'
+        if self.slowest is not None:
+            timing += f", db-slowest;dur={self.slowest[0]:.1f}"
+        return timing
+
+
+# Stats of the current request; None outside of a tracked block
+_current: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar("query_stats", default=None)
+
+# Open query_budget blocks: they count statements from every thread (a TestClient
+# runs the app in its own thread, which doesn't see the caller's context)
+_budgets: List[QueryStats] = []
+_budgets_lock = threading.Lock()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Collects the statements executed in this context (and the threadpool calls /
+    AsyncSession greenlets it starts, which share the context).
+    """
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised by query_budget when a block executes more statements than allowed.
+    """
+
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[QueryStats]:
+    """
+    Asserts that the block executes at most `max_queries` statements, e.g.
+
+        with query_budget(2):
+            client.get("/api/v1/projects/")
+
+    Catches N+1 regressions (e.g. lazy-loaded relationships) in tests and scripts.
+    Counts the statements of all threads while the block runs, so run nothing else
+    against the database meanwhile.
+
+    Raises:
+        QueryBudgetExceeded: Listing the statements, most repeated first.
+    """
+    stats = QueryStats()
+    with _budgets_lock:
+        _budgets.append(stats)
+    try:
+        yield stats
+    finally:
+        with _budgets_lock:
+            _budgets.remove(stats)
+    if stats.count > max_queries:
+        lines = [f"{count}x {' '.join(statement.split())[:200]}" for statement, count in stats.statements.most_common()]
+        raise QueryBudgetExceeded(
+            f"{stats.count} queries executed, budget is {max_queries}:\n" + "\n".join(lines)
+        )
+
+
+def instrument_queries(engine: Engine, *, slow_query_ms: Optional[float] = None) -> None:
+    """
+    Registers statement timing listeners on a (sync) engine.
+
+    Args:
+        engine: The engine (for an AsyncEngine, pass its sync_engine).
+        slow_query_ms: Log statements slower than this (None = no slow-query log).
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(connection, cursor, statement, parameters, context, executemany):
+        connection.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop_timer(connection, cursor, statement, parameters, context, executemany):
+        started_at = connection.info["query_started_at"].pop()
+        duration_ms = (time.perf_counter() - started_at) * 1000
+        stats = _current.get()
+        if stats is not None:
+            stats.observe(statement, duration_ms)
+        for budget in _budgets:
+            budget.observe(statement, duration_ms)
+        if slow_query_ms is not None and duration_ms >= slow_query_ms:
+            logger.warning("Slow query (%.1f ms): %s", duration_ms, " ".join(statement.split())[:1000])
+
+    @event.listens_for(engine, "handle_error")
+    def _drop_timer(exception_context):
+        # after_cursor_execute doesn't run for failed statements
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started_at"):
+            connection.info["query_started_at"].pop()
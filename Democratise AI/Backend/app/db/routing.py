@@ -0,0 +1,78 @@
+# File: app/db/routing.py
+
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class ReplicaRouter:
+    """
+    Round-robin selection over read replica engines with health-based failover.
+
+    A replica that fails to hand out a connection is marked down and skipped
+    for `retry_seconds`, after which it is tried again.
+    """
+
+    def __init__(self, engines: List[Any], retry_seconds: float):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._counter = itertools.count()
+        self._down_until: Dict[int, float] = {} # index -> monotonic time it may be retried
+
+    def candidates(self) -> List[Any]:
+        """
+        Healthy replicas in round-robin order (empty if none are configured/healthy).
+        """
+        if not self.engines:
+            return []
+        now = time.monotonic()
+        count = len(self.engines)
+        start = next(self._counter) % count
+        ordered = [(start + offset) % count for offset in range(count)]
+        return [
+            self.engines[index] for index in ordered
+            if self._down_until.get(index, 0.0) <= now
+        ]
+
+    def mark_down(self, engine: Any) -> None:
+        self._down_until[self.engines.index(engine)] = time.monotonic() + self.retry_seconds
+
+
+class RecentWriters:
+    """
+    Remembers which principals (token subjects) wrote recently, so their reads
+    can stick to the primary until replicas have caught up (read-your-writes).
+    In-process only: a read served by another worker process or server doesn't know
+    about the write (see DB_READ_YOUR_WRITES_SECONDS).
+    """
+
+    def __init__(self, window_seconds: float, max_size: int = 10000):
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self._expiry: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, subject: str) -> None:
+        if self.window_seconds <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._expiry) >= self.max_size:
+                # Drop expired entries first; if still full, forget the oldest
+                self._expiry = {s: t for s, t in self._expiry.items() if t > now}
+                if len(self._expiry) >= self.max_size:
+                    self._expiry.pop(min(self._expiry, key=self._expiry.get))
+            self._expiry[subject] = now + self.window_seconds
+
+    def wrote_recently(self, subject: Optional[str]) -> bool:
+        if subject is None:
+            return False
+        with self._lock:
+            expires_at = self._expiry.get(subject)
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                del self._expiry[subject]
+                return False
+            return True
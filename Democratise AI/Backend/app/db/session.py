@@ -1,28 +1,131 @@
 import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional, Type, Union
 
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection, AsyncEngine, async_sessionmaker, create_async_engine
+)
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.config import settings
+from app.core.config import settings, to_async_database_uri
+from app.db.routing import RecentWriters, ReplicaRouter
+from app.db.pool_metrics import PoolMetrics, instrument_engine, instrumented_pool_class
+from app.db.query_stats import instrument_queries
 
 # Construct the database URL string from settings
 # Note: SQLModel/SQLAlchemy expects a string URL
 database_url = str(settings.SQLALCHEMY_DATABASE_URI)
 
+def _pool_kwargs(name: str, base_pool_class: Type[Pool]) -> Dict[str, Any]:
+    """
+    Pool configuration from settings, with an instrumented pool class
+    reporting to app.db.pool_metrics.registry[name].
+    """
+    return dict(
+        poolclass=instrumented_pool_class(base_pool_class, PoolMetrics(name)),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING == "always", # "idle" is handled by a checkout listener
+    )
+
+def _read_only_kwargs(uri: str) -> Dict[str, Any]:
+    """
+    Engine options for read-only pools: autocommit, so a read sends neither BEGIN nor,
+    when the connection goes back to the pool, ROLLBACK (no transaction to reset; at
+    READ COMMITTED every statement gets its own snapshot either way),
+    and on PostgreSQL every transaction is read-only, set once in the startup packet.
+    """
+    kwargs: Dict[str, Any] = {"isolation_level": "AUTOCOMMIT"}
+    url = make_url(uri)
+    if url.get_backend_name() == "postgresql":
+        if url.get_driver_name() == "asyncpg":
+            kwargs["connect_args"] = {"server_settings": {"default_transaction_read_only": "on"}}
+        else:
+            kwargs["connect_args"] = {"options": "-c default_transaction_read_only=on"}
+    return kwargs
+
+def _instrument(sync_engine: Engine) -> None:
+    idle_ping = settings.DB_POOL_PRE_PING_IDLE_SECONDS if settings.DB_POOL_PRE_PING == "idle" else None
+    instrument_engine(sync_engine, sync_engine.pool.metrics, idle_ping_seconds=idle_ping)
+    instrument_queries(sync_engine, slow_query_ms=settings.DB_SLOW_QUERY_MS or None)
+    if sync_engine.dialect.driver == "asyncpg":
+        event.listen(sync_engine, "connect", _set_timestamp_codec)
+
+def _encode_timestamp(value: datetime) -> str:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+def _set_timestamp_codec(dbapi_connection, connection_record):
+    # Our `timestamp without time zone` columns are filled with aware_utcnow().
+    # psycopg2 accepts aware datetimes there, asyncpg rejects them: store them as
+    # naive UTC on the async stack too.
+    dbapi_connection.run_async(
+        lambda connection: connection.set_type_codec(
+            "timestamp", schema="pg_catalog", format="text",
+            encoder=_encode_timestamp, decoder=datetime.fromisoformat,
+        )
+    )
+
 # Create the SQLAlchemy engine
 # connect_args is useful for SQLite, may not be needed for PostgreSQL
-# pool_pre_ping=True helps handle dropped connections
+# Pool size/overflow/timeout/recycle/pre-ping come from settings (see app/core/config.py)
 engine = create_engine(
     database_url,
     echo=False, # Set to True to see SQL queries in console (useful for debugging)
-    pool_pre_ping=True,
+    **_pool_kwargs("primary", QueuePool),
     # connect_args={"check_same_thread": False} # Only needed for SQLite
 )
+_instrument(engine)
+
+# Read-only pool on the primary, used by deps.get_read_db when no replica serves the read
+read_engine = create_engine(
+    database_url, echo=False,
+    **_pool_kwargs("primary_read", QueuePool), **_read_only_kwargs(database_url),
+)
+_instrument(read_engine)
 
 # Create a configured "Session" class
 # Use sessionmaker for compatibility with FastAPI dependency injection patterns
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=Session)
 
+# --- Async stack (asyncpg) ---
+# Only created when enabled, so asyncpg is not required for the sync stack.
+# expire_on_commit=False: attributes can't be lazily refreshed outside the greenlet
+# once the endpoint has returned, so committed objects must keep their loaded state.
+async_engine = None
+async_read_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC_ENABLED:
+    async_database_url = str(settings.SQLALCHEMY_ASYNC_DATABASE_URI)
+    async_engine = create_async_engine(
+        async_database_url,
+        echo=False,
+        **_pool_kwargs("primary_async", AsyncAdaptedQueuePool),
+    )
+    _instrument(async_engine.sync_engine)
+    async_read_engine = create_async_engine(
+        async_database_url, echo=False,
+        **_pool_kwargs("primary_read_async", AsyncAdaptedQueuePool),
+        **_read_only_kwargs(async_database_url),
+    )
+    _instrument(async_read_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+# Type of the session yielded by get_db (depends on DB_ASYNC_ENABLED)
+DBSession = Union[Session, AsyncSession]
+
 def create_db_and_tables():
     """
     Development only: Creates database tables based on SQLModel metadata.
@@ -36,30 +139,150 @@ def create_db_and_tables():
 
     SQLModel.metadata.create_all(engine)
 
+# --- Read replicas (optional) ---
+def _create_replica_engines() -> List[Any]:
+    """
+    One pooled, read-only engine per DB_REPLICA_URIS entry, matching the primary's stack (sync/async).
+    """
+    replicas = []
+    for index, uri in enumerate(settings.replica_uris):
+        if settings.DB_ASYNC_ENABLED:
+            async_uri = to_async_database_uri(uri)
+            replica = create_async_engine(
+                async_uri, echo=False,
+                **_pool_kwargs(f"replica_{index}_async", AsyncAdaptedQueuePool),
+                **_read_only_kwargs(async_uri),
+            )
+            _instrument(replica.sync_engine)
+        else:
+            replica = create_engine(
+                uri, echo=False,
+                **_pool_kwargs(f"replica_{index}", QueuePool), **_read_only_kwargs(uri),
+            )
+            _instrument(replica)
+        replicas.append(replica)
+    return replicas
+
+replica_router = ReplicaRouter(_create_replica_engines(), retry_seconds=settings.DB_REPLICA_RETRY_SECONDS)
+# Principals whose reads stick to the primary after a write (read-your-writes)
+recent_writers = RecentWriters(window_seconds=settings.DB_READ_YOUR_WRITES_SECONDS)
+
+@event.listens_for(Session, "after_flush")
+def _mark_session_writes(session, flush_context):
+    # Only fires when something was actually flushed (INSERT/UPDATE/DELETE)
+    session.info["has_writes"] = True # Anywhere in this request (read-your-writes)
+    session.info["uncommitted_writes"] = True # In the current transaction
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_writes(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements (e.g. crud/bulk.py) bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+        orm_execute_state.session.info["uncommitted_writes"] = True
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_uncommitted_writes(session):
+    session.info.pop("uncommitted_writes", None)
+
+def _has_uncommitted_writes(session: DBSession) -> bool:
+    # CRUD functions commit their own writes, so this is usually False by the time
+    # the endpoint returns; pending (unflushed) objects still need the final commit.
+    return bool(
+        session.info.get("uncommitted_writes") or session.new or session.dirty or session.deleted
+    )
+
+def _record_write(session: DBSession) -> None:
+    # deps.get_current_user stores the token subject in session.info["principal"]
+    principal = session.info.get("principal")
+    if principal and session.info.get("has_writes"):
+        recent_writers.mark(principal)
+
+@asynccontextmanager
+async def _session_scope(bind: Any = None, *, read_only: bool = False) -> AsyncIterator[DBSession]:
+    """
+    Session lifecycle shared by all dependencies.
+
+    A connection is only checked out when the session first needs one (requests
+    served from caches never touch the pool). If the endpoint succeeds, commit only
+    when it left uncommitted writes; otherwise just close. On the primary that is no
+    cheaper (the pool rolls back the open read transaction instead of a COMMIT); the
+    read round trips are saved by the autocommit read-only pools (_read_only_kwargs).
+    Rollback on error, and always close.
+
+    Args:
+        bind: Engine or connection to use (defaults to the primary).
+        read_only: Default to the read-only primary pool (see _read_only_kwargs).
+    """
+    if AsyncSessionLocal is not None:
+        bind = bind or (async_read_engine if read_only else async_engine)
+        async with AsyncSessionLocal(bind=bind) as session:
+            try:
+                yield session
+                if _has_uncommitted_writes(session):
+                    await session.commit() # Commit transaction if no exceptions
+            except Exception:
+                await session.rollback() # Rollback if any exception occurs
+                raise
+        _record_write(session)
+        return
+
+    session = Session(bind or (read_engine if read_only else engine))
+    try:
+        yield session
+        if _has_uncommitted_writes(session):
+            await run_in_threadpool(session.commit)
+    except Exception:
+        await run_in_threadpool(session.rollback)
+        raise
+    finally:
+        await run_in_threadpool(session.close)
+    _record_write(session)
+
+@asynccontextmanager
+async def read_session(subject: Optional[str] = None) -> AsyncIterator[DBSession]:
+    """
+    Session for read-only requests.
+
+    Bound to the next healthy replica (round robin); a replica that can't hand out a
+    connection is marked down and the next one is tried (replica connections are
+    checked out eagerly for that reason). Falls back to the primary's read-only pool
+    if no replica is available, or if `subject` wrote within DB_READ_YOUR_WRITES_SECONDS.
+    """
+    if not recent_writers.wrote_recently(subject):
+        for replica in replica_router.candidates():
+            try:
+                if isinstance(replica, AsyncEngine):
+                    connection = await replica.connect()
+                else:
+                    connection = await run_in_threadpool(replica.connect)
+            except exc.TimeoutError:
+                continue # Replica pool exhausted: try the next one, but it isn't unhealthy
+            except exc.DBAPIError as e:
+                logging.warning(f"Read replica unavailable, failing over: {e}")
+                replica_router.mark_down(replica)
+                continue
+            try:
+                async with _session_scope(bind=connection) as session:
+                    yield session
+            finally:
+                if isinstance(connection, AsyncConnection):
+                    await connection.close()
+                else:
+                    await run_in_threadpool(connection.close)
+            return
+
+    async with _session_scope(read_only=True) as session:
+        yield session
+
 # Dependency function to get a DB session
-def get_db():
+async def get_db() -> AsyncGenerator[DBSession, None]:
     """
-    FastAPI dependency that yields a SQLAlchemy session.
-    Ensures the session is always closed, even if errors occur.
+    FastAPI dependency that yields a database session (on the primary).
+    Yields an AsyncSession when DB_ASYNC_ENABLED is set, otherwise a sync Session
+    whose blocking calls are run in the threadpool (see app/crud/aio.py).
+    Commits if the endpoint succeeds with uncommitted writes, rolls back otherwise,
+    and always closes. For read-only endpoints, see deps.get_read_db (replica routing).
     """
-    with Session(engine) as session:
-        try:
-            yield session
-            session.commit() # Commit transaction if no exceptions
-        except Exception:
-            session.rollback() # Rollback if any exception occurs
-            raise
-        finally:
-            session.close() # Close the session
-
-# Alternative Dependency using sessionmaker (often preferred for clarity)
-# def get_db():
-#     db = SessionLocal()
-#     try:
-#         yield db
-#         db.commit() # Commit if yield succeeds
-#     except Exception:
-#         db.rollback()
-#         raise
-#     finally:
-#         db.close()
+    async with _session_scope() as session:
+        yield session
@@ -1,16 +1,50 @@
 # File: app/main.py
 
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 from app.api.v1.api import api_router # Import the main v1 router
+from app.crud.crud_training_run import InvalidRunQuery
+from app.crud.pagination import InvalidCursor
+from app.db.query_stats import track_queries
+from app.services.hashing import HashingServiceBusy, hashing_service
+from app.services.purger import project_purger
+from app.services.run_events import run_event_hub
+from app.services.training_run_maintenance import training_run_maintenance
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application startup/shutdown hooks.
+    """
+    # Remove projects marked 'deleting' in the background
+    if settings.PROJECT_PURGE_ENABLED:
+        project_purger.start()
+    # Create upcoming training run partitions and archive old runs in the background
+    if settings.TRAINING_RUN_MAINTENANCE_ENABLED:
+        training_run_maintenance.start()
+    # Receive the training run events of all workers (GET /training/jobs/{id}/events)
+    run_event_hub.start()
+    yield
+    await project_purger.stop()
+    await training_run_maintenance.stop()
+    await run_event_hub.stop()
+    # Stop the password hashing processes on shutdown
+    hashing_service.shutdown()
+
 
 # Create FastAPI app instance
 # You can add other FastAPI parameters here if needed, like version, description, etc.
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json" # Standard location for OpenAPI spec
+    openapi_url=f"{settings.API_V1_STR}/openapi.json", # Standard location for OpenAPI spec
+    lifespan=lifespan,
 )
 
 # --- CORS Middleware Configuration ---
@@ -37,6 +71,25 @@ else:
 # --- End CORS Middleware ---
 
 
+# --- SQL instrumentation ---
+# Counts the statements each request runs (app/db/query_stats.py): reported in a
+# Server-Timing header, with a warning when the same statement repeats (N+1 queries)
+@app.middleware("http")
+async def query_stats_middleware(request: Request, call_next):
+    with track_queries() as stats:
+        response = await call_next(request)
+    if settings.SERVER_TIMING_ENABLED:
+        response.headers.append("Server-Timing", stats.server_timing())
+    if settings.DB_N_PLUS_ONE_THRESHOLD:
+        for statement, count in stats.repeated(settings.DB_N_PLUS_ONE_THRESHOLD):
+            logging.warning(
+                f"Possible N+1 queries: {request.method} {request.url.path} ran {count}x: "
+                f"{' '.join(statement.split())[:300]}"
+            )
+    return response
+# --- End SQL instrumentation ---
+
+
 # --- Include API Routers ---
 # Include the main v1 router with the prefix from settings (e.g., /api/v1)
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -51,6 +104,32 @@ async def read_root():
     """
     return {"message": f"Welcome to {settings.PROJECT_NAME}! Docs at /docs"}
 
+# --- Global Exception Handlers ---
+@app.exception_handler(HashingServiceBusy)
+async def hashing_busy_exception_handler(request: Request, exc: HashingServiceBusy):
+    # Fast-fail when the password hashing queue is saturated (e.g. during a login storm)
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Authentication service is busy, please retry shortly."},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_exception_handler(request: Request, exc: InvalidCursor):
+    # Tampered/stale ?cursor= values on paginated list endpoints
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": str(exc)},
+    )
+
+@app.exception_handler(InvalidRunQuery)
+async def invalid_run_query_exception_handler(request: Request, exc: InvalidRunQuery):
+    # Malformed config/metric filters or sort of GET /projects/{id}/runs
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": str(exc)},
+    )
+
 # --- Optional: Add Global Exception Handlers ---
 # from fastapi import Request, status
 # from fastapi.responses import JSONResponse
@@ -2,6 +2,7 @@
 
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime
+from sqlalchemy import Index, text
 from sqlmodel import SQLModel, Field, Relationship
 from app.models.links import ProjectDatasetLink
 from app.utils import aware_utcnow
@@ -14,6 +15,18 @@ if TYPE_CHECKING:
     from app.models.training_run import TrainingRun # Added for relationship
 
 class Dataset(SQLModel, table=True):
+    # Partial indexes for crud_dataset.get_multi_by_owner_or_public, which reads the
+    # public datasets and the user's private ones as two branches, both in (updated_at, id) order
+    __table_args__ = (
+        Index("ix_dataset_public_updated_at_id", "updated_at", "id", postgresql_where=text("is_public")),
+        Index(
+            "ix_dataset_private_user_id_updated_at_id", "user_id", "updated_at", "id",
+            postgresql_where=text("NOT is_public"),
+        ),
+        # Name-prefix search (LIKE 'prefix%') under any collation
+        Index("ix_dataset_name_prefix", "name", postgresql_ops={"name": "text_pattern_ops"}),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True)
     description: Optional[str] = Field(default=None)
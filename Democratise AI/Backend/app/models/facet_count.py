@@ -0,0 +1,29 @@
+# File: app/models/facet_count.py
+
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+# Precomputed facet counts of the model and dataset listings (crud/facets.py): one row
+# per combination of facet values, kept up to date by the CRUD functions in the same
+# transaction as the writes they count, so the facets of a listing are read from a few
+# rows instead of counted over the whole table. Reads add up the rows of a combination
+# (concurrent first writes of a combination may each insert one); rebuild them with
+# `python -m app.scripts.rebuild_facet_counts` after writing rows another way.
+
+
+class ModelFacetCount(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    task_type: Optional[str] = None
+    framework: Optional[str] = None
+    source_type: str
+    count: int = Field(default=0, nullable=False)
+
+
+class DatasetFacetCount(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # The owner of private datasets; None for public ones (visible to everyone, counted together)
+    user_id: Optional[int] = Field(default=None, index=True)
+    storage_type: str
+    is_public: bool
+    count: int = Field(default=0, nullable=False)
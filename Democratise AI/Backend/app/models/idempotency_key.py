@@ -0,0 +1,21 @@
+# File: app/models/idempotency_key.py
+
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+from app.utils import aware_utcnow
+
+
+class IdempotencyKey(SQLModel, table=True):
+    """
+    An Idempotency-Key sent with a training job submission, remembered for
+    settings.TRAINING_IDEMPOTENCY_KEY_TTL_HOURS: a retry with the same key returns
+    the run created the first time (crud_training_run.submit_training_run).
+    """
+    user_id: int = Field(foreign_key="user.id", primary_key=True) # Keys are per user
+    key: str = Field(primary_key=True, max_length=255)
+    request_hash: str # Fingerprint of the submission; the same key with another request is rejected
+    # No foreign key: trainingrun's primary key is (id, created_at) on PostgreSQL (partitioned)
+    training_run_id: int
+    created_at: datetime = Field(default_factory=aware_utcnow, nullable=False, index=True) # Expiry purge
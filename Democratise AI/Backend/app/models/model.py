@@ -2,6 +2,7 @@
 
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 
 from app.utils import aware_utcnow # Use shared timestamp utility
@@ -19,11 +20,19 @@ if TYPE_CHECKING:
 
 # --- Define the Model class ---
 class Model(SQLModel, table=True):
+    # Name-prefix search (LIKE 'prefix%'): text_pattern_ops makes the btree usable for
+    # LIKE under any collation (ix_model_name only serves equality and ORDER BY name)
+    __table_args__ = (
+        Index("ix_model_name_prefix", "name", postgresql_ops={"name": "text_pattern_ops"}),
+        # One row per catalog entry: conflict target of the catalog upsert (crud_model.upsert_catalog)
+        Index("uq_model_source", "source_type", "source_identifier", unique=True),
+    )
+
     # --- Core Fields ---
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True)
     description: Optional[str] = Field(default=None)
-    source_type: str = Field(index=True) # e.g., 'huggingface', 'user_uploaded', 'platform'
+    source_type: str # e.g., 'huggingface', 'user_uploaded', 'platform'
     source_identifier: str = Field(index=True) # e.g., 'bert-base-uncased', internal_id, path
     task_type: Optional[str] = Field(default=None, index=True) # e.g., 'text-classification'
     framework: Optional[str] = Field(default=None, index=True) # e.g., 'pytorch', 'tensorflow'
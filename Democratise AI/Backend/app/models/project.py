@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 from app.utils import aware_utcnow # <<< Import from new location
@@ -24,6 +25,12 @@ if TYPE_CHECKING:
     from app.models.training_run import TrainingRun
 
 class Project(SQLModel, table=True):
+    # Composite index for the owner's project list (crud_project.get_multi_by_owner):
+    # filter on user_id, keyset order on (updated_at, id) - no sort step needed
+    __table_args__ = (
+        Index("ix_project_user_id_updated_at_id", "user_id", "updated_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True)
     description: Optional[str] = Field(default=None)
@@ -0,0 +1,32 @@
+# File: app/models/training_metric.py
+
+from sqlalchemy import BigInteger, Column, LargeBinary
+from sqlmodel import Field, SQLModel
+
+
+class TrainingMetricChunk(SQLModel, table=True):
+    """
+    Consecutive steps of one metric of a training run (the per-step time series, e.g. a
+    loss curve; TrainingRun.metrics only holds the final values).
+
+    Points are appended, never rewritten (crud_training_metric.append_metrics): a chunk
+    holds up to settings.TRAINING_METRIC_CHUNK_POINTS points, packed as little-endian
+    int64 steps and float64 values (16 bytes a point). Its extremes are kept in plain
+    columns, so a downsampled curve of a long run is computed from them without reading
+    the points (crud_training_metric.query_metric).
+    """
+    # No foreign key: trainingrun's primary key is (id, created_at) on PostgreSQL (partitioned)
+    run_id: int = Field(primary_key=True)
+    metric: str = Field(primary_key=True, max_length=100)
+    first_step: int = Field(sa_column=Column(BigInteger, primary_key=True))
+    last_step: int = Field(sa_column=Column(BigInteger, nullable=False))
+    count: int = Field(nullable=False)
+    project_id: int = Field(index=True) # Purged with the project (crud_project.purge_deleted_projects)
+
+    min_step: int = Field(sa_column=Column(BigInteger, nullable=False))
+    min_value: float = Field(nullable=False)
+    max_step: int = Field(sa_column=Column(BigInteger, nullable=False))
+    max_value: float = Field(nullable=False)
+
+    steps: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    values: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
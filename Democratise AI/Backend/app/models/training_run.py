@@ -3,7 +3,8 @@
 from typing import Optional, List, Dict, Any, TYPE_CHECKING
 from datetime import datetime
 # Import JSON type from SQLAlchemy for JSONB support
-from sqlalchemy import JSON, Column
+from sqlalchemy import JSON, Column, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import SQLModel, Field, Relationship
 
 from app.utils import aware_utcnow
@@ -14,7 +15,41 @@ if TYPE_CHECKING:
     from app.models.model import Model
     from app.models.dataset import Dataset
 
+# Metrics a project's runs are commonly filtered/sorted by (GET /projects/{id}/runs);
+# other keys work too, filtered within the project's runs instead of through an index
+INDEXED_METRICS = ("accuracy", "loss")
+
+def _metric_value(key: str) -> str:
+    # NULL unless the value is a number (the expression crud_training_run.json_number builds)
+    return f"(CASE WHEN jsonb_typeof(metrics -> '{key}') = 'number' THEN CAST(metrics ->> '{key}' AS FLOAT) END)"
+
 class TrainingRun(SQLModel, table=True):
+    # Range-partitioned by month on created_at on PostgreSQL (migration e8c1f4a6b2d9).
+    # Indexes: a project's runs in creation order and by common metrics (see
+    # crud_training_run.json_number), the job queue (queued runs in claim order, claimed
+    # runs by lease expiry; partial), and config_params containment (GIN)
+    __table_args__ = (
+        Index("ix_trainingrun_project_id_created_at", "project_id", "created_at"),
+        Index(
+            "ix_trainingrun_user_id_queued", "user_id", text("priority DESC"), "created_at", "id",
+            postgresql_where=text("status = 'queued'"), sqlite_where=text("status = 'queued'"),
+        ),
+        Index(
+            "ix_trainingrun_lease_expires_at", "lease_expires_at",
+            postgresql_where=text("status IN ('starting', 'running')"),
+            sqlite_where=text("status IN ('starting', 'running')"),
+        ),
+        Index(
+            "ix_trainingrun_config_params", "config_params",
+            postgresql_using="gin", postgresql_ops={"config_params": "jsonb_path_ops"},
+        ),
+        *(
+            Index(f"ix_trainingrun_project_id_metrics_{key}", "project_id", text(_metric_value(key)), "id")
+            .ddl_if(dialect="postgresql")
+            for key in INDEXED_METRICS
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
 
     # Foreign keys
@@ -24,13 +59,21 @@ class TrainingRun(SQLModel, table=True):
     dataset_id: int = Field(foreign_key="dataset.id", index=True)
 
     status: str = Field(index=True) # e.g., 'queued', 'starting', 'running', 'completed', 'failed'
+    priority: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"}) # Among the user's own runs; higher first
 
     # Store configuration and metrics as JSON(B) in the database
-    # Use sa_column=Column(JSON) to map dict/list to JSON/JSONB type
-    config_params: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
-    metrics: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    # JSONB on PostgreSQL (indexable, queried by crud_training_run.query_project_runs), JSON elsewhere
+    config_params: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON().with_variant(JSONB(), "postgresql")))
+    metrics: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON().with_variant(JSONB(), "postgresql")))
 
-    logs_location: Optional[str] = None # e.g., path to logs file in cloud storage
+    logs_location: Optional[str] = None # The run's log file (app/services/log_store.py; read with GET /training/jobs/{id}/logs)
+    error: Optional[str] = None # Why the run failed
+
+    # Job queue lease (app/services/training_worker.py): the worker holding a starting/running
+    # run renews the lease while it works; runs with an expired lease are requeued
+    worker_id: Optional[str] = None
+    lease_expires_at: Optional[datetime] = Field(default=None)
+    attempts: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"}) # Times a worker claimed the run
 
     started_at: Optional[datetime] = Field(default=None)
     completed_at: Optional[datetime] = Field(default=None)
@@ -42,4 +85,30 @@ class TrainingRun(SQLModel, table=True):
     project: "Project" = Relationship(back_populates="training_runs")
     user: "User" = Relationship(back_populates="training_runs")
     model: "Model" = Relationship(back_populates="training_runs")
-    dataset: "Dataset" = Relationship(back_populates="training_runs")
\ No newline at end of file
+    dataset: "Dataset" = Relationship(back_populates="training_runs")
+
+
+class TrainingRunArchive(SQLModel, table=True):
+    """
+    One archive file of training runs moved out of the database (crud_training_run.archive_training_runs).
+    Runs are looked up in the files whose id range contains the requested id.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    month: datetime = Field(nullable=False) # First instant of the month of the archived runs' created_at
+    path: str # gzipped JSON Lines file, one run per line in id order
+    row_count: int
+    min_id: int = Field(index=True)
+    max_id: int
+    archived_at: datetime = Field(default_factory=aware_utcnow, nullable=False)
+    # Whether the projects of its runs are in TrainingRunArchiveProject (False for archives
+    # written before they were recorded: purges read those in full)
+    projects_recorded: bool = Field(default=True, nullable=False, sa_column_kwargs={"server_default": "false"})
+
+
+class TrainingRunArchiveProject(SQLModel, table=True):
+    """
+    A project with runs in an archive file, so purging a project only reads and rewrites
+    the files holding its runs (crud_training_run.remove_archived_runs).
+    """
+    archive_id: int = Field(foreign_key="trainingrunarchive.id", primary_key=True)
+    project_id: int = Field(primary_key=True, index=True)
@@ -0,0 +1,23 @@
+# File: app/models/training_share.py
+
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+class TrainingShare(SQLModel, table=True):
+    """
+    A user's share of the training workers (fair-share scheduling, see
+    crud_training_run.claim_training_runs).
+
+    Runs are claimed for the user with queued runs and the smallest virtual_time,
+    which grows by 1/weight per claimed run: users with runs queued are served in
+    weighted round robin, however many runs each of them submitted. A user whose queue
+    was empty rejoins at the smallest virtual_time of the waiting users, so idle time
+    isn't banked into a burst later on.
+    """
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    weight: float = Field(default=1.0, nullable=False) # Relative share (> 0); weight 2 gets twice the runs of weight 1
+    # Cap on the user's starting + running runs (None = settings.TRAINING_MAX_ACTIVE_RUNS_PER_USER, 0 = no cap)
+    max_active_runs: Optional[int] = None
+    virtual_time: float = Field(default=0.0, nullable=False)
@@ -0,0 +1,37 @@
+# File: app/models/user_stats.py
+
+from datetime import datetime
+
+from sqlalchemy import Index, text
+from sqlmodel import Field, SQLModel
+
+from app.utils import aware_utcnow
+
+
+class UserStats(SQLModel, table=True):
+    """
+    Per-user dashboard counts, kept up to date by crud_user_stats.increment in the same
+    transaction as the writes they count (so reading them is one primary-key lookup).
+    Counts cover what is in the database: projects not being deleted, owned datasets,
+    and training runs by status (runs moved to archive files are no longer counted).
+    """
+    # The users with runs waiting, among which the training scheduler picks
+    # (crud_training_run.claim_training_runs); small however many users there are
+    __table_args__ = (
+        Index(
+            "ix_userstats_runs_queued", "user_id",
+            postgresql_where=text("runs_queued > 0"), sqlite_where=text("runs_queued > 0"),
+        ),
+    )
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    projects: int = Field(default=0, nullable=False)
+    datasets: int = Field(default=0, nullable=False)
+    # One column per training run status (crud_user_stats.RUN_STATUSES)
+    runs_queued: int = Field(default=0, nullable=False)
+    runs_starting: int = Field(default=0, nullable=False)
+    runs_running: int = Field(default=0, nullable=False)
+    runs_completed: int = Field(default=0, nullable=False)
+    runs_failed: int = Field(default=0, nullable=False)
+    runs_cancelled: int = Field(default=0, nullable=False)
+    updated_at: datetime = Field(default_factory=aware_utcnow, nullable=False)
@@ -1,9 +1,10 @@
 # File: app/schemas/__init__.py
 from .token import Token, TokenData
 from .user import UserBase, UserCreate, UserUpdateProfile, UserPublic
-from .project import ProjectBase, ProjectCreate, ProjectUpdate, ProjectPublic, ProjectPublicList # Example for later
+from .project import ProjectBase, ProjectCreate, ProjectUpdate, ProjectPublic, ProjectSummary, ProjectPublicList, ProjectBulkUpdate, ProjectBulkRequest # Example for later
 from .msg import Msg # Imports the Msg class directly
-from .model import ModelBase, ModelPublic # <<< ADD THIS LINE
+from .facet import FacetCount
+from .model import ModelBase, ModelPublic, ModelPublicList # <<< ADD THIS LINE
 from .training_run import TrainingRunBase, TrainingRunCreate, TrainingRunPublic # <<< ADD THIS LINE
 
 # Import other schemas...
@@ -12,9 +13,11 @@ from .training_run import TrainingRunBase, TrainingRunCreate, TrainingRunPublic
 
 
 # New exports
-from .model import ModelBase, ModelPublic # Add others like ModelCreate if needed
-from .dataset import DatasetBase, DatasetCreate, DatasetUpdate, DatasetPublic
-from .training_run import TrainingRunBase, TrainingRunCreate, TrainingRunPublic
+from .model import ModelBase, ModelPublic, ModelPublicList # Add others like ModelCreate if needed
+from .dataset import DatasetBase, DatasetCreate, DatasetUpdate, DatasetPublic, DatasetPublicList, DatasetBulkUpdate, DatasetBulkRequest
+from .bulk import BulkItemResult, BulkResult
+from .user_stats import UserStatsPublic
+from .training_run import TrainingRunBase, TrainingRunCreate, TrainingRunPublic, TrainingRunPublicList
 
 # You can also define __all__ if preferred
 # __all__ = ["Token", "TokenData", "UserBase", ...]
\ No newline at end of file
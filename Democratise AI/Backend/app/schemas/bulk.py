@@ -0,0 +1,18 @@
+# File: app/schemas/bulk.py
+
+from typing import List, Optional
+from sqlmodel import SQLModel
+
+# Outcome of one operation of a bulk request
+class BulkItemResult(SQLModel):
+    index: int # Position of the operation in its request list (create/update/delete)
+    id: Optional[int] = None # ID of the created/updated/deleted object
+    ok: bool
+    error: Optional[str] = None # 'not_found', 'forbidden', 'in_use' (still referenced, e.g. by training runs)
+                                # or 'duplicate' (ID already listed earlier in the same list)
+
+# Response of the bulk endpoints: one result per requested operation, in request order
+class BulkResult(SQLModel):
+    created: List[BulkItemResult] = []
+    updated: List[BulkItemResult] = []
+    deleted: List[BulkItemResult] = []
@@ -1,12 +1,13 @@
 # File: app/schemas/dataset.py
 
-from typing import Optional
-from pydantic import BaseModel # Using BaseModel for non-table schemas
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, field_validator # Using BaseModel for non-table schemas
 from sqlmodel import SQLModel, Field
 from datetime import datetime
 
 # Import UserPublic if you want to show owner details
 from app.schemas.user import UserPublic
+from app.schemas.facet import FacetCount
 
 # Shared properties for reading/displaying
 class DatasetBase(SQLModel):
@@ -34,6 +35,26 @@ class DatasetUpdate(BaseModel):
     description: Optional[str] = None
     is_public: Optional[bool] = None
 
+    @field_validator('name', 'is_public')
+    @classmethod
+    def not_null(cls, v: Any) -> Any:
+        # Optional to leave them unchanged, but the columns are NOT NULL
+        if v is None:
+            raise ValueError('May be omitted but not null')
+        return v
+
+
+# One update of a bulk request: the dataset ID plus the metadata to change
+class DatasetBulkUpdate(DatasetUpdate):
+    id: int
+
+
+# Body of POST /datasets/bulk (metadata only, like /upload; applied in one transaction)
+class DatasetBulkRequest(BaseModel):
+    create: List[DatasetCreate] = []
+    update: List[DatasetBulkUpdate] = []
+    delete: List[int] = [] # Dataset IDs
+
 
 # Properties to return to client (public representation)
 class DatasetPublic(DatasetBase):
@@ -43,4 +64,14 @@ class DatasetPublic(DatasetBase):
     created_at: datetime
     updated_at: datetime
     # Optional: Include owner info (requires joining/loading in the endpoint)
-    # owner: Optional[UserPublic] = None
\ No newline at end of file
+    # owner: Optional[UserPublic] = None
+
+# Properties to return when listing datasets (one page)
+class DatasetPublicList(SQLModel):
+    items: List[DatasetPublic]
+    next_cursor: Optional[str] = None # Pass as ?cursor= to get the next page (None on the last page)
+    total: Optional[int] = None # Number of matching datasets (first page only)
+    total_is_estimate: bool = False # True if `total` is the database's estimate (large counts)
+    # Counts per storage_type / is_public for the current filters (first page only)
+    facets: Optional[Dict[str, List[FacetCount]]] = None
+    facets_are_estimates: bool = False # True if the facet counts are estimates (large name-prefix searches)
@@ -0,0 +1,9 @@
+# File: app/schemas/facet.py
+
+from typing import Optional, Union
+from sqlmodel import SQLModel
+
+# One value of a facet and how many rows of the filtered listing have it
+class FacetCount(SQLModel):
+    value: Optional[Union[bool, str]] = None # None counts the rows without a value
+    count: int
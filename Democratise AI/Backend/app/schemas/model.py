@@ -1,9 +1,11 @@
 # File: app/schemas/model.py
 
-from typing import Optional
+from typing import Dict, List, Optional
 from sqlmodel import SQLModel, Field # Or from pydantic import BaseModel, Field
 from datetime import datetime
 
+from app.schemas.facet import FacetCount
+
 # Shared properties
 class ModelBase(SQLModel):
     name: str = Field(index=True)
@@ -32,4 +34,14 @@ class ModelPublic(ModelBase):
     updated_at: datetime
     # Add other fields safe for public exposure if needed
 
+# Properties to return when listing models (one page)
+class ModelPublicList(SQLModel):
+    items: List[ModelPublic]
+    next_cursor: Optional[str] = None # Pass as ?cursor= to get the next page (None on the last page)
+    total: Optional[int] = None # Number of matching models (first page only)
+    total_is_estimate: bool = False # True if `total` is the database's estimate (large counts)
+    # Counts per task_type / framework / source_type for the current filters (first page only)
+    facets: Optional[Dict[str, List[FacetCount]]] = None
+    facets_are_estimates: bool = False # True if the facet counts are estimates (large name-prefix searches)
+
 # You might add more specific schemas later, e.g., ModelPublicWithDetails
\ No newline at end of file
@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Optional
 
+from pydantic import field_validator
 from sqlmodel import Field, SQLModel
 from app.schemas.model import ModelPublic
 from app.schemas.dataset import DatasetPublic
@@ -22,6 +23,32 @@ class ProjectUpdate(SQLModel):
     status: Optional[str] = None
     # Add fields for associating models/datasets later if needed
 
+    @field_validator('name', 'status')
+    @classmethod
+    def not_null(cls, v: Any) -> Any:
+        # Optional to leave them unchanged, but the columns are NOT NULL
+        if v is None:
+            raise ValueError('May be omitted but not null')
+        return v
+
+    @field_validator('status')
+    @classmethod
+    def not_deleting(cls, v: Any) -> Any:
+        # 'deleting' (crud_project.PROJECT_DELETING) is only set by DELETE /projects/{id} or a bulk delete
+        if v == 'deleting':
+            raise ValueError("Delete the project instead of setting its status to 'deleting'")
+        return v
+
+# One update of a bulk request: the project ID plus the fields to change
+class ProjectBulkUpdate(ProjectUpdate):
+    id: int
+
+# Body of POST /projects/bulk (applied in one transaction, see BulkResult for the outcome)
+class ProjectBulkRequest(SQLModel):
+    create: List[ProjectCreate] = []
+    update: List[ProjectBulkUpdate] = []
+    delete: List[int] = [] # Project IDs
+
 # Properties shared by models stored in DB
 # class ProjectInDBBase(ProjectBase):
 #     id: int
@@ -45,7 +72,19 @@ class ProjectPublic(ProjectBase):
     # Optionally include nested owner info
     # owner: Optional[UserPublic] = None # Requires eager loading or separate query
 
-# Properties to return when listing multiple projects (maybe less detail)
+# Lightweight list representation: child counts instead of nested children
+class ProjectSummary(ProjectBase):
+    id: int
+    user_id: int
+    status: str
+    created_at: datetime
+    updated_at: datetime
+    model_count: int = 0
+    dataset_count: int = 0
+    training_run_count: int = 0
+
+# Properties to return when listing multiple projects (less detail)
 class ProjectPublicList(SQLModel):
-    items: List[ProjectPublic]
-    total: int # For pagination
+    items: List[ProjectSummary]
+    next_cursor: Optional[str] = None # Pass as ?cursor= to get the next page (None on the last page)
+    total: Optional[int] = None # Number of projects the user owns (first page only)
@@ -0,0 +1,35 @@
+# File: app/schemas/training_metric.py
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+# One point of a run's per-step metrics
+class MetricPoint(BaseModel):
+    metric: str = Field(..., min_length=1, max_length=100) # e.g. "loss"
+    step: int = Field(..., ge=0)
+    value: float # Non-finite values (NaN, inf) are dropped
+
+
+# Body of POST /training/jobs/{id}/metrics: points of any metrics, in any order
+class MetricPointsIn(BaseModel):
+    points: List[MetricPoint] = Field(..., max_length=10000)
+
+
+class MetricAppendResult(BaseModel):
+    appended: int # Points stored (steps already stored, e.g. of a retried batch, are skipped)
+
+
+# One metric over a step range, in columns (steps[i], values[i])
+class MetricSeries(BaseModel):
+    metric: str
+    count: int # Points stored in the range
+    steps: List[int]
+    values: List[float]
+    downsampled: Optional[str] = None # "lttb" or "minmax" when fewer points than `count` are returned
+
+
+class TrainingRunMetrics(BaseModel):
+    run_id: int
+    series: List[MetricSeries]
@@ -1,6 +1,6 @@
 # File: app/schemas/training_run.py
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from sqlmodel import SQLModel, Field # Or 
 from pydantic import BaseModel, Field
 from datetime import datetime
@@ -11,6 +11,7 @@ class TrainingRunBase(SQLModel):
     config_params: Optional[Dict[str, Any]] = None
     metrics: Optional[Dict[str, Any]] = None
     logs_location: Optional[str] = None
+    error: Optional[str] = None # Set when status is 'failed'
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
 
@@ -22,6 +23,8 @@ class TrainingRunCreate(BaseModel): # Doesn't map to DB table directly
     dataset_id: int
     # Include hyperparameters or config directly
     config_params: Dict[str, Any] # e.g., {"learning_rate": 0.001, "epochs": 10}
+    # Order among the user's own queued runs (higher first); users share the workers fairly whatever the priorities
+    priority: int = Field(0, ge=-100, le=100)
 
 
 # Properties potentially allowed in an update (e.g., manually marking as cancelled - unlikely needed now)
@@ -32,6 +35,7 @@ class TrainingRunCreate(BaseModel): # Doesn't map to DB table directly
 # Properties to return to client
 class TrainingRunPublic(TrainingRunBase):
     id: int
+    priority: int
     project_id: int
     user_id: int # User who initiated
     model_id: int
@@ -39,4 +43,9 @@ class TrainingRunPublic(TrainingRunBase):
     created_at: datetime
     updated_at: datetime
     # You might want to add nested Project/Model/Dataset info here later
-    # project: Optional[ProjectPublic] = None # Example
\ No newline at end of file
+    # project: Optional[ProjectPublic] = None # Example
+
+# Properties to return when querying a project's runs (one page)
+class TrainingRunPublicList(SQLModel):
+    items: List[TrainingRunPublic]
+    next_cursor: Optional[str] = None # Pass as ?cursor= to get the next page (None on the last page)
@@ -0,0 +1,13 @@
+# File: app/schemas/user_stats.py
+
+from datetime import datetime
+from typing import Dict, Optional
+from sqlmodel import SQLModel
+
+# Dashboard counts of the current user (GET /user/stats)
+class UserStatsPublic(SQLModel):
+    projects: int
+    datasets: int
+    runs: Dict[str, int] # Training runs per status, e.g. {"queued": 1, "completed": 12, ...}
+    runs_total: int
+    updated_at: Optional[datetime] = None # Last change of the counts (None if nothing was counted yet)
@@ -0,0 +1,161 @@
+# File: app/scripts/benchmark_job_queue.py
+"""
+Benchmark of the training job queue (crud_training_run.claim_training_runs).
+
+Seeds a throwaway schema in the configured PostgreSQL database with --runs queued
+training runs of --users users, then lets --workers worker processes drain the
+queue through the same claim -> start -> finish calls app.worker makes (the job
+itself is a no-op). Reports the claim throughput and latency percentiles, and fails (exit
+code 1) if any run was claimed twice or left unfinished.
+
+Usage (from the Backend directory):
+    python -m app.scripts.benchmark_job_queue [--runs 5000] [--users 100] [--workers 8] [--batch 1] [--keep]
+
+Every status change also updates the owner's userstats row, so runs of a single user
+(--users 1) are finished one transaction at a time whatever the number of workers.
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+from sqlmodel import Session, SQLModel
+
+from app.core.config import settings
+from app.crud import crud_training_run
+from app.db import base # noqa: F401 - registers all table models with SQLModel.metadata
+
+SCHEMA = "job_queue_benchmark"
+
+SEED_SQL = [
+    """
+    INSERT INTO "user" (id, name, email, password_hash, is_active, is_superuser, created_at, updated_at)
+    SELECT g, 'benchmark ' || g, 'benchmark' || g || '@example.com', 'not-a-hash', true, false, now(), now()
+    FROM generate_series(1, :users) AS g
+    """,
+    "INSERT INTO project (id, name, status, created_at, updated_at, user_id) VALUES (1, 'benchmark', 'active', now(), now(), 1)",
+    """
+    INSERT INTO model (id, name, source_type, source_identifier, created_at, updated_at)
+    VALUES (1, 'benchmark', 'huggingface', 'org/benchmark', now(), now())
+    """,
+    """
+    INSERT INTO dataset (id, name, user_id, storage_type, storage_path, is_public, created_at, updated_at)
+    VALUES (1, 'benchmark', 1, 's3', 'bucket/benchmark', false, now(), now())
+    """,
+    """
+    INSERT INTO trainingrun (project_id, user_id, model_id, dataset_id, status, config_params, attempts,
+                             created_at, updated_at)
+    SELECT 1, 1 + g % :users, 1, 1, 'queued', jsonb_build_object('seed', g), 0,
+           now() - (:runs - g) * interval '1 second', now()
+    FROM generate_series(1, :runs) AS g
+    """,
+    """
+    INSERT INTO userstats (user_id, projects, datasets, runs_queued, runs_starting, runs_running,
+                           runs_completed, runs_failed, runs_cancelled, updated_at)
+    SELECT user_id, 0, 0, count(*), 0, 0, 0, 0, 0, now() FROM trainingrun GROUP BY user_id
+    """,
+    "INSERT INTO trainingshare (user_id, weight, virtual_time) SELECT user_id, 1.0, 0.0 FROM userstats",
+]
+
+
+def _create_schema(engine: Engine, runs: int, users: int) -> None:
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    # Tables and indexes as declared on the models (trainingrun is not partitioned here)
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for statement in SEED_SQL:
+            connection.execute(text(statement), {"runs": runs, "users": users})
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("ANALYZE"))
+
+
+def _engine(pool_size: int = 1) -> Engine:
+    url = make_url(str(settings.SQLALCHEMY_DATABASE_URI))
+    return create_engine(url, pool_size=pool_size, connect_args={"options": f"-c search_path={SCHEMA}"})
+
+
+def _drain(worker_id: str, batch: int) -> Tuple[int, List[float]]:
+    # One worker process: claims until the queue is empty, finishing every claimed run
+    engine = _engine()
+    done, latencies = 0, []
+    with Session(engine, expire_on_commit=False) as db:
+        while True:
+            started = time.perf_counter()
+            runs = crud_training_run.claim_training_runs(db, worker_id=worker_id, lease_seconds=60, limit=batch)
+            latencies.append(time.perf_counter() - started)
+            if not runs:
+                break
+            for run in runs:
+                crud_training_run.start_training_run(db, run_id=run.id, worker_id=worker_id, lease_seconds=60)
+                crud_training_run.finish_training_run(db, run_id=run.id, worker_id=worker_id, status="completed")
+                done += 1
+            db.expunge_all()
+    engine.dispose()
+    return done, latencies[:-1] # The last, empty claim is not a claim
+
+
+def benchmark_job_queue(runs: int = 5000, users: int = 100, workers: int = 8, batch: int = 1, keep: bool = False) -> int:
+    """
+    Runs the benchmark and prints a report.
+
+    Returns:
+        The number of runs claimed more than once or never finished.
+    """
+    if make_url(str(settings.SQLALCHEMY_DATABASE_URI)).get_backend_name() != "postgresql":
+        raise SystemExit("benchmark_job_queue needs a PostgreSQL SQLALCHEMY_DATABASE_URI")
+    engine = _engine()
+
+    print(f"Seeding schema '{SCHEMA}' with {runs} queued runs of {users} users...")
+    _create_schema(engine, runs, users)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            # Start the processes (imports, connections) before timing
+            list(pool.map(time.sleep, [0.5] * workers))
+            started = time.perf_counter()
+            results = list(pool.map(_drain, [f"benchmark-{index}" for index in range(workers)], [batch] * workers))
+            wall = time.perf_counter() - started
+        finished = sum(done for done, _ in results)
+        latencies = [latency for _, worker_latencies in results for latency in worker_latencies]
+
+        with engine.connect() as connection:
+            bad = connection.execute(text(
+                "SELECT count(*) FROM trainingrun WHERE attempts != 1 OR status != 'completed'"
+            )).scalar()
+
+        latencies_ms = sorted(latency * 1000 for latency in latencies)
+        percentile = lambda p: latencies_ms[min(int(len(latencies_ms) * p), len(latencies_ms) - 1)]
+        print(f"{workers} workers, batch {batch}: {finished} runs in {wall:.2f} s")
+        print(f"  claims/s:          {len(latencies_ms) / wall:,.0f}")
+        print(f"  runs/s (claim+start+finish): {finished / wall:,.0f}")
+        print(f"  claim latency ms:  p50 {percentile(0.5):.2f}  p95 {percentile(0.95):.2f}  "
+              f"p99 {percentile(0.99):.2f}  max {latencies_ms[-1]:.2f}  mean {statistics.mean(latencies_ms):.2f}")
+        print(f"{bad} run{'' if bad == 1 else 's'} claimed twice or unfinished")
+        return bad
+    finally:
+        if not keep:
+            with engine.begin() as connection:
+                connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5000, help="Number of queued runs to drain")
+    parser.add_argument("--users", type=int, default=100, help="Number of users owning the runs")
+    parser.add_argument("--workers", type=int, default=8, help="Number of concurrent workers")
+    parser.add_argument("--batch", type=int, default=1, help="Runs claimed per claim")
+    parser.add_argument("--keep", action="store_true", help=f"Keep the '{SCHEMA}' schema afterwards")
+    args = parser.parse_args()
+    failures = benchmark_job_queue(
+        runs=args.runs, users=args.users, workers=args.workers, batch=args.batch, keep=args.keep
+    )
+    sys.exit(1 if failures else 0)
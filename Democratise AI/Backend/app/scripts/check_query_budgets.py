@@ -0,0 +1,161 @@
+# File: app/scripts/check_query_budgets.py
+"""
+Query budget (N+1) check for the API endpoints.
+
+Creates a throwaway user with a few dozen projects and datasets (linked to
+models) in the configured database, calls the read endpoints through the
+ASGI app and counts the SQL statements each one executes. Fails (exit code 1)
+if an endpoint exceeds its budget, e.g. because a relationship is now lazy
+loaded once per listed row. The user and their rows are deleted afterwards.
+
+Usage (from the Backend directory):
+    python -m app.scripts.check_query_budgets [--rows 50]
+"""
+
+import argparse
+import sys
+import uuid
+from typing import Callable, List, Tuple
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, delete, select
+
+from app.crud import crud_project
+from app.db import base # noqa: F401 - registers all table models with SQLModel.metadata
+from app.db.query_stats import QueryBudgetExceeded, query_budget
+from app.db.session import engine
+from app.main import app
+from app.models.links import ProjectDatasetLink, ProjectModelLink
+from app.models.model import Model
+from app.models.user import User
+from app.models.user_stats import UserStats
+
+PASSWORD = "query-budget-check"
+
+# Maximum statements per request, authentication (the user lookup) included.
+# Budgets must not depend on the number of rows returned.
+BUDGETS = {
+    "GET /auth/me": 1,
+    "GET /user/stats": 2,
+    "GET /projects/": 2,
+    "GET /projects/ (next page)": 2,
+    "GET /projects/{id}": 5,
+    "GET /datasets/": 5,
+    "GET /datasets/ (next page)": 2,
+    "GET /datasets/{id}": 2,
+    "GET /models/": 5,
+    "GET /models/{id}": 2,
+}
+
+
+def _seed(client: TestClient, headers: dict, rows: int, run: str) -> Tuple[List[int], List[int], List[int]]:
+    """
+    Creates `rows` projects and datasets for the user, each project linked to a model and a dataset.
+
+    Returns:
+        The project, dataset and model IDs.
+    """
+    projects = client.post(
+        "/api/v1/projects/bulk", headers=headers, json={"create": [{"name": f"budget {i}"} for i in range(rows)]}
+    ).json()["created"]
+    datasets = client.post(
+        "/api/v1/datasets/bulk", headers=headers,
+        json={"create": [{"name": f"budget {i}", "is_public": i % 2 == 0} for i in range(rows)]},
+    ).json()["created"]
+    project_ids = [item["id"] for item in projects]
+    dataset_ids = [item["id"] for item in datasets]
+    with Session(engine) as db:
+        models = [
+            Model(name=f"budget model {i}", source_type="platform", source_identifier=f"budget-{run}-{i}")
+            for i in range(rows)
+        ]
+        db.add_all(models)
+        db.flush()
+        model_ids = [model.id for model in models]
+        for project_id, dataset_id, model_id in zip(project_ids, dataset_ids, model_ids):
+            db.add(ProjectModelLink(project_id=project_id, model_id=model_id))
+            db.add(ProjectDatasetLink(project_id=project_id, dataset_id=dataset_id))
+        db.commit()
+    return project_ids, dataset_ids, model_ids
+
+
+def _cleanup(client: TestClient, headers: dict, email: str, project_ids: List[int], dataset_ids: List[int],
+             model_ids: List[int]) -> None:
+    client.post("/api/v1/projects/bulk", headers=headers, json={"delete": project_ids})
+    client.post("/api/v1/datasets/bulk", headers=headers, json={"delete": dataset_ids})
+    with Session(engine) as db:
+        # Deleted projects are only tombstoned; purge them before their owner goes
+        while crud_project.purge_deleted_projects(db, batch_size=10000):
+            pass
+        if model_ids:
+            db.exec(delete(Model).where(Model.id.in_(model_ids)))
+        user = db.exec(select(User).where(User.email == email)).first()
+        if user is not None:
+            db.exec(delete(UserStats).where(UserStats.user_id == user.id))
+            db.delete(user)
+        db.commit()
+
+
+def check_query_budgets(rows: int = 50) -> int:
+    """
+    Runs the check and prints a report.
+
+    Returns:
+        The number of endpoints over budget.
+    """
+    run = uuid.uuid4().hex[:12]
+    email = f"query-budget-{run}@example.com"
+    failures = 0
+    with TestClient(app) as client:
+        client.post("/api/v1/auth/signup", json={"name": "Query budget", "email": email, "password": PASSWORD})
+        token = client.post("/api/v1/auth/login", data={"username": email, "password": PASSWORD}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        project_ids: List[int] = []
+        dataset_ids: List[int] = []
+        model_ids: List[int] = []
+        try:
+            project_ids, dataset_ids, model_ids = _seed(client, headers, rows, run)
+            page_size = max(rows // 2, 1) # Lists span two pages
+            first_projects = client.get("/api/v1/projects/", headers=headers, params={"limit": page_size}).json()
+            first_datasets = client.get("/api/v1/datasets/", headers=headers, params={"limit": page_size}).json()
+
+            def get(path: str, **params) -> Callable[[], int]:
+                return lambda: client.get(f"/api/v1{path}", headers=headers, params=params).status_code
+
+            cases = [
+                ("GET /auth/me", get("/auth/me")),
+                ("GET /user/stats", get("/user/stats")),
+                ("GET /projects/", get("/projects/", limit=page_size)),
+                ("GET /projects/ (next page)", get("/projects/", limit=page_size, cursor=first_projects["next_cursor"])),
+                ("GET /projects/{id}", get(f"/projects/{project_ids[0]}")),
+                ("GET /datasets/", get("/datasets/", limit=page_size)),
+                ("GET /datasets/ (next page)", get("/datasets/", limit=page_size, cursor=first_datasets["next_cursor"])),
+                ("GET /datasets/{id}", get(f"/datasets/{dataset_ids[0]}")),
+                ("GET /models/", get("/models/", limit=page_size)),
+                ("GET /models/{id}", get(f"/models/{model_ids[0]}")),
+            ]
+            for name, call in cases:
+                budget = BUDGETS[name]
+                try:
+                    with query_budget(budget) as stats:
+                        status_code = call()
+                except QueryBudgetExceeded as error:
+                    failures += 1
+                    print(f"[FAIL] {name}: {error}")
+                    continue
+                result = "ok" if status_code == 200 else f"HTTP {status_code}"
+                if status_code != 200:
+                    failures += 1
+                print(f"[{result:4}] {name}: {stats.count}/{budget} queries, {stats.total_ms:.1f} ms")
+        finally:
+            _cleanup(client, headers, email, project_ids, dataset_ids, model_ids)
+
+    print(f"{failures} endpoint{'' if failures == 1 else 's'} over budget or failing")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50, help="Projects/datasets/models created for the check")
+    args = parser.parse_args()
+    sys.exit(1 if check_query_budgets(rows=args.rows) else 0)
@@ -0,0 +1,224 @@
+# File: app/scripts/check_query_plans.py
+"""
+Query plan regression check for the CRUD read queries.
+
+Seeds a throwaway schema in the configured PostgreSQL database with realistic
+row counts, runs the CRUD functions used by the API while recording the SQL
+they emit, and EXPLAINs every recorded query. Fails (exit code 1) if a plan
+contains a sequential scan or a sort node, i.e. if a list/detail query is no
+longer served by an index in the order it needs.
+
+Usage (from the Backend directory):
+    python -m app.scripts.check_query_plans [--scale 1.0] [--keep]
+"""
+
+import argparse
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlmodel import Session, SQLModel
+
+from app import crud
+from app.core.config import settings
+from app.crud.pagination import Page
+from app.db import base # noqa: F401 - registers all table models with SQLModel.metadata
+
+SCHEMA = "query_plan_check"
+
+# Plan nodes that mean a query reads (or reorders) more rows than it returns
+FORBIDDEN_NODES = {"Seq Scan", "Sort", "Incremental Sort"}
+
+# Tables with a row per facet value combination, not per listed row: scanning them is fine
+SUMMARY_TABLES = {"modelfacetcount", "datasetfacetcount"}
+
+# Base row counts at --scale 1.0
+SEED_SQL = [
+    """
+    INSERT INTO "user" (name, email, password_hash, is_active, is_superuser, created_at, updated_at)
+    SELECT 'user ' || g, 'user' || g || '@example.com', 'not-a-hash', true, false, now(), now()
+    FROM generate_series(1, :users) AS g
+    """,
+    # ~20 projects per user, spread over the last year; user 1 is a heavy user
+    # owning a quarter of them (the case keyset pagination and the indexes are for)
+    """
+    INSERT INTO project (name, description, status, created_at, updated_at, user_id)
+    SELECT 'project ' || g, NULL, 'active',
+           now() - g * interval '1 minute', now() - (g % 525600) * interval '1 minute',
+           CASE WHEN g % 4 = 0 THEN 1 ELSE 1 + (g % :users) END
+    FROM generate_series(1, :users * 20) AS g
+    """,
+    # ~5% of datasets are public; user 1 again owns a quarter of them
+    """
+    INSERT INTO dataset (name, description, user_id, storage_type, storage_path, file_size_bytes,
+                         is_public, created_at, updated_at)
+    SELECT 'dataset ' || g, NULL, CASE WHEN g % 4 = 0 THEN 1 ELSE 1 + (g % :users) END,
+           's3', 'bucket/dataset-' || g, g,
+           g % 20 = 1, now() - g * interval '1 minute', now() - (g % 525600) * interval '1 minute'
+    FROM generate_series(1, :users * 10) AS g
+    """,
+    """
+    INSERT INTO model (name, description, source_type, source_identifier, task_type, framework,
+                       created_at, updated_at)
+    SELECT 'model ' || g, NULL, 'huggingface', 'org/model-' || g,
+           (ARRAY['text-classification', 'image-classification', 'summarization'])[1 + g % 3],
+           (ARRAY['pytorch', 'tensorflow'])[1 + g % 2], now(), now()
+    FROM generate_series(1, :users) AS g
+    """,
+    """
+    INSERT INTO projectmodellink (project_id, model_id)
+    SELECT p.id, 1 + (p.id % :users) FROM project p
+    """,
+    """
+    INSERT INTO projectdatasetlink (project_id, dataset_id)
+    SELECT p.id, 1 + (p.id % (:users * 10)) FROM project p
+    """,
+    # ~3 training runs per project
+    """
+    INSERT INTO trainingrun (project_id, user_id, model_id, dataset_id, status, config_params, metrics,
+                             created_at, updated_at)
+    SELECT p.id, p.user_id, 1 + (p.id % :users), 1 + (p.id % (:users * 10)), 'completed',
+           '{"lr": 0.001}', jsonb_build_object('accuracy', (p.id * r % 1000) / 1000.0),
+           now() - r * interval '1 hour', now()
+    FROM project p CROSS JOIN generate_series(1, 3) AS r
+    """,
+]
+
+
+def _plan_nodes(plan: Dict[str, Any], parent: str = "") -> List[str]:
+    """
+    Flattens an EXPLAIN (FORMAT JSON) plan tree into "Node Type (relation)" strings.
+    """
+    label = plan["Node Type"]
+    if label == "Seq Scan" and parent == "Limit" and "Filter" not in plan:
+        # Reads no more rows than the LIMIT (e.g. count_capped over a whole table)
+        label = "Bounded Seq Scan"
+    if "Relation Name" in plan:
+        label += f" on {plan['Relation Name']}"
+    nodes = [label]
+    for child in plan.get("Plans", []):
+        nodes.extend(_plan_nodes(child, plan["Node Type"]))
+    return nodes
+
+
+def _create_schema(engine: Engine, scale: float) -> None:
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    # Tables and indexes as declared on the models (kept in sync with the Alembic revisions)
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        users = max(int(1000 * scale), 10)
+        for statement in SEED_SQL:
+            connection.execute(text(statement), {"users": users})
+    with Session(engine) as db:
+        # The seed rows bypass the CRUD functions that keep the facet counts
+        crud.model.rebuild_facet_counts_of_models(db)
+        crud.dataset.rebuild_facet_counts_of_datasets(db)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("ANALYZE"))
+
+
+def _cases(db: Session) -> List[Tuple[str, Callable[[], Any]]]:
+    """
+    The read paths of the API, as (name, call) pairs. Each call may emit several queries.
+    """
+    user_id = 1 # The heavy user
+    email = "user1@example.com"
+    project_id = db.execute(text("SELECT min(id) FROM project WHERE user_id = :u"), {"u": user_id}).scalar()
+
+    def second_page(fn: Callable[..., Page], **kwargs: Any) -> Callable[[], Any]:
+        def call() -> Any:
+            first = fn(db=db, limit=20, **kwargs)
+            return fn(db=db, cursor=first.next_cursor, limit=20, **kwargs)
+        return call
+
+    return [
+        ("user.get_user_by_email", lambda: crud.user.get_user_by_email(db=db, email=email)),
+        ("project.get_multi_by_owner", lambda: crud.project.get_multi_by_owner(db=db, user_id=user_id)),
+        ("project.get_multi_by_owner (next page)", second_page(crud.project.get_multi_by_owner, user_id=user_id)),
+        ("project.get_project (with children)",
+         lambda: crud.project.get_project(db=db, id=project_id, with_children=True)),
+        ("dataset.get_multi_by_owner_or_public",
+         lambda: crud.dataset.get_multi_by_owner_or_public(db=db, user_id=user_id)),
+        ("dataset.get_multi_by_owner_or_public (next page)",
+         second_page(crud.dataset.get_multi_by_owner_or_public, user_id=user_id)),
+        ("dataset.get_dataset", lambda: crud.dataset.get_dataset(db=db, id=1)),
+        ("model.get_multi", lambda: crud.model.get_multi(db=db)),
+        ("model.get_multi (next page)", second_page(crud.model.get_multi)),
+        ("model.get_model", lambda: crud.model.get_model(db=db, id=1)),
+        ("model.get_facets", lambda: crud.model.get_facets(db=db, framework="pytorch")),
+        ("model.get_facets (name prefix)", lambda: crud.model.get_facets(db=db, name_prefix="model 1")),
+        ("dataset.get_facets", lambda: crud.dataset.get_facets(db=db, user_id=user_id, storage_type="s3")),
+        ("dataset.get_facets (name prefix)",
+         lambda: crud.dataset.get_facets(db=db, user_id=user_id, name_prefix="dataset 1")),
+        ("training_run.get_training_run", lambda: crud.training_run.get_training_run(db=db, id=1)),
+        ("training_run.query_project_runs (by metric)",
+         lambda: crud.training_run.query_project_runs(
+             db=db, project_id=project_id, metrics=["accuracy>0.5"], sort="-metrics.accuracy", limit=20
+         )),
+    ]
+
+
+def check_query_plans(scale: float = 1.0, keep: bool = False) -> int:
+    """
+    Runs the check and prints a report.
+
+    Returns:
+        The number of queries whose plan contains a forbidden node.
+    """
+    url = make_url(str(settings.SQLALCHEMY_DATABASE_URI))
+    if url.get_backend_name() != "postgresql":
+        raise SystemExit("check_query_plans needs a PostgreSQL SQLALCHEMY_DATABASE_URI")
+    engine = create_engine(url, connect_args={"options": f"-c search_path={SCHEMA}"})
+
+    recorded: List[Tuple[str, Any]] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(connection, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            recorded.append((statement, parameters))
+
+    print(f"Seeding schema '{SCHEMA}' (scale={scale})...")
+    _create_schema(engine, scale)
+
+    failures = 0
+    try:
+        with Session(engine) as db:
+            for name, call in _cases(db):
+                recorded.clear()
+                call()
+                db.expunge_all() # Every case loads from the database, not the identity map
+                queries = list(recorded)
+                for index, (statement, parameters) in enumerate(queries, start=1):
+                    cursor = db.connection().connection.cursor()
+                    cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+                    nodes = _plan_nodes(cursor.fetchone()[0][0]["Plan"])
+                    cursor.close()
+                    relations = {node.split(" on ")[1] for node in nodes if " on " in node}
+                    bad = [
+                        node for node in nodes
+                        if node.split(" on ")[0] in FORBIDDEN_NODES and not (relations and relations <= SUMMARY_TABLES)
+                    ]
+                    status = "FAIL" if bad else "ok"
+                    print(f"[{status:4}] {name} #{index}: {' > '.join(nodes)}")
+                    if bad:
+                        failures += 1
+                        print("       " + " ".join(statement.split()))
+    finally:
+        if not keep:
+            with engine.begin() as connection:
+                connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        engine.dispose()
+
+    print(f"{failures} quer{'y' if failures == 1 else 'ies'} with a sequential scan or sort")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for the seeded row counts")
+    parser.add_argument("--keep", action="store_true", help=f"Keep the '{SCHEMA}' schema afterwards")
+    args = parser.parse_args()
+    sys.exit(1 if check_query_plans(scale=args.scale, keep=args.keep) else 0)
@@ -0,0 +1,62 @@
+# File: app/scripts/rebuild_facet_counts.py
+"""
+Recomputes the precomputed facet counts of the model and dataset listings
+(modelfacetcount, datasetfacetcount; see app/models/facet_count.py) from the tables.
+
+The counts are maintained incrementally by the CRUD functions; run this after
+writing models or datasets another way (SQL, scripts) or to check for drift. Each
+table is rebuilt in one transaction (one scan of the counted table); the facet
+value combinations whose counts changed are reported.
+
+Usage (from the Backend directory):
+    python -m app.scripts.rebuild_facet_counts
+"""
+
+import argparse
+from collections import Counter
+
+from sqlmodel import func, select
+
+from app.crud import crud_dataset, crud_model
+from app.db import base # noqa: F401 - registers all table models with SQLModel.metadata
+from app.db.session import SessionLocal
+from app.models.facet_count import DatasetFacetCount, ModelFacetCount
+
+
+def _counts(db, summary, keys) -> Counter:
+    columns = [getattr(summary, key) for key in keys]
+    return Counter({
+        tuple(row[:-1]): row[-1]
+        for row in db.exec(select(*columns, func.sum(summary.count)).group_by(*columns)).all()
+    })
+
+
+def rebuild() -> int:
+    """
+    Rebuilds both counts tables.
+
+    Returns:
+        The number of facet value combinations whose counts were wrong.
+    """
+    drifted = 0
+    with SessionLocal() as db:
+        for name, summary, keys, rebuild_table in (
+            ("model", ModelFacetCount, crud_model.FACET_KEYS, crud_model.rebuild_facet_counts_of_models),
+            ("dataset", DatasetFacetCount, crud_dataset.FACET_KEYS, crud_dataset.rebuild_facet_counts_of_datasets),
+        ):
+            before = _counts(db, summary, keys)
+            combinations = rebuild_table(db)
+            after = _counts(db, summary, keys)
+            for values in sorted(set(before) | set(after), key=repr):
+                if before[values] != after[values]:
+                    drifted += 1
+                    print(f"{name} {dict(zip(keys, values))}: {before[values]} -> {after[values]}")
+            print(f"Rebuilt the {name} facet counts ({combinations} combinations)")
+    print(f"{drifted} combination{'' if drifted == 1 else 's'} had drifted")
+    return drifted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+    rebuild()
@@ -0,0 +1,66 @@
+# File: app/scripts/rebuild_user_stats.py
+"""
+Recomputes the per-user dashboard counts (userstats) from the tables.
+
+The counts are maintained incrementally by the CRUD functions; run this after
+writing rows another way (SQL, imports) or to check for drift. Users are
+processed one at a time, each in its own short transaction; the users whose
+counts changed are reported.
+
+The training scheduler finds the users with runs queued through these counts
+(crud_training_run.claim_training_runs), so after queueing or changing training
+runs another way this is a required repair step, not only a display fix.
+
+Usage (from the Backend directory):
+    python -m app.scripts.rebuild_user_stats [--user-id 42]
+"""
+
+import argparse
+from typing import Optional
+
+from sqlmodel import select
+
+from app.crud import crud_user_stats
+from app.db import base # noqa: F401 - registers all table models with SQLModel.metadata
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.models.user_stats import UserStats
+
+# Columns compared to report drift
+_COUNTS = ("projects", "datasets", *(f"runs_{status}" for status in crud_user_stats.RUN_STATUSES))
+
+
+def rebuild(user_id: Optional[int] = None) -> int:
+    """
+    Rebuilds the counts of one user, or of every user.
+
+    Returns:
+        The number of users whose counts were wrong.
+    """
+    with SessionLocal() as db:
+        statement = select(User.id).order_by(User.id)
+        if user_id is not None:
+            statement = statement.where(User.id == user_id)
+        user_ids = db.exec(statement).all()
+        drifted = 0
+        for id in user_ids:
+            before = db.get(UserStats, id)
+            before = {name: getattr(before, name) for name in _COUNTS} if before else None
+            after = crud_user_stats.rebuild_user_stats(db, user_id=id)
+            changes = {
+                name: (before[name] if before else 0, getattr(after, name))
+                for name in _COUNTS if (before[name] if before else 0) != getattr(after, name)
+            }
+            if changes:
+                drifted += 1
+                print(f"user {id}: " + ", ".join(f"{name} {old} -> {new}" for name, (old, new) in changes.items()))
+            db.expunge_all()
+    print(f"Rebuilt the stats of {len(user_ids)} users ({drifted} had drifted)")
+    return drifted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, help="Only this user")
+    args = parser.parse_args()
+    rebuild(args.user_id)
@@ -1,40 +1,145 @@
-# Example: scripts/seed_models.py
+# File: app/scripts/seed_models.py
+"""
+Seeds the model catalog, or imports/refreshes it from a catalog file.
+
+Catalog files are JSON Lines or CSV (optionally gzipped), one model per
+line/row, and are streamed: memory use doesn't grow with the catalog size.
+Rows are upserted in batches on (source_type, source_identifier), so running
+the import again (e.g. nightly) only writes new and changed models.
+
+Recognised fields (Hugging Face hub dump names in parentheses):
+    source_identifier (id, modelId), name, description, source_type,
+    task_type (pipeline_tag), framework (library_name)
+
+Usage (from the Backend directory):
+    python -m app.scripts.seed_models                       # the built-in example models
+    python -m app.scripts.seed_models models.jsonl.gz [--source-type huggingface] [--batch-size 5000]
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.crud import crud_model
 from app.db.session import SessionLocal
-from app.models.model import Model
-from app.utils import aware_utcnow # For timestamps if needed directly
 
-def seed_data():
-    db = SessionLocal()
-    try:
-        print("Seeding models...")
-        models_to_add = [
-            Model(name='BERT Base Uncased', description='...', source_type='huggingface', source_identifier='bert-base-uncased', task_type='Language Model', framework='pytorch'),
-            Model(name='ResNet-50', description='...', source_type='torchvision', source_identifier='resnet50', task_type='Image Classification', framework='pytorch'),
-            # Add more models
-        ]
-
-        existing_models = db.query(Model.source_identifier).all()
-        existing_ids = {m[0] for m in existing_models}
-
-        added_count = 0
-        for model in models_to_add:
-             # Simple check to avoid adding duplicates based on identifier
-             if model.source_identifier not in existing_ids:
-                 # Timestamps are handled by default_factory, no need to set manually
-                 db.add(model)
-                 added_count += 1
-
-        if added_count > 0:
-            db.commit()
-            print(f"Added {added_count} new models.")
+DEFAULT_MODELS = [
+    dict(name='BERT Base Uncased', description='...', source_type='huggingface', source_identifier='bert-base-uncased', task_type='Language Model', framework='pytorch'),
+    dict(name='ResNet-50', description='...', source_type='torchvision', source_identifier='resnet50', task_type='Image Classification', framework='pytorch'),
+    # Built-in CPU trainers of the local executor (app/services/training_job.py), for CSV datasets
+    dict(name='Linear Regression', description='Linear regression trained with SGD (built-in, CPU)', source_type='platform', source_identifier='linear-regression', task_type='Tabular Regression', framework='python'),
+    dict(name='Logistic Regression', description='Binary logistic regression trained with SGD (built-in, CPU)', source_type='platform', source_identifier='logistic-regression', task_type='Tabular Classification', framework='python'),
+    # Add more models
+]
+
+# Catalog field -> alternative names found in catalog dumps
+ALIASES = {
+    "source_identifier": ("source_identifier", "id", "modelId"),
+    "name": ("name",),
+    "description": ("description",),
+    "source_type": ("source_type",),
+    "task_type": ("task_type", "pipeline_tag"),
+    "framework": ("framework", "library_name"),
+}
+
+
+def _open(path: str) -> io.TextIOBase:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streams the raw records of a .jsonl/.ndjson or .csv catalog file (optionally .gz).
+    """
+    name = path[:-3] if path.endswith(".gz") else path
+    with _open(path) as file:
+        if name.endswith(".csv"):
+            yield from csv.DictReader(file)
         else:
-            print("No new models to add.")
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
 
-    except Exception as e:
-        print(f"Error seeding data: {e}")
-        db.rollback()
+
+def _entry(record: Dict[str, Any], source_type: str) -> Optional[Dict[str, Any]]:
+    """
+    Maps a raw record to catalog fields (None if it has no identifier).
+    """
+    entry: Dict[str, Any] = {}
+    for field, names in ALIASES.items():
+        value = next((record[name] for name in names if record.get(name) not in (None, "")), None)
+        entry[field] = str(value) if value is not None else None
+    if entry["source_identifier"] is None:
+        return None
+    entry["source_type"] = entry["source_type"] or source_type
+    entry["name"] = entry["name"] or entry["source_identifier"]
+    return entry
+
+
+def _entries(path: str, source_type: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streams the catalog entries of a file, skipping records without an identifier.
+    """
+    skipped = 0
+    for record in _records(path):
+        entry = _entry(record, source_type)
+        if entry is None:
+            skipped += 1
+            continue
+        yield entry
+    if skipped:
+        print(f"Skipped {skipped} records without an identifier")
+
+
+def import_catalog(entries: Iterator[Dict[str, Any]], batch_size: int) -> None:
+    """
+    Upserts the entries batch by batch (one transaction per batch) and reports throughput.
+    """
+    db = SessionLocal()
+    started = time.perf_counter()
+    read = written = 0
+    batch: List[Dict[str, Any]] = []
+
+    def flush() -> None:
+        nonlocal written
+        written += crud_model.upsert_catalog(db, entries=batch)
+        batch.clear()
+        elapsed = time.perf_counter() - started
+        print(f"{read} read, {written} inserted/changed, {read / elapsed:,.0f} rows/s")
+
+    try:
+        for entry in entries:
+            batch.append(entry)
+            read += 1
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    except Exception:
+        db.rollback() # Batches committed so far are kept; re-running resumes cheaply
+        raise
     finally:
         db.close()
 
+    elapsed = time.perf_counter() - started
+    print(f"Done: {read} models in {elapsed:.1f}s ({written} inserted or changed, the rest unchanged)")
+
+
 if __name__ == "__main__":
-    seed_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", help="Catalog file (.jsonl/.csv, optionally .gz)")
+    parser.add_argument("--source-type", default="huggingface", help="source_type of records that don't set one")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per upsert/transaction")
+    args = parser.parse_args()
+
+    if args.path is None:
+        print("Seeding models...")
+        import_catalog(iter(DEFAULT_MODELS), args.batch_size)
+    else:
+        import_catalog(_entries(args.path, args.source_type), args.batch_size)
@@ -0,0 +1,209 @@
+# File: app/scripts/simulate_scheduler.py
+"""
+Simulation of the training scheduler (crud_training_run.claim_training_runs) on a
+synthetic workload, compared with plain first-in-first-out on the same workload.
+
+Seeds a throwaway schema in the configured PostgreSQL database and replays a seeded
+trace on a simulated clock: a heavy user submits a burst of --heavy runs at once,
+--medium users submit steadily, and --light users submit 1-3 runs each at random
+times. Runs last an exponentially distributed time (mean --duration seconds) on one of
+--slots slots. Every submission, claim, start and finish goes through crud_training_run
+as in the API and app.worker; only time is simulated. Reports the queue wait
+(submission -> start) percentiles per kind of user, for fair share and for FIFO.
+
+Usage (from the Backend directory):
+    python -m app.scripts.simulate_scheduler [--slots 8] [--heavy 500] [--medium 3] [--light 20]
+        [--duration 60] [--max-active 0] [--seed 0] [--keep]
+
+--max-active caps the active runs of every user (settings.TRAINING_MAX_ACTIVE_RUNS_PER_USER).
+"""
+
+import argparse
+import heapq
+import random
+import statistics
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Tuple
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+from sqlmodel import Session, SQLModel
+
+from app.core.config import settings
+from app.crud import crud_training_run
+from app.db import base # noqa: F401 - registers all table models with SQLModel.metadata
+from app.schemas.training_run import TrainingRunCreate
+
+SCHEMA = "scheduler_simulation"
+
+SEED_SQL = [
+    """
+    INSERT INTO "user" (id, name, email, password_hash, is_active, is_superuser, created_at, updated_at)
+    SELECT g, 'simulation ' || g, 'simulation' || g || '@example.com', 'not-a-hash', true, false, now(), now()
+    FROM generate_series(1, :users) AS g
+    """,
+    """
+    INSERT INTO project (id, name, status, created_at, updated_at, user_id)
+    SELECT g, 'simulation ' || g, 'active', now(), now(), g FROM generate_series(1, :users) AS g
+    """,
+    """
+    INSERT INTO model (id, name, source_type, source_identifier, created_at, updated_at)
+    VALUES (1, 'simulation', 'huggingface', 'org/simulation', now(), now())
+    """,
+    """
+    INSERT INTO dataset (id, name, user_id, storage_type, storage_path, is_public, created_at, updated_at)
+    VALUES (1, 'simulation', 1, 's3', 'bucket/simulation', false, now(), now())
+    """,
+]
+
+
+class Job(NamedTuple):
+    submitted: float # Simulated seconds
+    user_id: int
+    duration: float
+
+
+def _trace(heavy: int, medium: int, light: int, duration: float, slots: int, seed: int) -> Tuple[List[Job], Dict[int, str]]:
+    # Users: 1 is heavy, then the medium ones, then the light ones
+    generator = random.Random(seed)
+    horizon = heavy * duration / slots # About how long the heavy burst keeps the slots busy
+    jobs, kinds = [], {1: "heavy"}
+    jobs += [Job(0.0, 1, generator.expovariate(1 / duration)) for _ in range(heavy)]
+    for user_id in range(2, 2 + medium):
+        kinds[user_id] = "medium"
+        # Each about 1/(2 * medium) of the slots' capacity, i.e. half of it together
+        interval = 2 * medium * duration / slots
+        at = generator.uniform(0, interval)
+        while at < horizon:
+            jobs.append(Job(at, user_id, generator.expovariate(1 / duration)))
+            at += generator.expovariate(1 / interval)
+    for user_id in range(2 + medium, 2 + medium + light):
+        kinds[user_id] = "light"
+        at = generator.uniform(0, horizon)
+        for _ in range(generator.randint(1, 3)):
+            jobs.append(Job(at, user_id, generator.expovariate(1 / duration)))
+    jobs.sort(key=lambda job: job.submitted)
+    return jobs, kinds
+
+
+def _fifo(jobs: List[Job], slots: int) -> List[float]:
+    # Waits of the jobs (in trace order) when each free slot takes the oldest submission
+    free_at = [0.0] * slots
+    waits = []
+    for job in jobs:
+        slot_free = heapq.heappop(free_at)
+        started = max(slot_free, job.submitted)
+        heapq.heappush(free_at, started + job.duration)
+        waits.append(started - job.submitted)
+    return waits
+
+
+def _fair_share(db: Session, jobs: List[Job], slots: int) -> List[float]:
+    # Waits of the jobs (in trace order) when runs are claimed with claim_training_runs
+    waits = [0.0] * len(jobs)
+    finishing: List[Tuple[float, int]] = [] # (simulated end, run id)
+    next_job, now = 0, 0.0
+    while next_job < len(jobs) or finishing:
+        # Next event: a submission or the end of a run (ends first at equal times)
+        if finishing and (next_job == len(jobs) or finishing[0][0] <= jobs[next_job].submitted):
+            now, run_id = heapq.heappop(finishing)
+            crud_training_run.finish_training_run(db, run_id=run_id, worker_id="simulation", status="completed")
+        else:
+            job = jobs[next_job]
+            now = job.submitted
+            crud_training_run.submit_training_run(
+                db=db,
+                run_in=TrainingRunCreate(model_id=1, dataset_id=1, config_params={"job": next_job}),
+                project_id=job.user_id,
+                user_id=job.user_id,
+            )
+            next_job += 1
+        # Free slots claim runs, as idle workers would
+        while len(finishing) < slots:
+            claimed = crud_training_run.claim_training_runs(db, worker_id="simulation", lease_seconds=3600)
+            if not claimed:
+                break
+            run, index = claimed[0], claimed[0].config_params["job"]
+            crud_training_run.start_training_run(db, run_id=run.id, worker_id="simulation", lease_seconds=3600)
+            waits[index] = now - jobs[index].submitted
+            heapq.heappush(finishing, (now + jobs[index].duration, run.id))
+        db.expunge_all()
+    return waits
+
+
+def _report(name: str, jobs: List[Job], kinds: Dict[int, str], waits: List[float]) -> None:
+    by_kind: Dict[str, List[float]] = defaultdict(list)
+    for job, wait in zip(jobs, waits):
+        by_kind[kinds[job.user_id]].append(wait)
+    print(f"{name} - queue wait in seconds:")
+    for kind in ("heavy", "medium", "light"):
+        values = sorted(by_kind[kind])
+        if not values:
+            continue
+        percentile = lambda p: values[min(int(len(values) * p), len(values) - 1)]
+        print(f"  {kind:<7} {len(values):>5} runs  p50 {percentile(0.5):>8.0f}  p95 {percentile(0.95):>8.0f}  "
+              f"p99 {percentile(0.99):>8.0f}  max {values[-1]:>8.0f}  mean {statistics.mean(values):>8.0f}")
+
+
+def _engine() -> Engine:
+    url = make_url(str(settings.SQLALCHEMY_DATABASE_URI))
+    return create_engine(url, pool_size=1, connect_args={"options": f"-c search_path={SCHEMA}"})
+
+
+def simulate_scheduler(
+    slots: int = 8,
+    heavy: int = 500,
+    medium: int = 3,
+    light: int = 20,
+    duration: float = 60.0,
+    max_active: int = 0,
+    seed: int = 0,
+    keep: bool = False,
+) -> None:
+    """
+    Runs the simulation and prints a report.
+    """
+    if make_url(str(settings.SQLALCHEMY_DATABASE_URI)).get_backend_name() != "postgresql":
+        raise SystemExit("simulate_scheduler needs a PostgreSQL SQLALCHEMY_DATABASE_URI")
+    jobs, kinds = _trace(heavy, medium, light, duration, slots, seed)
+    engine = _engine()
+
+    print(f"Seeding schema '{SCHEMA}' with {len(kinds)} users; replaying {len(jobs)} runs on {slots} slots...")
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for statement in SEED_SQL:
+            connection.execute(text(statement), {"users": len(kinds)})
+
+    cap = settings.TRAINING_MAX_ACTIVE_RUNS_PER_USER
+    settings.TRAINING_MAX_ACTIVE_RUNS_PER_USER = max_active
+    try:
+        with Session(engine, expire_on_commit=False) as db:
+            fair_waits = _fair_share(db, jobs, slots)
+        _report("FIFO", jobs, kinds, _fifo(jobs, slots))
+        _report(f"Fair share (max active runs per user: {max_active or 'no cap'})", jobs, kinds, fair_waits)
+    finally:
+        settings.TRAINING_MAX_ACTIVE_RUNS_PER_USER = cap
+        if not keep:
+            with engine.begin() as connection:
+                connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slots", type=int, default=8, help="Number of runs executed at once")
+    parser.add_argument("--heavy", type=int, default=500, help="Runs of the heavy user's burst")
+    parser.add_argument("--medium", type=int, default=3, help="Number of steadily submitting users")
+    parser.add_argument("--light", type=int, default=20, help="Number of users submitting 1-3 runs")
+    parser.add_argument("--duration", type=float, default=60.0, help="Mean run duration (simulated seconds)")
+    parser.add_argument("--max-active", type=int, default=0, help="Active runs per user (0 = no cap)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the trace")
+    parser.add_argument("--keep", action="store_true", help=f"Keep the '{SCHEMA}' schema afterwards")
+    args = parser.parse_args()
+    simulate_scheduler(
+        slots=args.slots, heavy=args.heavy, medium=args.medium, light=args.light, duration=args.duration,
+        max_active=args.max_active, seed=args.seed, keep=args.keep,
+    )
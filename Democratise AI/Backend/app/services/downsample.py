@@ -0,0 +1,73 @@
+# File: app/services/downsample.py
+"""
+Downsampling of (step, value) series for charts (GET /training/jobs/{id}/metrics).
+
+Both keep the first and last points and return at most `points` points, in step order:
+
+- lttb: Largest-Triangle-Three-Buckets; keeps the points that shape the curve most.
+- minmax: the lowest and highest point of each of points/2 buckets; keeps every spike.
+"""
+
+from typing import List, Sequence, Tuple
+
+Series = Tuple[List[int], List[float]]
+
+METHODS = ("lttb", "minmax")
+
+
+def lttb(steps: Sequence[int], values: Sequence[float], points: int) -> Series:
+    size = len(steps)
+    if points >= size:
+        return list(steps), list(values)
+    if points < 3:
+        return [steps[0], steps[-1]][:points], [values[0], values[-1]][:points]
+
+    every = (size - 2) / (points - 2) # Points per bucket; the first and last points are buckets of their own
+    out_steps, out_values = [steps[0]], [values[0]]
+    selected = 0
+    for bucket in range(points - 2):
+        start, end = int(bucket * every) + 1, int((bucket + 1) * every) + 1
+        # The next bucket's average point (the last point for the last bucket)
+        next_start, next_end = end, min(int((bucket + 2) * every) + 1, size)
+        average_step = sum(steps[next_start:next_end]) / (next_end - next_start)
+        average_value = sum(values[next_start:next_end]) / (next_end - next_start)
+        # Keep the point forming the largest triangle with the last kept point and that average
+        selected_step, selected_value = steps[selected], values[selected]
+        largest, chosen = -1.0, start
+        for index in range(start, end):
+            area = abs(
+                (selected_step - average_step) * (values[index] - selected_value)
+                - (selected_step - steps[index]) * (average_value - selected_value)
+            )
+            if area > largest:
+                largest, chosen = area, index
+        out_steps.append(steps[chosen])
+        out_values.append(values[chosen])
+        selected = chosen
+    out_steps.append(steps[-1])
+    out_values.append(values[-1])
+    return out_steps, out_values
+
+
+def minmax(steps: Sequence[int], values: Sequence[float], points: int) -> Series:
+    size = len(steps)
+    if points >= size:
+        return list(steps), list(values)
+    if points < 4:
+        return [steps[0], steps[-1]][:points], [values[0], values[-1]][:points]
+
+    # The first and last points, and two points per bucket of the points in between
+    buckets = (points - 2) // 2
+    every = (size - 2) / buckets
+    kept = [0]
+    for bucket in range(buckets):
+        bucket_indexes = range(int(bucket * every) + 1, int((bucket + 1) * every) + 1)
+        lowest = min(bucket_indexes, key=values.__getitem__)
+        highest = max(bucket_indexes, key=values.__getitem__)
+        kept.extend(sorted({lowest, highest}))
+    kept.append(size - 1)
+    return [steps[index] for index in kept], [values[index] for index in kept]
+
+
+def downsample(steps: Sequence[int], values: Sequence[float], points: int, method: str) -> Series:
+    return lttb(steps, values, points) if method == "lttb" else minmax(steps, values, points)
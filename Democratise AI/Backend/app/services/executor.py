@@ -0,0 +1,313 @@
+# File: app/services/executor.py
+
+import fcntl
+import json
+import logging
+import math
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.crud import crud_dataset, crud_model, crud_training_metric
+from app.db.session import SessionLocal
+from app.models.training_run import TrainingRun
+from app.services.log_store import LogStore, log_store
+
+# config_params keys read by the executor (the rest is passed to the trainer)
+RESOURCE_KEYS = ("cpus", "memory_mb", "timeout_seconds")
+
+
+class TrainingJobError(Exception):
+    """
+    A training run that can't run or didn't succeed (the message becomes the run's error).
+    """
+
+
+class SlotLease:
+    """
+    Slots held by one run: released explicitly, or by the kernel if the process dies.
+    """
+
+    def __init__(self, held: List[Tuple[int, int]], cpus: List[int], memory_mb: int):
+        self._held = held # (slot index, locked file descriptor)
+        self.cpus = cpus # The CPUs of the slots, for the run's CPU affinity
+        self.memory_mb = memory_mb
+
+    def release(self) -> None:
+        for _, fd in self._held:
+            os.close(fd) # Closing the descriptor releases its flock
+        self._held = []
+
+
+class ResourceSlots:
+    """
+    CPU/memory accounting shared by all worker processes of a node.
+
+    The node is divided into one slot per CPU, each with an equal share of the memory;
+    a run holds as many slots as it needs CPUs or memory, and runs only on its slots'
+    CPUs, so concurrent runs never oversubscribe the cores. Slot i is an flock on
+    <directory>/slot-<i>.lock: the locks are visible to every process of the node and
+    released by the kernel when a process exits, so a crashed worker never leaks slots.
+    """
+
+    def __init__(self, directory: str, cpus: List[int], memory_mb: int):
+        self.directory = Path(directory)
+        self.cpus = cpus
+        self.slot_memory_mb = max(memory_mb // len(cpus), 1)
+
+    @property
+    def count(self) -> int:
+        return len(self.cpus)
+
+    def slots_for(self, cpus: int, memory_mb: int) -> int:
+        return max(cpus, math.ceil(memory_mb / self.slot_memory_mb), 1)
+
+    @contextmanager
+    def _mutex(self) -> Iterator[None]:
+        # Acquisitions are all-or-nothing under a node-wide lock: two runs never each hold
+        # part of what the other needs
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.directory / "slots.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def try_acquire(self, count: int) -> Optional[SlotLease]:
+        """
+        Takes `count` free slots, or none.
+
+        Returns:
+            The lease, or None if fewer than `count` slots are free.
+        """
+        held: List[Tuple[int, int]] = []
+        with self._mutex():
+            for index in range(self.count):
+                fd = os.open(self.directory / f"slot-{index}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    os.close(fd)
+                    continue
+                held.append((index, fd))
+                if len(held) == count:
+                    break
+        lease = SlotLease(held, [self.cpus[index] for index, _ in held], len(held) * self.slot_memory_mb)
+        if len(held) < count:
+            lease.release()
+            return None
+        return lease
+
+
+def _node_cpus() -> List[int]:
+    cpus = sorted(os.sched_getaffinity(0))
+    if settings.TRAINING_EXECUTOR_CPUS:
+        # Slots are mapped to CPUs round robin if more slots than CPUs are configured
+        cpus = [cpus[index % len(cpus)] for index in range(settings.TRAINING_EXECUTOR_CPUS)]
+    return cpus
+
+
+def _node_memory_mb() -> int:
+    if settings.TRAINING_EXECUTOR_MEMORY_MB:
+        return settings.TRAINING_EXECUTOR_MEMORY_MB
+    return int(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") * 0.8) // (1024 * 1024)
+
+
+class MetricsReader:
+    """
+    Stores the per-step metrics a training process appends to its metrics file (JSON
+    lines, see app/services/training_job.py), a batch of at most `batch_bytes` per read:
+    only complete lines are read, so a line being written is picked up by the next read.
+    """
+
+    def __init__(self, run: TrainingRun, path: Path, batch_bytes: int = 1024 * 1024):
+        self.run = run
+        self.path = path
+        self.batch_bytes = batch_bytes
+        self._offset = 0
+
+    def read(self) -> int:
+        """
+        Returns:
+            The number of bytes stored (0: nothing new, or storing failed).
+        """
+        try:
+            with open(self.path, "rb") as file:
+                file.seek(self._offset)
+                data = file.read(self.batch_bytes)
+        except FileNotFoundError:
+            return 0
+        complete = data[:data.rfind(b"\n") + 1]
+        if not complete:
+            return 0
+        points = []
+        for line in complete.splitlines():
+            try:
+                record = json.loads(line)
+                step = record.pop("step")
+                points += [(name, int(step), float(value)) for name, value in record.items()]
+            except (ValueError, TypeError, KeyError, AttributeError):
+                logging.warning(f"Training run {self.run.id}: ignored a malformed metrics line: {line[:200]!r}")
+        try:
+            with SessionLocal() as db:
+                crud_training_metric.append_metrics(db, run_id=self.run.id, project_id=self.run.project_id, points=points)
+        except SQLAlchemyError as e:
+            logging.warning(f"Training run {self.run.id}: storing metrics failed, retrying: {e}")
+            return 0 # The same lines are read again next time
+        self._offset += len(complete)
+        return len(complete)
+
+
+def _positive(config: Dict[str, Any], key: str, default: float) -> float:
+    value = config.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        raise TrainingJobError(f"config_params.{key} must be a positive number")
+    return value
+
+
+class LocalExecutor:
+    """
+    Runs training runs on this node, each in its own subprocess (app/services/training_job.py).
+
+    A run waits for the slots it needs (config_params cpus/memory_mb, default one slot),
+    then its process is started with the job spec (config, model, dataset), pinned to
+    the slots' CPUs and limited to their memory. Its output goes to the run's log
+    (app/services/log_store.py, compressed once the run is over); the metrics it reports
+    become the run's metrics. The process is killed if it runs past its timeout or if
+    the worker loses the run.
+    """
+
+    def __init__(self, slots: ResourceSlots, work_dir: str, logs: LogStore, timeout_seconds: float,
+                 poll_seconds: float = 1.0):
+        self.slots = slots
+        self.work_dir = Path(work_dir)
+        self.logs = logs
+        self.timeout_seconds = timeout_seconds
+        self.poll_seconds = poll_seconds
+
+    def ready(self) -> bool:
+        # At least one free slot: don't claim runs this node can't start soon
+        lease = self.slots.try_acquire(1)
+        if lease is None:
+            return False
+        lease.release()
+        return True
+
+    def logs_location(self, run: TrainingRun) -> Optional[str]:
+        return str(self.logs.path(run.id))
+
+    def execute(self, run: TrainingRun, cancelled: threading.Event) -> Optional[Dict[str, Any]]:
+        config = dict(run.config_params or {})
+        cpus = _positive(config, "cpus", 1)
+        memory_mb = _positive(config, "memory_mb", self.slots.slot_memory_mb)
+        timeout = _positive(config, "timeout_seconds", self.timeout_seconds)
+        if cpus != int(cpus):
+            raise TrainingJobError("config_params.cpus must be a whole number")
+        count = self.slots.slots_for(int(cpus), int(memory_mb))
+        if count > self.slots.count:
+            raise TrainingJobError(
+                f"The run needs {count} slots ({int(cpus)} CPUs, {int(memory_mb)} MB); "
+                f"nodes have {self.slots.count} ({self.slots.slot_memory_mb} MB each)"
+            )
+
+        lease = self.slots.try_acquire(count)
+        while lease is None:
+            if cancelled.wait(self.poll_seconds):
+                return None
+            lease = self.slots.try_acquire(count)
+        job_dir = self.work_dir / str(run.id)
+        try:
+            spec_path = self._write_spec(run, config, lease, job_dir)
+            return self._run_process(run, spec_path, job_dir, lease, timeout, cancelled)
+        finally:
+            lease.release()
+            shutil.rmtree(job_dir, ignore_errors=True)
+            if not cancelled.is_set(): # A lost run goes on elsewhere, appending to its log
+                try:
+                    self.logs.compress(run.id)
+                except OSError as e:
+                    logging.warning(f"Could not compress the log of training run {run.id}: {e}")
+
+    def _write_spec(self, run: TrainingRun, config: Dict[str, Any], lease: SlotLease, job_dir: Path) -> Path:
+        # Everything the job needs, so the training process never connects to the database
+        with SessionLocal() as db:
+            model = crud_model.get_model(db=db, id=run.model_id)
+            dataset = crud_dataset.get_dataset(db=db, id=run.dataset_id)
+        if model is None or dataset is None:
+            raise TrainingJobError("The run's model or dataset no longer exists")
+        spec = {
+            "run_id": run.id,
+            "config": {key: value for key, value in config.items() if key not in RESOURCE_KEYS},
+            "model": model.model_dump(include={"source_type", "source_identifier", "task_type", "framework"}),
+            "dataset": dataset.model_dump(include={"storage_type", "storage_path"}),
+            "cpus": lease.cpus,
+            "memory_mb": lease.memory_mb,
+            "result_path": str(job_dir / "result.json"),
+            "metrics_path": str(job_dir / "metrics.jsonl"),
+        }
+        job_dir.mkdir(parents=True, exist_ok=True)
+        spec_path = job_dir / "spec.json"
+        spec_path.write_text(json.dumps(spec))
+        return spec_path
+
+    def _run_process(self, run: TrainingRun, spec_path: Path, job_dir: Path, lease: SlotLease,
+                     timeout: float, cancelled: threading.Event) -> Optional[Dict[str, Any]]:
+        threads = str(len(lease.cpus))
+        # Numeric libraries size their thread pools by these, not by the CPU affinity
+        env = {**os.environ, "OMP_NUM_THREADS": threads, "OPENBLAS_NUM_THREADS": threads, "MKL_NUM_THREADS": threads}
+        metrics_reader = MetricsReader(run, job_dir / "metrics.jsonl")
+        if run.attempts > 1:
+            with SessionLocal() as db:
+                crud_training_metric.delete_run_metrics(db, run_id=run.id) # Curves of an earlier attempt
+        deadline = time.monotonic() + timeout
+        with self.logs.open_append(run.id) as log: # Appends: a retried run keeps the logs of earlier attempts
+            process = subprocess.Popen(
+                [sys.executable, "-m", "app.services.training_job", str(spec_path)],
+                stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, env=env,
+                start_new_session=True, # Its own process group, killed as a whole
+            )
+            try:
+                while True:
+                    try:
+                        returncode = process.wait(timeout=self.poll_seconds)
+                        break
+                    except subprocess.TimeoutExpired:
+                        pass
+                    metrics_reader.read()
+                    if cancelled.is_set():
+                        return None
+                    if time.monotonic() > deadline:
+                        raise TrainingJobError(f"Training timed out after {timeout:g} s")
+            finally:
+                if process.poll() is None:
+                    os.killpg(process.pid, signal.SIGKILL)
+                    process.wait()
+
+        while metrics_reader.read(): # The rest of the file
+            pass
+        result_path = job_dir / "result.json"
+        result = json.loads(result_path.read_text()) if result_path.exists() else {}
+        if returncode != 0 or "error" in result:
+            raise TrainingJobError(result.get("error") or f"Training process exited with code {returncode}")
+        logging.info(f"Training run {run.id} completed on CPUs {lease.cpus}")
+        return result.get("metrics")
+
+
+# Process-wide instance used by the training workers (app/worker.py)
+local_executor = LocalExecutor(
+    slots=ResourceSlots(settings.TRAINING_EXECUTOR_SLOTS_DIR, _node_cpus(), _node_memory_mb()),
+    work_dir=settings.TRAINING_EXECUTOR_WORK_DIR,
+    logs=log_store,
+    timeout_seconds=settings.TRAINING_JOB_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,120 @@
+# File: app/services/hashing.py
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+from app.core import security
+from app.core.config import settings
+
+
+class HashingServiceBusy(Exception):
+    """
+    Raised when the hashing queue is saturated or a result takes too long.
+    Mapped to a 503 response with Retry-After in app/main.py.
+    """
+
+
+class PasswordHashingService:
+    """
+    Runs bcrypt hashing/verification in a dedicated process pool.
+
+    At most `max_workers + max_pending` calls are admitted at once; further calls
+    fail fast with HashingServiceBusy instead of piling up on request threads.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, timeout: float):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max(max_workers, 1) + max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created lazily so importing the app (alembic, scripts) doesn't spawn processes
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        # 'spawn' avoids forking a multi-threaded server process
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """
+        Admits a call into the pool, or raises HashingServiceBusy if the queue is full.
+        The admission slot is released when the call completes.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise HashingServiceBusy("Password hashing queue is full")
+        try:
+            if self.max_workers > 0:
+                future = self._get_executor().submit(fn, *args)
+            else:
+                # Inline mode (e.g. local development): still bounded by the slots
+                future = Future()
+                try:
+                    future.set_result(fn(*args))
+                except Exception as exc:
+                    future.set_exception(exc)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _wait(self, future: Future) -> Any:
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HashingServiceBusy("Timed out waiting for password hashing") from None
+
+    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Verifies a plain password against a stored hash in the hashing pool.
+        """
+        return self._wait(self.submit(security.verify_password, plain_password, hashed_password))
+
+    def get_password_hash(self, password: str) -> str:
+        """
+        Hashes a plain password in the hashing pool.
+        """
+        return self._wait(self.submit(security.get_password_hash, password))
+
+    async def _await(self, future: Future) -> Any:
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise HashingServiceBusy("Timed out waiting for password hashing") from None
+
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Awaitable verify_password for async endpoints (no request thread is held).
+        """
+        return await self._await(self.submit(security.verify_password, plain_password, hashed_password))
+
+    async def get_password_hash_async(self, password: str) -> str:
+        """
+        Awaitable get_password_hash for async endpoints (no request thread is held).
+        """
+        return await self._await(self.submit(security.get_password_hash, password))
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# Process-wide instance used by crud_user and the password endpoint
+hashing_service = PasswordHashingService(
+    max_workers=settings.PASSWORD_HASHING_WORKERS,
+    max_pending=settings.PASSWORD_HASHING_MAX_PENDING,
+    timeout=settings.PASSWORD_HASHING_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,219 @@
+# File: app/services/log_store.py
+"""
+Training run logs (GET /training/jobs/{id}/logs).
+
+The executor appends a run's output to {run_id}.log while it runs. Once the run is over,
+the log is compressed (gzip, or zstd with the `zstandard` package) in blocks of
+BLOCK_SIZE bytes, with an index of where each block starts ({run_id}.log.idx):
+
+- gzip: one gzip member, fully flushed after each block, so decompression can start
+  at any block (raw deflate) and the whole file is still a plain .gz;
+- zstd: one zstd frame per block (concatenated frames are one valid .zst).
+
+Reads are byte ranges of the log as written, compressed or not, and never hold more
+than a block in memory. Completed logs can also be sent as they are stored, with a
+Content-Encoding header, when the client accepts it.
+"""
+
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+from app.core.config import settings
+
+BLOCK_SIZE = 1 << 20 # Log bytes per compressed block
+READ_SIZE = 1 << 16 # Bytes per piece read from an uncompressed log
+
+CODECS = {"gzip": ".gz", "zstd": ".zst"} # Codec -> extension (the Content-Encoding tokens too)
+
+
+def _zstandard() -> Any:
+    import zstandard # Optional dependency (pip install zstandard), only needed for zstd logs
+    return zstandard
+
+
+class LogStore:
+    """
+    Logs of training runs, one per run, in a directory shared by the workers and the
+    API servers.
+    """
+
+    def __init__(self, root: str, compression: str, level: int):
+        self.root = Path(root)
+        self.compression = compression # "gzip", "zstd" or "none"
+        self.level = level
+
+    def path(self, run_id: int) -> Path:
+        # The uncompressed log (while the run is active)
+        return self.root / f"{run_id}.log"
+
+    def _index_path(self, run_id: int) -> Path:
+        return self.root / f"{run_id}.log.idx"
+
+    def _data_path(self, run_id: int, codec: str) -> Path:
+        return self.root / f"{run_id}.log{CODECS[codec]}"
+
+    def _index(self, run_id: int) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._index_path(run_id).read_text())
+        except FileNotFoundError:
+            return None
+
+    def open_append(self, run_id: int) -> BinaryIO:
+        """
+        Opens a run's log to append to it (e.g. the output of its process); a
+        compressed log (of an earlier attempt) is decompressed first.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        if self._index(run_id) is not None:
+            self._decompress(run_id)
+        return open(self.path(run_id), "ab")
+
+    def stat(self, run_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Size (of the log as written) and codec (None if not compressed) of a run's log,
+        None if the run has no log.
+        """
+        try:
+            return {"size": self.path(run_id).stat().st_size, "codec": None}
+        except FileNotFoundError:
+            pass
+        index = self._index(run_id)
+        if index is None:
+            # Compressed since the first check (the index is written before the log is removed)?
+            try:
+                return {"size": self.path(run_id).stat().st_size, "codec": None}
+            except FileNotFoundError:
+                return None
+        return {"size": index["size"], "codec": index["codec"]}
+
+    def read(self, run_id: int, start: int, end: int) -> Iterator[bytes]:
+        """
+        Yields the bytes [start, end) of a run's log, in pieces of at most a block.
+        Bytes past the end of the log are not yielded.
+        """
+        try:
+            file = open(self.path(run_id), "rb")
+        except FileNotFoundError:
+            file = None
+        if file is not None:
+            # An open log stays readable if it is compressed (and removed) meanwhile
+            with file:
+                file.seek(start)
+                while start < end:
+                    piece = file.read(min(READ_SIZE, end - start))
+                    if not piece:
+                        return
+                    start += len(piece)
+                    yield piece
+            return
+
+        index = self._index(run_id)
+        if index is None:
+            return
+        block_size, offsets = index["block_size"], index["offsets"]
+        end = min(end, index["size"])
+        with open(self._data_path(run_id, index["codec"]), "rb") as data:
+            for block in range(start // block_size, (end - 1) // block_size + 1 if end > start else 0):
+                data.seek(offsets[block])
+                compressed = data.read(offsets[block + 1] - offsets[block])
+                if index["codec"] == "gzip":
+                    content = zlib.decompressobj(-zlib.MAX_WBITS).decompress(compressed)
+                else:
+                    content = _zstandard().ZstdDecompressor().decompress(compressed)
+                block_start = block * block_size
+                yield content[max(start - block_start, 0):end - block_start]
+
+    def open_compressed(self, run_id: int, codec: str) -> Optional[BinaryIO]:
+        # The compressed log as stored (a complete .gz/.zst file), if compressed with `codec`
+        index = self._index(run_id)
+        if index is None or index["codec"] != codec:
+            return None
+        try:
+            return open(self._data_path(run_id, codec), "rb")
+        except FileNotFoundError:
+            return None
+
+    def compress(self, run_id: int) -> bool:
+        """
+        Compresses a run's log once the run is over (no more appends). The compressed
+        log replaces the uncompressed one only once complete.
+
+        Returns:
+            Whether the log was compressed (False: no log, or compression is off).
+        """
+        codec = self.compression
+        if codec == "none" or not self.path(run_id).exists():
+            return False
+        if codec == "zstd":
+            try:
+                _zstandard()
+            except ImportError:
+                logging.warning("TRAINING_LOG_COMPRESSION is zstd but zstandard isn't installed; using gzip")
+                codec = "gzip"
+
+        started = time.monotonic()
+        data_path = self._data_path(run_id, codec)
+        partial = data_path.with_name(data_path.name + ".partial")
+        size, offsets, crc = 0, [], 0
+        with open(self.path(run_id), "rb") as log, open(partial, "wb") as out:
+            if codec == "gzip":
+                out.write(b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff") # gzip header: deflate, no name, no mtime
+                compressor = zlib.compressobj(self.level, zlib.DEFLATED, -zlib.MAX_WBITS)
+            else:
+                compressor = _zstandard().ZstdCompressor(level=self.level)
+            while True:
+                block = log.read(BLOCK_SIZE)
+                if not block:
+                    break
+                offsets.append(out.tell())
+                size += len(block)
+                if codec == "gzip":
+                    crc = zlib.crc32(block, crc)
+                    out.write(compressor.compress(block) + compressor.flush(zlib.Z_FULL_FLUSH))
+                else:
+                    out.write(compressor.compress(block))
+            offsets.append(out.tell())
+            if codec == "gzip":
+                out.write(compressor.flush(zlib.Z_FINISH) + struct.pack("<II", crc, size & 0xFFFFFFFF))
+        os.replace(partial, data_path)
+
+        index = {"codec": codec, "size": size, "block_size": BLOCK_SIZE, "offsets": offsets}
+        index_partial = self._index_path(run_id).with_name(f"{run_id}.log.idx.partial")
+        index_partial.write_text(json.dumps(index))
+        os.replace(index_partial, self._index_path(run_id))
+        self.path(run_id).unlink()
+        logging.info(
+            f"Training run {run_id} log compressed ({codec}): {size} -> {data_path.stat().st_size} bytes "
+            f"in {time.monotonic() - started:.2f} s"
+        )
+        return True
+
+    def _decompress(self, run_id: int) -> None:
+        # Back to an uncompressed log (to append to it)
+        index = self._index(run_id)
+        partial = self.path(run_id).with_name(f"{run_id}.log.partial")
+        with open(partial, "wb") as out:
+            for piece in self.read(run_id, 0, index["size"]):
+                out.write(piece)
+        os.replace(partial, self.path(run_id))
+        self._index_path(run_id).unlink()
+        self._data_path(run_id, index["codec"]).unlink(missing_ok=True)
+
+    def delete(self, run_id: int) -> None:
+        # Removes a run's log (e.g. when its project is purged), compressed or not
+        for path in (self.path(run_id), self._index_path(run_id), *(self._data_path(run_id, codec) for codec in CODECS)):
+            path.unlink(missing_ok=True)
+
+
+# Process-wide instance (the executor writes logs, the API reads them)
+log_store = LogStore(
+    root=settings.TRAINING_LOG_DIR,
+    compression=settings.TRAINING_LOG_COMPRESSION,
+    level=settings.TRAINING_LOG_COMPRESSION_LEVEL,
+)
@@ -0,0 +1,76 @@
+# File: app/services/purger.py
+
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.crud import crud_project
+from app.db.session import SessionLocal
+
+
+class ProjectPurger:
+    """
+    Background task removing projects marked 'deleting' (see crud_project.remove_project).
+
+    Purges in batches of at most `batch_size` rows, each in its own transaction, so
+    deleting a project with many training runs never holds locks for long. Several
+    processes may run a purger: they skip projects another purger is working on.
+    """
+
+    def __init__(self, batch_size: int, interval_seconds: float, lock_timeout_ms: int):
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self.lock_timeout_ms = lock_timeout_ms
+        self._task: Optional[asyncio.Task] = None
+
+    def purge_batch(self) -> int:
+        """
+        Runs one purge transaction (blocking).
+
+        Returns:
+            The number of rows deleted (0 if there is nothing to purge).
+        """
+        with SessionLocal() as db:
+            return crud_project.purge_deleted_projects(
+                db, batch_size=self.batch_size, lock_timeout_ms=self.lock_timeout_ms
+            )
+
+    async def run(self) -> None:
+        """
+        Purges batch after batch while there is work, then polls every `interval_seconds`.
+        """
+        while True:
+            try:
+                deleted = await run_in_threadpool(self.purge_batch)
+            except (SQLAlchemyError, OSError) as e:
+                # e.g. lock_timeout, or an archive file that can't be rewritten: the batch
+                # was rolled back and is retried later
+                logging.warning(f"Project purge batch failed, retrying later: {e}")
+                deleted = 0
+            if not deleted:
+                await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Process-wide instance started by the app lifespan (app/main.py)
+project_purger = ProjectPurger(
+    batch_size=settings.PROJECT_PURGE_BATCH_SIZE,
+    interval_seconds=settings.PROJECT_PURGE_INTERVAL_SECONDS,
+    lock_timeout_ms=settings.PROJECT_PURGE_LOCK_TIMEOUT_MS,
+)
@@ -0,0 +1,66 @@
+# File: app/services/run_archive.py
+
+import gzip
+import json
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def write_records(path: Path, records: Iterable[Dict[str, Any]]) -> Tuple[int, Optional[int], Optional[int]]:
+    """
+    Writes records (dicts with an integer "id", in ascending id order) to a gzipped
+    JSON Lines file. The file only appears once complete (written to a temporary
+    name, then renamed), so a crash never leaves a truncated archive behind.
+
+    Returns:
+        The number of records written, and the smallest and largest id.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+    count, min_id, max_id = 0, None, None
+    with gzip.open(partial, "wt", encoding="utf-8") as file:
+        for record in records:
+            file.write(json.dumps(record, default=_json_default, separators=(",", ":")))
+            file.write("\n")
+            count += 1
+            min_id = record["id"] if min_id is None else min_id
+            max_id = record["id"]
+    os.replace(partial, path)
+    return count, min_id, max_id
+
+
+def read_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the records of an archive written by write_records, in id order
+    (values as JSON has them, e.g. timestamps as ISO strings).
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            yield json.loads(line)
+
+
+def find_record(path: Path, id: int) -> Optional[Dict[str, Any]]:
+    """
+    Looks up one record by id in an archive written by write_records
+    (a sequential read, stopping at the first larger id).
+    """
+    for record in read_records(path):
+        if record["id"] == id:
+            return record
+        if record["id"] > id:
+            break
+    return None
+
+
+def remove_files(paths: List[Path]) -> None:
+    # Removes archive files, e.g. rewritten ones of a rolled back transaction
+    for path in paths:
+        path.unlink(missing_ok=True)
@@ -0,0 +1,219 @@
+# File: app/services/run_events.py
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.db.session import engine
+from app.models.training_run import TrainingRun
+
+# PostgreSQL channel of the training run events
+CHANNEL = "training_run_events"
+
+# NOTIFY payloads must be under 8000 bytes: larger metrics are left out of the event
+MAX_PAYLOAD_BYTES = 7500
+
+# Tells a subscriber that events may have been missed: read the run again
+RESYNC = object()
+
+
+def run_event(run: TrainingRun) -> Dict[str, Any]:
+    """
+    The event published when a run changes: its status and outcome.
+    """
+    return {
+        "id": run.id,
+        "status": run.status,
+        "attempts": run.attempts,
+        "error": run.error,
+        "metrics": run.metrics,
+        # Naive UTC, as read back from the database (aware when set by aware_utcnow)
+        "updated_at": run.updated_at.replace(tzinfo=None).isoformat() if run.updated_at else None,
+    }
+
+
+def publish(db: Session, run: TrainingRun) -> None:
+    """
+    Publishes a run's change to the API processes (RunEventHub), with NOTIFY: the event
+    is delivered when the transaction commits, and not at all if it rolls back. Call it
+    in the transaction of the change, before its commit. Does nothing off PostgreSQL.
+    """
+    event = run_event(run)
+    if len(json.dumps(event, default=str).encode()) > MAX_PAYLOAD_BYTES:
+        event["metrics"], event["metrics_truncated"] = None, True # Subscribers read the run instead
+    _notify(db, event)
+
+
+def publish_metrics(db: Session, run_id: int, latest: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Publishes new per-step metrics of a run (crud_training_metric.append_metrics), as
+    publish() does: `latest` is the last new point of each metric, {metric: {"step", "value"}}.
+    """
+    event = {"id": run_id, "type": "metrics", "latest": latest}
+    if len(json.dumps(event).encode()) > MAX_PAYLOAD_BYTES:
+        event["latest"] = dict(list(latest.items())[:50]) # Many metrics: the first ones, enough to notice
+    _notify(db, event)
+
+
+def _notify(db: Session, event: Dict[str, Any]) -> None:
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(select(func.pg_notify(CHANNEL, json.dumps(event, default=str))))
+
+
+class Subscription:
+    """
+    The events of one run, for one client (see RunEventHub.subscribe).
+    """
+
+    def __init__(self, hub: "RunEventHub", run_id: int, queue_size: int):
+        self.hub = hub
+        self.run_id = run_id
+        self._queue: asyncio.Queue = asyncio.Queue(queue_size)
+
+    def put(self, event: Any) -> None:
+        if self._queue.full():
+            # A client too slow to keep up: drop the backlog and have it read the run again
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            event = RESYNC
+        self._queue.put_nowait(event)
+
+    async def get(self, timeout: float) -> Optional[Any]:
+        """
+        Returns:
+            The next event (a run_event or metrics event dict, or RESYNC), or None after `timeout` seconds.
+        """
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.hub._unsubscribe(self)
+
+
+class RunEventHub:
+    """
+    Fans the training run events out to the clients of this process (SSE streams).
+
+    Workers and API processes publish events with NOTIFY (publish()); each API process
+    holds one connection LISTENing to them, read on the event loop, and hands every event
+    to the subscriptions of its run. However many clients follow runs, that's one
+    connection per process and no polling. If the connection is lost, it's reopened and
+    every subscription is told to read its run again (events may have been missed).
+    """
+
+    def __init__(self, engine: Any, queue_size: int, retry_seconds: float):
+        self.engine = engine
+        self.queue_size = queue_size
+        self.retry_seconds = retry_seconds
+        self._subscriptions: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._task: Optional[asyncio.Task] = None
+        self.listening = False # False: events aren't received, subscribers must poll
+
+    def subscribe(self, run_id: int) -> Subscription:
+        subscription = Subscription(self, run_id, self.queue_size)
+        self._subscriptions[run_id].add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.run_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.run_id]
+
+    def dispatch(self, event: Any) -> None:
+        # An event of one run, or RESYNC for all of them
+        if event is RESYNC:
+            targets = [subscription for subscriptions in self._subscriptions.values() for subscription in subscriptions]
+        else:
+            targets = list(self._subscriptions.get(event["id"], ()))
+        for subscription in targets:
+            subscription.put(event)
+
+    def _connect(self) -> Any:
+        # A dedicated DBAPI (psycopg2) connection, outside the pools, in autocommit
+        cargs, cparams = self.engine.dialect.create_connect_args(self.engine.url)
+        connection = self.engine.dialect.loaded_dbapi.connect(*cargs, **cparams)
+        connection.autocommit = True
+        connection.cursor().execute(f"LISTEN {CHANNEL}")
+        return connection
+
+    async def _listen(self, connection: Any) -> None:
+        # Until the connection fails: reads the notifications whenever the socket is readable
+        loop = asyncio.get_running_loop()
+        lost = loop.create_future()
+
+        def on_readable() -> None:
+            try:
+                connection.poll()
+            except Exception as e:
+                if not lost.done():
+                    lost.set_exception(e)
+                return
+            while connection.notifies:
+                notify = connection.notifies.pop(0)
+                try:
+                    self.dispatch(json.loads(notify.payload))
+                except (ValueError, KeyError):
+                    logging.warning(f"Ignored a malformed training run event: {notify.payload[:200]}")
+
+        fd = connection.fileno() # Kept: fileno() raises once the connection is closed
+        loop.add_reader(fd, on_readable)
+        try:
+            await lost
+        finally:
+            loop.remove_reader(fd)
+
+    async def run(self) -> None:
+        """
+        Listens for events, reconnecting after `retry_seconds` whenever the connection fails.
+        """
+        while True:
+            connection = None
+            try:
+                connection = await run_in_threadpool(self._connect)
+                self.listening = True
+                self.dispatch(RESYNC) # Events published while not listening were missed
+                await self._listen(connection)
+            except Exception as e:
+                logging.warning(f"Training run event listener failed, reconnecting: {e}")
+            finally:
+                self.listening = False
+                if connection is not None:
+                    connection.close()
+            await asyncio.sleep(self.retry_seconds)
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        if self.engine.dialect.name != "postgresql" or self.engine.dialect.driver != "psycopg2":
+            # No NOTIFY (e.g. SQLite): streams fall back to polling their run
+            logging.warning("Training run events need PostgreSQL with psycopg2; event streams will poll")
+            return
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Process-wide instance started by the app lifespan (app/main.py)
+run_event_hub = RunEventHub(
+    engine=engine, # The sync (psycopg2) engine exists whatever the stack
+    queue_size=settings.TRAINING_EVENTS_QUEUE_SIZE,
+    retry_seconds=settings.TRAINING_EVENTS_RETRY_SECONDS,
+)
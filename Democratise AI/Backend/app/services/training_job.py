@@ -0,0 +1,179 @@
+# File: app/services/training_job.py
+"""
+Training process of one run, started by LocalExecutor (app/services/executor.py):
+
+    python -m app.services.training_job <spec.json>
+
+Confines itself to the CPUs and memory of the run's slots, trains the run's model on
+its dataset and writes {"metrics": {...}} (or {"error": "..."}) to the spec's
+result_path. Progress goes to stdout, i.e. the run's log file, and per-step metrics
+to the spec's metrics_path, one {"step": n, "<metric>": value, ...} JSON line per
+report, which the executor stores as they come. Only the standard library is used,
+and the database is never touched: the spec holds everything.
+
+Trainers are picked by the model's source: 'platform' models name a built-in trainer
+(TRAINERS). Datasets must be CSV files readable on the node (storage_type 'local').
+"""
+
+import csv
+import json
+import math
+import os
+import random
+import resource
+import sys
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Tuple
+
+Rows = List[Tuple[List[float], float]]
+Report = Callable[[int, Dict[str, float]], None] # (step, {metric: value}) -> per-step metrics
+
+
+def _confine(cpus: List[int], memory_mb: int) -> None:
+    os.sched_setaffinity(0, cpus)
+    limit = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit)) # MemoryError beyond the slots' memory
+
+
+def _load_csv(dataset: Dict[str, Any], target: Any) -> Tuple[List[str], Rows]:
+    if dataset["storage_type"] != "local":
+        raise ValueError(f"Datasets stored in '{dataset['storage_type']}' can't be read on this node")
+    with open(dataset["storage_path"], newline="") as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        target_index = len(header) - 1 if target is None else header.index(target)
+        rows = []
+        for line_number, record in enumerate(reader, start=2):
+            try:
+                values = [float(value) for value in record]
+            except ValueError:
+                raise ValueError(f"Line {line_number}: all columns must be numeric") from None
+            rows.append((values[:target_index] + values[target_index + 1:], values[target_index]))
+    if not rows:
+        raise ValueError("The dataset has no rows")
+    return [name for index, name in enumerate(header) if index != target_index], rows
+
+
+def _standardize(train: Rows, other: Rows) -> None:
+    # In place, with the training rows' mean and deviation
+    for column in range(len(train[0][0])):
+        values = [features[column] for features, _ in train]
+        mean = sum(values) / len(values)
+        deviation = math.sqrt(sum((value - mean) ** 2 for value in values) / len(values)) or 1.0
+        for features, _ in train + other:
+            features[column] = (features[column] - mean) / deviation
+
+
+def _sgd(rows: Rows, config: Dict[str, Any], report: Report, logistic: bool) -> Dict[str, Any]:
+    epochs = int(config.get("epochs", 10))
+    learning_rate = float(config.get("learning_rate", 0.01))
+    report_every = max(int(config.get("report_every_steps", 10)), 1)
+    validation_split = float(config.get("validation_split", 0.2))
+    generator = random.Random(config.get("seed", 0))
+    generator.shuffle(rows)
+    validation_count = int(len(rows) * validation_split) if len(rows) > 1 else 0
+    validation, train = rows[:validation_count], rows[validation_count:]
+    _standardize(train, validation)
+
+    weights, bias = [0.0] * len(train[0][0]), 0.0
+
+    def predict(features: List[float]) -> float:
+        value = bias + sum(weight * feature for weight, feature in zip(weights, features))
+        return 1.0 / (1.0 + math.exp(-max(min(value, 30.0), -30.0))) if logistic else value
+
+    def point_loss(prediction: float, target: float) -> float:
+        if logistic:
+            return -math.log(max(prediction, 1e-12)) if target >= 0.5 else -math.log(max(1.0 - prediction, 1e-12))
+        return (prediction - target) ** 2
+
+    def loss(subset: Rows) -> float:
+        return sum(point_loss(predict(features), target) for features, target in subset) / len(subset)
+
+    step, window = 0, 0.0
+    for epoch in range(1, epochs + 1):
+        generator.shuffle(train)
+        for features, target in train:
+            prediction = predict(features)
+            error = prediction - target # Gradient of both losses w.r.t. the linear output
+            bias -= learning_rate * error
+            for index, feature in enumerate(features):
+                weights[index] -= learning_rate * error * feature
+            step += 1
+            window += point_loss(prediction, target)
+            if step % report_every == 0:
+                report(step, {"loss": window / report_every}) # Mean loss of the last steps
+                window = 0.0
+        epoch_metrics = {"epoch_loss": loss(train)}
+        if validation:
+            epoch_metrics["val_loss"] = loss(validation)
+        report(step, epoch_metrics)
+        print(f"epoch {epoch}/{epochs} " + " ".join(f"{name} {value:.6f}" for name, value in epoch_metrics.items()), flush=True)
+
+    evaluated = validation or train
+    metrics = {"loss": loss(train), "epochs": epochs, "train_rows": len(train), "validation_rows": len(validation)}
+    if validation:
+        metrics["val_loss"] = loss(validation)
+    if logistic:
+        correct = sum((predict(features) >= 0.5) == (target >= 0.5) for features, target in evaluated)
+        metrics["accuracy"] = correct / len(evaluated)
+    return metrics
+
+
+def train_linear_regression(rows: Rows, config: Dict[str, Any], report: Report) -> Dict[str, Any]:
+    return _sgd(rows, config, report, logistic=False)
+
+
+def train_logistic_regression(rows: Rows, config: Dict[str, Any], report: Report) -> Dict[str, Any]:
+    return _sgd(rows, config, report, logistic=True)
+
+
+# Built-in trainers: source_identifier of a 'platform' model -> trainer
+TRAINERS: Dict[str, Callable[[Rows, Dict[str, Any], Report], Dict[str, Any]]] = {
+    "linear-regression": train_linear_regression,
+    "logistic-regression": train_logistic_regression,
+}
+
+
+def run(spec: Dict[str, Any]) -> Dict[str, Any]:
+    model = spec["model"]
+    trainer = TRAINERS.get(model["source_identifier"]) if model["source_type"] == "platform" else None
+    if trainer is None:
+        raise ValueError(
+            f"No CPU trainer for {model['source_type']} model '{model['source_identifier']}' "
+            f"(built-in: {', '.join(TRAINERS)})"
+        )
+    config = spec["config"]
+    columns, rows = _load_csv(spec["dataset"], config.get("target"))
+    print(f"run {spec['run_id']}: {model['source_identifier']} on {len(rows)} rows, "
+          f"features {columns}, CPUs {spec['cpus']}, {spec['memory_mb']} MB", flush=True)
+    started = time.monotonic()
+    with open(spec["metrics_path"], "a") as metrics_file:
+        def report(step: int, values: Dict[str, float]) -> None:
+            # One JSON line per report; the executor stores the complete lines as they come
+            metrics_file.write(json.dumps({"step": step, **values}) + "\n")
+            metrics_file.flush()
+
+        metrics = trainer(rows, config, report)
+    metrics["duration_seconds"] = round(time.monotonic() - started, 3)
+    return metrics
+
+
+def main(spec_path: str) -> int:
+    with open(spec_path) as file:
+        spec = json.load(file)
+    _confine(spec["cpus"], spec["memory_mb"])
+    try:
+        result, code = {"metrics": run(spec)}, 0
+    except Exception as e:
+        traceback.print_exc()
+        result, code = {"error": f"{type(e).__name__}: {e}"}, 1
+    partial = spec["result_path"] + ".partial"
+    with open(partial, "w") as file:
+        json.dump(result, file)
+    os.replace(partial, spec["result_path"])
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1]))
@@ -0,0 +1,103 @@
+# File: app/services/training_run_maintenance.py
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.crud import crud_training_run
+from app.db.session import SessionLocal
+from app.utils import aware_utcnow
+
+# pg_try_advisory_lock key, so only one process runs the maintenance at a time
+ADVISORY_LOCK_KEY = 0x7472756E  # "trun"
+
+
+class TrainingRunMaintenance:
+    """
+    Background task keeping the training run table small: creates the upcoming monthly
+    partitions (PostgreSQL), moves the finished runs of old months to archive files
+    (see crud_training_run.archive_training_runs) and forgets expired idempotency keys.
+    """
+
+    def __init__(self, interval_seconds: float, months_ahead: int, archive_after_days: int, archive_dir: str):
+        self.interval_seconds = interval_seconds
+        self.months_ahead = months_ahead
+        self.archive_after_days = archive_after_days
+        self.archive_dir = archive_dir
+        self._task: Optional[asyncio.Task] = None
+
+    def run_once(self) -> int:
+        """
+        Runs one maintenance pass (blocking). Skipped if another process holds the lock.
+
+        Returns:
+            The number of runs archived.
+        """
+        with SessionLocal() as db:
+            connection = db.connection()
+            postgres = connection.dialect.name == "postgresql"
+            if postgres:
+                # Session-level lock: held across the pass's transactions
+                if not connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY}).scalar():
+                    return 0
+                db.commit()
+            try:
+                try:
+                    created = crud_training_run.create_partitions(db, months_ahead=self.months_ahead)
+                    if created:
+                        logging.info(f"Created training run partitions: {', '.join(created)}")
+                except SQLAlchemyError as e:
+                    # Archiving and the other steps don't depend on it
+                    db.rollback()
+                    logging.warning(f"Creating training run partitions failed: {e}")
+                crud_training_run.delete_expired_idempotency_keys(
+                    db, before=aware_utcnow() - timedelta(hours=settings.TRAINING_IDEMPOTENCY_KEY_TTL_HOURS)
+                )
+                if not self.archive_after_days:
+                    return 0
+                before = datetime.utcnow() - timedelta(days=self.archive_after_days)
+                archived = crud_training_run.archive_training_runs(db, before=before, directory=self.archive_dir)
+                if archived:
+                    logging.info(f"Archived {archived} training runs to {self.archive_dir}")
+                return archived
+            finally:
+                if postgres:
+                    db.rollback()
+                    db.connection().execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+                    db.commit()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await run_in_threadpool(self.run_once)
+            except (SQLAlchemyError, OSError) as e:
+                logging.warning(f"Training run maintenance failed, retrying later: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Process-wide instance started by the app lifespan (app/main.py)
+training_run_maintenance = TrainingRunMaintenance(
+    interval_seconds=settings.TRAINING_RUN_MAINTENANCE_INTERVAL_SECONDS,
+    months_ahead=settings.TRAINING_RUN_PARTITION_MONTHS_AHEAD,
+    archive_after_days=settings.TRAINING_RUN_ARCHIVE_AFTER_DAYS,
+    archive_dir=settings.TRAINING_RUN_ARCHIVE_DIR,
+)
@@ -0,0 +1,148 @@
+# File: app/services/training_worker.py
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.crud import crud_training_run
+from app.db.session import SessionLocal
+from app.models.training_run import TrainingRun
+
+class PlaceholderExecutor:
+    """
+    Stand-in executor: completes runs at once, without training, metrics or logs.
+    Executors (e.g. app/services/executor.py's LocalExecutor) implement the same methods.
+    """
+
+    def ready(self) -> bool:
+        # Whether the executor could start a run now (checked before claiming one)
+        return True
+
+    def logs_location(self, run: TrainingRun) -> Optional[str]:
+        # Where the run's logs will be (stored on the run when it starts)
+        return None
+
+    def execute(self, run: TrainingRun, cancelled: threading.Event) -> Optional[Dict[str, Any]]:
+        """
+        Executes a run (blocking) and returns its metrics; raising fails the run.
+        `cancelled` is set if the worker lost the run: stop and return (the result is discarded).
+        """
+        logging.info(f"Placeholder: training run {run.id} completed without training")
+        return None
+
+
+class TrainingWorker:
+    """
+    Runs queued training runs one at a time, in one process of `python -m app.worker`.
+
+    The trainingrun table is the queue: when its executor is ready, the worker claims the
+    next queued run by fair share (crud_training_run.claim_training_runs), moves it to 'running' and
+    renews its lease from a heartbeat thread while the executor works, then records
+    'completed' (with the executor's metrics) or 'failed'. Runs of workers that die stop being renewed and are
+    requeued by the other workers once their lease expires.
+    """
+
+    def __init__(
+        self,
+        worker_id: str,
+        lease_seconds: float,
+        poll_seconds: float,
+        max_attempts: int,
+        executor: Any = None,
+    ):
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.executor = executor or PlaceholderExecutor()
+        self._next_requeue = 0.0
+
+    def requeue_expired(self) -> None:
+        # At most once per lease period: expired leases can't appear faster than that
+        if time.monotonic() < self._next_requeue:
+            return
+        self._next_requeue = time.monotonic() + self.lease_seconds
+        with SessionLocal() as db:
+            requeued, failed = crud_training_run.requeue_expired_runs(db, max_attempts=self.max_attempts)
+        if requeued or failed:
+            logging.warning(f"Training runs with an expired lease: {requeued} requeued, {failed} failed")
+
+    def run_once(self) -> bool:
+        """
+        Claims and executes one run (blocking).
+
+        Returns:
+            False if no run was queued (or the executor has no capacity).
+        """
+        self.requeue_expired()
+        if not self.executor.ready():
+            return False
+        # expire_on_commit=False here and below: the runs keep their loaded state after the
+        # commit, outside the session (no reload query)
+        with SessionLocal(expire_on_commit=False) as db:
+            claimed = crud_training_run.claim_training_runs(
+                db, worker_id=self.worker_id, lease_seconds=self.lease_seconds
+            )
+        if not claimed:
+            return False
+        self.execute(claimed[0])
+        return True
+
+    def execute(self, claimed: TrainingRun) -> None:
+        run_id = claimed.id
+        with SessionLocal(expire_on_commit=False) as db:
+            run = crud_training_run.start_training_run(
+                db, run_id=run_id, worker_id=self.worker_id, lease_seconds=self.lease_seconds,
+                logs_location=self.executor.logs_location(claimed),
+            )
+        if run is None:
+            return
+
+        done, cancelled = threading.Event(), threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(run_id, done, cancelled), daemon=True)
+        heartbeat.start()
+        try:
+            metrics, status, error = self.executor.execute(run, cancelled), "completed", None
+        except Exception as e:
+            logging.exception(f"Training run {run_id} failed")
+            metrics, status, error = None, "failed", str(e) or type(e).__name__
+        finally:
+            done.set()
+            heartbeat.join()
+
+        with SessionLocal() as db:
+            finished = crud_training_run.finish_training_run(
+                db, run_id=run_id, worker_id=self.worker_id, status=status, metrics=metrics, error=error
+            )
+        if not finished:
+            logging.warning(f"Lost the lease of training run {run_id}; its result was discarded")
+
+    def _heartbeat(self, run_id: int, done: threading.Event, cancelled: threading.Event) -> None:
+        # Renews well before expiry, so one slow renewal doesn't lose the run
+        while not done.wait(self.lease_seconds / 3):
+            try:
+                with SessionLocal() as db:
+                    if not crud_training_run.renew_training_run_lease(
+                        db, run_id=run_id, worker_id=self.worker_id, lease_seconds=self.lease_seconds
+                    ):
+                        logging.warning(f"Lost the lease of training run {run_id}, cancelling it")
+                        cancelled.set()
+                        return
+            except SQLAlchemyError as e:
+                logging.warning(f"Lease renewal of training run {run_id} failed, retrying: {e}")
+
+    def run(self, stop: threading.Event) -> None:
+        """
+        Works until `stop` is set (the run in progress is finished first).
+        """
+        while not stop.is_set():
+            try:
+                busy = self.run_once()
+            except SQLAlchemyError as e:
+                logging.warning(f"Training worker {self.worker_id} failed, retrying later: {e}")
+                busy = False
+            if not busy:
+                stop.wait(self.poll_seconds)
@@ -0,0 +1,76 @@
+# File: app/worker.py
+"""
+Training worker pool: runs the queued training runs (see app/services/training_worker.py).
+
+Starts --processes worker processes, each claiming one run at a time and executing it
+with the local executor (app/services/executor.py) once the node has a free slot.
+More processes than slots is fine: the extra ones only claim runs as slots free up.
+Any number of pools may run against the same database, on any number of hosts.
+SIGINT/SIGTERM stop the pool once the runs in progress are finished.
+
+Usage (from the Backend directory):
+    python -m app.worker [--processes 2]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+from typing import Any
+
+from app.core.config import settings
+
+
+def _work(stop: Any) -> None:
+    # Child process entry point; the parent handles the signals and sets `stop`
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+
+    from app.db import base # noqa: F401 - registers all table models (relationships of TrainingRun)
+    from app.services.executor import local_executor
+    from app.services.training_worker import TrainingWorker
+
+    worker = TrainingWorker(
+        worker_id=f"{socket.gethostname()}:{os.getpid()}",
+        lease_seconds=settings.TRAINING_WORKER_LEASE_SECONDS,
+        poll_seconds=settings.TRAINING_WORKER_POLL_SECONDS,
+        max_attempts=settings.TRAINING_WORKER_MAX_ATTEMPTS,
+        executor=local_executor,
+    )
+    logging.info(f"Training worker {worker.worker_id} started")
+    worker.run(stop)
+    logging.info(f"Training worker {worker.worker_id} stopped")
+
+
+def main(processes: int) -> None:
+    # spawn, not fork: every process opens its own database connections
+    context = multiprocessing.get_context("spawn")
+    stop = context.Event()
+    pool = [
+        context.Process(target=_work, args=(stop,), name=f"training-worker-{index}")
+        for index in range(processes)
+    ]
+    for process in pool:
+        process.start()
+
+    def _shutdown(signum: int, frame: Any) -> None:
+        logging.info(f"Received signal {signum}, stopping after the runs in progress")
+        stop.set()
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+    for process in pool:
+        process.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--processes", type=int, default=settings.TRAINING_WORKER_PROCESSES, help="Number of worker processes"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+    main(args.processes)
@@ -37,7 +37,8 @@ function SelectModelModal({ isOpen, onClose, onModelSelect }) {
               const result = await api.get('/api/v1/models', { params: { limit: 200 } });
 
               if (result.success) {
-                  setModels(Array.isArray(result.data) ? result.data : []);
+                  // List endpoints return one page: { items, next_cursor }
+                  setModels(Array.isArray(result.data?.items) ? result.data.items : []);
                   console.log("SelectModelModal: Fetched models:", result.data);
               } else {
                   console.error("SelectModelModal: Failed to fetch models:", result.error);
@@ -11,23 +11,28 @@ const getAuthToken = () => {
 
 // Core fetch function to handle requests, responses, and errors
 const apiFetch = async (endpoint, options = {}) => {
-    const url = `${API_BASE_URL}${endpoint}`;  const token = getAuthToken();
+    const { params, ...fetchOptions } = options;
+    // Append query parameters (e.g. { limit: 50, cursor }), skipping empty values
+    const query = new URLSearchParams(
+      Object.entries(params || {}).filter(([, value]) => value !== undefined && value !== null)
+    ).toString();
+    const url = `${API_BASE_URL}${endpoint}${query ? `?${query}` : ''}`;  const token = getAuthToken();
     console.log('Constructed API URL:', url); // <<< Add this line for debugging
     const headers = {
     // Default to JSON content type, can be overridden
     'Content-Type': 'application/json',
-    ...options.headers,
+    ...fetchOptions.headers,
   };
   
   // Add Authorization header if a token exists and it's not an explicit auth request
   // (like signup, where we don't have a token yet)
-  if (token && !options.isAuthRequest) {
+  if (token && !fetchOptions.isAuthRequest) {
     headers['Authorization'] = `Bearer ${token}`;
   }
 
   try {
     const response = await fetch(url, {
-      ...options, // Includes method, body, etc.
+      ...fetchOptions, // Includes method, body, etc.
       headers,
     });
 
@@ -55,7 +60,7 @@ const apiFetch = async (endpoint, options = {}) => {
     if (!response.ok) {
         // If response status indicates an error (e.g., 4xx, 5xx)
         // Handle specific auth errors (e.g., 401 Unauthorized triggers logout)
-        if (response.status === 401 && !options.isAuthRequest) {
+        if (response.status === 401 && !fetchOptions.isAuthRequest) {
             console.error('Authentication error (401), logging out.');
             useStore.getState().logout(); // Call logout action from Zustand store
             useStore.getState().addNotification({
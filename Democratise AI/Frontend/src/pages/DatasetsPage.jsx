@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useMemo } from 'react'; // Added useMemo
+import React, { useState, useEffect, useMemo, useCallback } from 'react'; // Added useMemo
 import { create } from 'zustand';
 import { Home, FolderKanban, Puzzle, Database, GraduationCap, Settings, LogIn, LogOut, Menu, X, Sun, Moon, Trash2, Settings2, Eye, Plus, CheckCircle, XCircle, Info, Loader2, AlertTriangle, Filter, SortAsc, SortDesc, Database as DatabaseIcon, Search } from 'lucide-react'; // Added Filter, SortAsc, SortDesc
 import { Card, CardHeader, CardTitle, CardDescription, CardContent, CardFooter } from '../components/ui/Card.jsx'; // FIXED: Added .jsx extension and relative path
@@ -20,28 +20,61 @@ import Badge from '../components/ui/Badge.jsx';
 function DatasetsPage() {
     const addNotification = useStore((state) => state.addNotification);
 
-    // State for datasets fetched from API
+    // State for datasets fetched from API (pages appended by "Load more")
     const [datasets, setDatasets] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    // Facet counts for the current filters (sent with the first page)
+    const [facets, setFacets] = useState(null);
+    // Number of matching datasets ({ count, isEstimate }, also sent with the first page)
+    const [total, setTotal] = useState(null);
     // Loading and error states
     const [isLoading, setIsLoading] = useState(true);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
     const [error, setError] = useState(null);
-    // State for client-side filtering/searching
+    // Filters and sort order, applied by the backend
     const [searchTerm, setSearchTerm] = useState('');
+    const [debouncedSearchTerm, setDebouncedSearchTerm] = useState('');
     // Filter state - Note: Backend model uses storage_type, not a general 'type'
     const [datasetStorageTypeFilter, setDatasetStorageTypeFilter] = useState('all');
+    const [visibilityFilter, setVisibilityFilter] = useState('all'); // 'all' | 'public' | 'private'
+    const [sortOrder, setSortOrder] = useState('-updated_at');
 
-    // Fetch datasets from the backend when the component mounts
+    // Wait for a pause in typing before querying by name prefix
     useEffect(() => {
-        const fetchDatasets = async () => {
+        const timer = setTimeout(() => setDebouncedSearchTerm(searchTerm.trim()), 300);
+        return () => clearTimeout(timer);
+    }, [searchTerm]);
+
+    // Fetches one page of datasets for the current filters (cursor = null for the first page)
+    // Requires user to be logged in (token sent automatically)
+    const fetchDatasets = useCallback(async (cursor) => {
+        const params = {
+            storage_type: datasetStorageTypeFilter !== 'all' ? datasetStorageTypeFilter : null,
+            is_public: visibilityFilter !== 'all' ? visibilityFilter === 'public' : null,
+            name_prefix: debouncedSearchTerm || null,
+            sort: sortOrder,
+            cursor,
+            limit: 60,
+        };
+        console.log("Fetching datasets from backend...", params);
+        return api.get('/api/v1/datasets', { params });
+    }, [datasetStorageTypeFilter, visibilityFilter, debouncedSearchTerm, sortOrder]);
+
+    // Fetch the first page whenever the filters change
+    useEffect(() => {
+        let ignore = false; // Drop responses for filters that changed in the meantime
+        const fetchFirstPage = async () => {
             setIsLoading(true);
             setError(null);
-            console.log("Fetching datasets from backend...");
-
-            // Use api.get - requires user to be logged in (token sent automatically)
-            const result = await api.get('/api/v1/datasets', { params: { skip: 0, limit: 200 } });
+            const result = await fetchDatasets(null);
+            if (ignore) return;
 
             if (result.success) {
-                setDatasets(Array.isArray(result.data) ? result.data : []);
+                // List endpoints return one page: { items, next_cursor, total, facets }
+                setDatasets(Array.isArray(result.data?.items) ? result.data.items : []);
+                setNextCursor(result.data?.next_cursor || null);
+                setTotal(result.data?.total != null ? { count: result.data.total, isEstimate: result.data.total_is_estimate } : null);
+                setFacets(result.data?.facets || null);
                 console.log("Fetched datasets:", result.data);
             } else {
                 console.error("Failed to fetch datasets:", result.error);
@@ -53,39 +86,39 @@ function DatasetsPage() {
             setIsLoading(false);
         };
 
-        fetchDatasets();
-        // Run only once on mount
-    }, [addNotification]); // Include addNotification in deps
-
-    // Client-side filtering logic based on fetched datasets
-    const filteredDatasets = useMemo(() => {
-        if (!Array.isArray(datasets)) return [];
-
-        let tempDatasets = datasets;
-
-        // Filter by storage type
-        if (datasetStorageTypeFilter !== 'all') {
-            tempDatasets = tempDatasets.filter(d => d.storage_type === datasetStorageTypeFilter);
-        }
+        fetchFirstPage();
+        return () => { ignore = true; };
+    }, [fetchDatasets, addNotification]);
 
-        // Filter by search term
-        if (searchTerm.trim() !== '') {
-            const lowerCaseSearchTerm = searchTerm.toLowerCase();
-            tempDatasets = tempDatasets.filter(d =>
-                (d.name?.toLowerCase() || '').includes(lowerCaseSearchTerm) ||
-                (d.description?.toLowerCase() || '').includes(lowerCaseSearchTerm) ||
-                (d.storage_type?.toLowerCase() || '').includes(lowerCaseSearchTerm)
-            );
+    // Append the next page
+    const handleLoadMore = async () => {
+        if (!nextCursor) return;
+        setIsLoadingMore(true);
+        const result = await fetchDatasets(nextCursor);
+        if (result.success) {
+            setDatasets(prev => [...prev, ...(result.data?.items || [])]);
+            setNextCursor(result.data?.next_cursor || null);
+        } else {
+            addNotification({ message: `Failed to load more datasets: ${result.error}`, type: 'error' });
         }
-        return tempDatasets;
-    }, [datasets, searchTerm, datasetStorageTypeFilter]);
+        setIsLoadingMore(false);
+    };
 
-    // Derive available storage types from the fetched datasets for the filter dropdown
-    const datasetStorageTypes = useMemo(() => {
-        if (!Array.isArray(datasets)) return ['all'];
-        const types = new Set(datasets.map(d => d.storage_type).filter(Boolean)); // Filter out null/empty types
-        return ['all', ...Array.from(types).sort()];
-    }, [datasets]);
+    // Storage type options with counts from the backend facets, e.g. "s3 (12)"
+    const datasetStorageTypes = useMemo(
+        () => (facets?.storage_type || []).filter(option => option.value !== null),
+        [facets]
+    );
+    // Visibility counts, keyed 'public' / 'private'
+    const visibilityCounts = useMemo(() => {
+        const counts = { public: 0, private: 0 };
+        (facets?.is_public || []).forEach(option => {
+            counts[option.value ? 'public' : 'private'] += option.count;
+        });
+        return counts;
+    }, [facets]);
+    // Large totals are the database's estimate, shown as "~"
+    const totalDatasets = total ? `${total.isEstimate ? '~' : ''}${total.count}` : '?';
 
     // Placeholder action when user clicks "Use Dataset"
     const handleUseDataset = (datasetId, datasetName) => {
@@ -119,7 +152,7 @@ function DatasetsPage() {
                 </div>
             );
         }
-        if (filteredDatasets.length === 0) {
+        if (datasets.length === 0) {
             return (
                 <div className="text-center py-10 border-2 border-dashed border-slate-300 dark:border-slate-700 rounded-lg">
                     <DatabaseIcon className="mx-auto h-12 w-12 text-slate-400" />
@@ -133,7 +166,7 @@ function DatasetsPage() {
         // Render dataset cards using data from the backend
         return (
             <div className="grid gap-4 md:grid-cols-2 lg:grid-cols-3">
-                {filteredDatasets.map(dataset => (
+                {datasets.map(dataset => (
                     <Card key={dataset.id}>
                         <CardHeader>
                             <div className="flex justify-between items-start">
@@ -155,6 +188,14 @@ function DatasetsPage() {
                         </CardFooter>
                     </Card>
                 ))}
+                {nextCursor && (
+                    <div className="md:col-span-2 lg:col-span-3 flex justify-center">
+                        <Button variant="outline" onClick={handleLoadMore} disabled={isLoadingMore}>
+                            {isLoadingMore && <Loader2 className="mr-2 h-4 w-4 animate-spin" />}
+                            Load more ({datasets.length} of {totalDatasets})
+                        </Button>
+                    </div>
+                )}
             </div>
         );
     };
@@ -179,11 +220,11 @@ function DatasetsPage() {
                     <Input
                         id="dataset-search"
                         type="search"
-                        placeholder="Search datasets by name or description..."
+                        placeholder="Search datasets by name..."
                         className="pl-10"
                         value={searchTerm}
                         onChange={(e) => setSearchTerm(e.target.value)}
-                        disabled={isLoading || !!error}
+                        disabled={!!error}
                     />
                 </div>
                 <div className="flex-none sm:w-56"> {/* Adjusted width */}
@@ -192,15 +233,34 @@ function DatasetsPage() {
                         id="dataset-type-filter"
                         value={datasetStorageTypeFilter}
                         onChange={(e) => setDatasetStorageTypeFilter(e.target.value)}
-                        disabled={isLoading || !!error || datasetStorageTypes.length <= 1}
+                        disabled={!!error || (datasetStorageTypes.length === 0 && datasetStorageTypeFilter === 'all')}
                     >
-                        {datasetStorageTypes.map(type => (
-                            <option key={type} value={type}>
-                                {type === 'all' ? 'All Storage Types' : type}
-                            </option>
+                        <option value="all">All Storage Types</option>
+                        {datasetStorageTypes.map(({ value, count }) => (
+                            <option key={value} value={value}>{value} ({count})</option>
                         ))}
                     </Select>
                 </div>
+                <div className="flex-none sm:w-44">
+                    <Label htmlFor="dataset-visibility-filter" className="sr-only">Filter by Visibility</Label>
+                    <Select
+                        id="dataset-visibility-filter"
+                        value={visibilityFilter}
+                        onChange={(e) => setVisibilityFilter(e.target.value)}
+                        disabled={!!error}
+                    >
+                        <option value="all">All Datasets</option>
+                        <option value="public">Public ({visibilityCounts.public})</option>
+                        <option value="private">My Private ({visibilityCounts.private})</option>
+                    </Select>
+                </div>
+                <div className="flex-none sm:w-44">
+                    <Label htmlFor="dataset-sort" className="sr-only">Sort Datasets</Label>
+                    <Select id="dataset-sort" value={sortOrder} onChange={(e) => setSortOrder(e.target.value)}>
+                        <option value="-updated_at">Recently Updated</option>
+                        <option value="name">Name (A-Z)</option>
+                    </Select>
+                </div>
             </div>
 
             {/* Render Content Area */}
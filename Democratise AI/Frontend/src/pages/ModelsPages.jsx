@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useMemo } from 'react'; // Added useMemo
+import React, { useState, useEffect, useMemo, useCallback } from 'react'; // Added useMemo
 import { create } from 'zustand';
 import { Home, FolderKanban, Puzzle, Database, GraduationCap, Settings, LogIn, LogOut, Menu, X, Sun, Moon, Trash2, Settings2, Eye, Plus, CheckCircle, XCircle, Info, Loader2, AlertTriangle, Filter, SortAsc, SortDesc, Search, Puzzle as PuzzleIcon } from 'lucide-react'; // Added Filter, SortAsc, SortDesc
 import { Card, CardHeader, CardTitle, CardDescription, CardContent, CardFooter } from '../components/ui/Card.jsx'; // FIXED: Added .jsx extension and relative path
@@ -20,27 +20,59 @@ import { api } from '../lib/api.js'; // Correct path assumed
 function ModelsPage() {
     const addNotification = useStore((state) => state.addNotification);
 
-    // State for models fetched from API
+    // State for models fetched from API (pages appended by "Load more")
     const [models, setModels] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    // Facet counts for the current filters (sent with the first page)
+    const [facets, setFacets] = useState(null);
+    // Number of matching models ({ count, isEstimate }, also sent with the first page)
+    const [total, setTotal] = useState(null);
     // Loading and error states
     const [isLoading, setIsLoading] = useState(true);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
     const [error, setError] = useState(null);
-    // State for client-side filtering/searching
+    // Filters and sort order, applied by the backend
     const [searchTerm, setSearchTerm] = useState('');
+    const [debouncedSearchTerm, setDebouncedSearchTerm] = useState('');
     const [modelTaskTypeFilter, setModelTaskTypeFilter] = useState('all'); // Filter by task_type
+    const [modelFrameworkFilter, setModelFrameworkFilter] = useState('all'); // Filter by framework
+    const [sortOrder, setSortOrder] = useState('name');
 
-    // Fetch models from the backend when the component mounts
+    // Wait for a pause in typing before querying by name prefix
     useEffect(() => {
-        const fetchModels = async () => {
+        const timer = setTimeout(() => setDebouncedSearchTerm(searchTerm.trim()), 300);
+        return () => clearTimeout(timer);
+    }, [searchTerm]);
+
+    // Fetches one page of models for the current filters (cursor = null for the first page)
+    const fetchModels = useCallback(async (cursor) => {
+        const params = {
+            task_type: modelTaskTypeFilter !== 'all' ? modelTaskTypeFilter : null,
+            framework: modelFrameworkFilter !== 'all' ? modelFrameworkFilter : null,
+            name_prefix: debouncedSearchTerm || null,
+            sort: sortOrder,
+            cursor,
+            limit: 60,
+        };
+        console.log("Fetching models from backend...", params);
+        return api.get('/api/v1/models', { params });
+    }, [modelTaskTypeFilter, modelFrameworkFilter, debouncedSearchTerm, sortOrder]);
+
+    // Fetch the first page whenever the filters change
+    useEffect(() => {
+        let ignore = false; // Drop responses for filters that changed in the meantime
+        const fetchFirstPage = async () => {
             setIsLoading(true);
             setError(null);
-            console.log("Fetching models from backend...");
-
-            // Use api.get to fetch models (adjust limit as needed)
-            const result = await api.get('/api/v1/models', { params: { skip: 0, limit: 200 } });
+            const result = await fetchModels(null);
+            if (ignore) return;
 
             if (result.success) {
-                setModels(Array.isArray(result.data) ? result.data : []);
+                // List endpoints return one page: { items, next_cursor, total, facets }
+                setModels(Array.isArray(result.data?.items) ? result.data.items : []);
+                setNextCursor(result.data?.next_cursor || null);
+                setTotal(result.data?.total != null ? { count: result.data.total, isEstimate: result.data.total_is_estimate } : null);
+                setFacets(result.data?.facets || null);
                 console.log("Fetched models:", result.data);
             } else {
                 console.error("Failed to fetch models:", result.error);
@@ -51,41 +83,30 @@ function ModelsPage() {
             setIsLoading(false);
         };
 
-        fetchModels();
-        // Run only once on mount
-    }, [addNotification]); // Include addNotification in deps if used inside effect directly (though it's stable)
-
-    // Client-side filtering logic based on fetched models
-    const filteredModels = useMemo(() => {
-        if (!Array.isArray(models)) return []; // Ensure models is an array
-
-        let tempModels = models;
-
-        // Filter by task type (using task_type field from backend model)
-        if (modelTaskTypeFilter !== 'all') {
-            tempModels = tempModels.filter(model => model.task_type === modelTaskTypeFilter);
-        }
-
-        // Filter by search term
-        if (searchTerm.trim() !== '') {
-            const lowerCaseSearchTerm = searchTerm.toLowerCase();
-            tempModels = tempModels.filter(model =>
-                (model.name?.toLowerCase() || '').includes(lowerCaseSearchTerm) ||
-                (model.description?.toLowerCase() || '').includes(lowerCaseSearchTerm) ||
-                (model.task_type?.toLowerCase() || '').includes(lowerCaseSearchTerm) || // Also search task type
-                (model.framework?.toLowerCase() || '').includes(lowerCaseSearchTerm) // Also search framework
-            );
+        fetchFirstPage();
+        return () => { ignore = true; };
+    }, [fetchModels, addNotification]);
+
+    // Append the next page
+    const handleLoadMore = async () => {
+        if (!nextCursor) return;
+        setIsLoadingMore(true);
+        const result = await fetchModels(nextCursor);
+        if (result.success) {
+            setModels(prev => [...prev, ...(result.data?.items || [])]);
+            setNextCursor(result.data?.next_cursor || null);
+        } else {
+            addNotification({ message: `Failed to load more models: ${result.error}`, type: 'error' });
         }
-        return tempModels;
-    }, [models, searchTerm, modelTaskTypeFilter]);
+        setIsLoadingMore(false);
+    };
 
-    // Derive available task types from the fetched models for the filter dropdown
-    const modelTaskTypes = useMemo(() => {
-        if (!Array.isArray(models)) return ['all'];
-        // Get unique, non-null task types
-        const types = new Set(models.map(model => model.task_type).filter(Boolean));
-        return ['all', ...Array.from(types).sort()];
-    }, [models]);
+    // Filter options with counts from the backend facets, e.g. "pytorch (42)"
+    const facetOptions = (facet) => (facets?.[facet] || []).filter(option => option.value !== null);
+    const modelTaskTypes = useMemo(() => facetOptions('task_type'), [facets]);
+    const modelFrameworks = useMemo(() => facetOptions('framework'), [facets]);
+    // Large totals are the database's estimate, shown as "~"
+    const totalModels = total ? `${total.isEstimate ? '~' : ''}${total.count}` : '?';
 
     // Placeholder action when user clicks "Use Model"
     const handleUseModel = (modelId, modelName) => {
@@ -113,7 +134,7 @@ function ModelsPage() {
                 </div>
             );
         }
-        if (filteredModels.length === 0) {
+        if (models.length === 0) {
             return (
                 <div className="text-center py-10 border-2 border-dashed border-slate-300 dark:border-slate-700 rounded-lg">
                     <PuzzleIcon className="mx-auto h-12 w-12 text-slate-400" />
@@ -127,7 +148,7 @@ function ModelsPage() {
         // Render model cards using data from the backend
         return (
             <div className="grid gap-4 md:grid-cols-2 lg:grid-cols-3">
-                {filteredModels.map(model => (
+                {models.map(model => (
                     <Card key={model.id}>
                         <CardHeader>
                             <CardTitle>{model.name}</CardTitle>
@@ -149,6 +170,14 @@ function ModelsPage() {
                         </CardFooter>
                     </Card>
                 ))}
+                {nextCursor && (
+                    <div className="md:col-span-2 lg:col-span-3 flex justify-center">
+                        <Button variant="outline" onClick={handleLoadMore} disabled={isLoadingMore}>
+                            {isLoadingMore && <Loader2 className="mr-2 h-4 w-4 animate-spin" />}
+                            Load more ({models.length} of {totalModels})
+                        </Button>
+                    </div>
+                )}
             </div>
         );
     };
@@ -167,11 +196,11 @@ function ModelsPage() {
                     <Input
                         id="model-search"
                         type="search"
-                        placeholder="Search models by name, description, task, framework..."
+                        placeholder="Search models by name..."
                         className="pl-10"
                         value={searchTerm}
                         onChange={(e) => setSearchTerm(e.target.value)}
-                        disabled={isLoading || !!error}
+                        disabled={!!error}
                     />
                 </div>
                 <div className="flex-none sm:w-56"> {/* Adjusted width */}
@@ -180,15 +209,35 @@ function ModelsPage() {
                         id="model-type-filter"
                         value={modelTaskTypeFilter}
                         onChange={(e) => setModelTaskTypeFilter(e.target.value)}
-                        disabled={isLoading || !!error || modelTaskTypes.length <= 1} // Disable if no types loaded
+                        disabled={!!error || (modelTaskTypes.length === 0 && modelTaskTypeFilter === 'all')}
                     >
-                        {modelTaskTypes.map(type => (
-                            <option key={type} value={type}>
-                                {type === 'all' ? 'All Task Types' : type}
-                            </option>
+                        <option value="all">All Task Types</option>
+                        {modelTaskTypes.map(({ value, count }) => (
+                            <option key={value} value={value}>{value} ({count})</option>
                         ))}
                     </Select>
                 </div>
+                <div className="flex-none sm:w-44">
+                    <Label htmlFor="model-framework-filter" className="sr-only">Filter by Framework</Label>
+                    <Select
+                        id="model-framework-filter"
+                        value={modelFrameworkFilter}
+                        onChange={(e) => setModelFrameworkFilter(e.target.value)}
+                        disabled={!!error || (modelFrameworks.length === 0 && modelFrameworkFilter === 'all')}
+                    >
+                        <option value="all">All Frameworks</option>
+                        {modelFrameworks.map(({ value, count }) => (
+                            <option key={value} value={value}>{value} ({count})</option>
+                        ))}
+                    </Select>
+                </div>
+                <div className="flex-none sm:w-44">
+                    <Label htmlFor="model-sort" className="sr-only">Sort Models</Label>
+                    <Select id="model-sort" value={sortOrder} onChange={(e) => setSortOrder(e.target.value)}>
+                        <option value="name">Name (A-Z)</option>
+                        <option value="-updated_at">Recently Updated</option>
+                    </Select>
+                </div>
             </div>
 
             {/* Render Content Area */}
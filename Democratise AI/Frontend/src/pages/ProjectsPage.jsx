@@ -28,6 +28,7 @@ function ProjectPage({ onSelectProject, onCreateProject }) { // Added onCreatePr
   
     // Component state
     const [projects, setProjects] = useState([]); // Use 'useState<ProjectPublic[]>([]') with TypeScript
+    const [totalProjects, setTotalProjects] = useState(null); // All projects of the user (from the API)
     const [isLoading, setIsLoading] = useState(true);
     const [error, setError] = useState(null);
     const [searchTerm, setSearchTerm] = useState('');
@@ -43,14 +44,15 @@ function ProjectPage({ onSelectProject, onCreateProject }) { // Added onCreatePr
         console.log("Fetching projects from backend...");
   
         // Use the centralized api helper which should handle auth token automatically
-        // The API spec indicates pagination is possible, fetching first 200 here.
-        const result = await api.get('/api/v1/projects/', { params: { limit: 200, skip: 0 } });
+        // The API is cursor-paginated ({ items, next_cursor }), fetching the first 200 here.
+        const result = await api.get('/api/v1/projects/', { params: { limit: 200 } });
   
         if (result.success) {
-          // Ensure the data received is an array
-          if (Array.isArray(result.data)) {
-            setProjects(result.data);
-            console.log("Fetched projects:", result.data);
+          // Ensure the page received contains an array
+          if (Array.isArray(result.data?.items)) {
+            setProjects(result.data.items);
+            setTotalProjects(result.data.total ?? result.data.items.length);
+            console.log("Fetched projects:", result.data.items);
           } else {
             console.error("API did not return an array for projects:", result.data);
             const errorMsg = "Received invalid data format from server.";
@@ -201,7 +203,7 @@ function ProjectPage({ onSelectProject, onCreateProject }) { // Added onCreatePr
                   Last Updated: {new Date(project.updated_at).toLocaleDateString()}
                 </p>
                 {/* Could add counts of models/datasets if available and needed */}
-                {/* <p className="text-xs text-slate-500 dark:text-slate-400 mt-1">Models: {project.models?.length || 0}</p> */}
+                {/* <p className="text-xs text-slate-500 dark:text-slate-400 mt-1">Models: {project.model_count || 0}</p> */}
               </CardContent>
               <CardFooter className="p-3 bg-slate-50 dark:bg-slate-800/50 border-t border-slate-200 dark:border-slate-700">
                 {/* Button to navigate to project details */}
@@ -228,7 +230,14 @@ function ProjectPage({ onSelectProject, onCreateProject }) { // Added onCreatePr
         <div className="flex flex-col sm:flex-row justify-between items-start sm:items-center gap-4">
           <div>
               <h1 className="text-2xl sm:text-3xl font-bold tracking-tight text-slate-900 dark:text-slate-50">My Projects</h1>
-              <p className="text-sm text-slate-600 dark:text-slate-400 mt-1">Manage your machine learning projects.</p>
+              <p className="text-sm text-slate-600 dark:text-slate-400 mt-1">
+                  Manage your machine learning projects.
+                  {totalProjects !== null && (
+                      totalProjects > projects.length
+                          ? ` Showing the ${projects.length} most recently updated of ${totalProjects}.`
+                          : ` ${totalProjects} project${totalProjects !== 1 ? 's' : ''}.`
+                  )}
+              </p>
           </div>
            {/* Conditionally render Create Project button if handler is provided */}
            {onCreateProject && (